@@ -0,0 +1,279 @@
+"""
+Headless HTTP API: chat (optionally streamed), slot search and booking
+
+    python -m api --workers 4 --port 8000
+
+Runs alongside the Streamlit UI on the same managers. The launcher syncs
+the Chroma index once, then starts the workers, which open it read-only
+and share one availability snapshot file, so adding workers adds neither
+ingestion runs nor Calendar API traffic. Every worker serves /healthz and
+/metrics for itself.
+"""
+import argparse
+import contextvars
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Literal, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from utils.calendar_utils import BookingInProgress
+from utils.chat_context import PERSONAL_INFO, ChatContext, next_free_slots
+from utils.history import ConversationHistory, llm_summarizer
+from utils.llm_gateway import BUSY_MESSAGE, LLMRateLimited, session_scope
+from utils.metrics import metrics, record_error, trace
+from utils.registry import get_calendar_manager, get_llm_gateway, get_session_states, get_turn_orchestrator, peek
+
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+class Message(BaseModel):
+    # Clients may only replay their own turns; system messages come from the server
+    role: Literal['user', 'assistant']
+    content: str
+
+
+class ChatRequest(BaseModel):
+    message: str
+    history: List[Message] = Field(default_factory=list)
+    session_id: Optional[str] = None
+    stream: bool = False
+
+
+class BookingRequest(BaseModel):
+    start_time: datetime
+    name: str
+    email: str
+    purpose: str = ""
+    idempotency_key: Optional[str] = None
+
+
+class _WorkerState:
+    """Per-process counters behind /healthz"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.inflight = 0
+        self.lock = threading.Lock()
+
+
+def create_app() -> FastAPI:
+    """Build the ASGI app; managers are created lazily on first use, once per worker"""
+    state = _WorkerState()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        # Uvicorn has stopped accepting connections and drained in-flight
+        # requests by now; stop background threads before the worker exits
+        manager = peek('calendar_manager')
+        if manager is not None and manager._availability_table is not None:
+            manager._availability_table.stop()
+        if os.getenv("METRICS_FILE"):
+            metrics.write_prometheus(f"{os.getenv('METRICS_FILE')}.{os.getpid()}")
+
+    app = FastAPI(title="Portfolio Assistant API", lifespan=lifespan)
+
+    @app.middleware("http")
+    async def track_requests(request: Request, call_next):
+        started = time.perf_counter()
+        with state.lock:
+            state.inflight += 1
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            with state.lock:
+                state.inflight -= 1
+            route = request.scope.get('route')
+            metrics.observe(
+                'http_server_request_seconds', time.perf_counter() - started,
+                path=route.path if route is not None else 'unmatched', status=status
+            )
+
+    def context() -> ChatContext:
+        return ChatContext(PERSONAL_INFO, get_turn_orchestrator())
+
+    def llm():
+        return get_llm_gateway()
+
+    @app.post("/chat")
+    def chat(body: ChatRequest):
+        """
+        Answer a message given the prior turns
+
+        Clients send the whole conversation each time; the rolling summary
+        of older turns is kept per session_id, so send back the one returned.
+        """
+        session_id = body.session_id or uuid.uuid4().hex
+        history = [{'role': m.role, 'content': m.content} for m in body.history]
+        with trace() as trace_id, session_scope(session_id):
+            gateway = llm()
+            sessions = get_session_states()
+            state = sessions.get(session_id, history)
+            conversation = ConversationHistory(
+                state,
+                summarize=llm_summarizer(gateway),
+                budget_tokens=int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+            )
+            messages, report = context().build(body.message, conversation, history)
+            sessions.put(session_id, state, history)
+            turn = contextvars.copy_context()
+
+            if not body.stream:
+                try:
+                    answer = gateway.chat(messages)
+                except LLMRateLimited as e:
+                    record_error('llm.gateway', e)
+                    raise HTTPException(status_code=429, detail=BUSY_MESSAGE)
+                except Exception as e:
+                    print(f"Error in /chat: {str(e)}")
+                    record_error('llm.chat', e)
+                    raise HTTPException(status_code=502, detail="The language model is unavailable.")
+                return {'answer': answer, 'session_id': session_id, 'trace_id': trace_id,
+                        'critical_stage': report['critical']}
+
+        def events() -> Iterator[str]:
+            # Server-sent events: one {"delta"} per chunk, then {"done"}. Each
+            # step may run on a different threadpool thread, so advance the
+            # stream inside the turn's context to keep its trace and session
+            chunks = turn.run(gateway.stream_chat, messages)
+            chunk = turn.run(next, chunks, None)
+            # Per-thread stats, set by the first step on this thread and updated in place
+            stats = gateway.last_stream_stats
+            while chunk is not None:
+                yield f"data: {json.dumps({'delta': chunk})}\n\n"
+                chunk = turn.run(next, chunks, None)
+            done = {'done': True, 'error': stats.get('error', False),
+                    'session_id': session_id, 'trace_id': trace_id}
+            yield f"data: {json.dumps(done)}\n\n"
+
+        return StreamingResponse(events(), media_type='text/event-stream')
+
+    @app.get("/slots")
+    def slots(count: int = 5):
+        """Next free meeting slots"""
+        count = max(1, min(count, 50))
+        try:
+            manager = get_calendar_manager(interactive=False)
+            found = next_free_slots(manager, count)
+        except Exception as e:
+            print(f"Error in /slots: {str(e)}")
+            record_error('api.slots', e)
+            raise HTTPException(status_code=503, detail="Calendar unavailable.")
+        return {'timezone': str(manager.timezone), 'slots': [slot.isoformat() for slot in found]}
+
+    @app.post("/bookings")
+    def book(body: BookingRequest, idempotency_key: Optional[str] = Header(default=None)):
+        """Book a slot; retries with the same Idempotency-Key return the same event"""
+        # The event invites this address, so only accept something that looks like one
+        if not EMAIL_PATTERN.match(body.email):
+            raise HTTPException(status_code=422, detail="email is not a valid address.")
+        try:
+            manager = get_calendar_manager(interactive=False)
+            start_time = body.start_time
+            if start_time.tzinfo is None:
+                start_time = manager.timezone.localize(start_time)
+            if not manager.is_bookable_slot(start_time):
+                start_hour, end_hour = manager.business_hours
+                raise HTTPException(status_code=422, detail=(
+                    f"start_time must be a future {manager.slot_minutes}-minute slot on a weekday "
+                    f"between {start_hour}:00 and {end_hour}:00 {manager.timezone}."
+                ))
+            event_id = manager.schedule_meeting(
+                start_time, body.name, body.email, body.purpose,
+                idempotency_key=body.idempotency_key or idempotency_key
+            )
+        except HTTPException:
+            raise
+        except BookingInProgress:
+            raise HTTPException(
+                status_code=409,
+                detail="A booking with this Idempotency-Key is still in progress; retry shortly.",
+                headers={'Retry-After': '2'}
+            )
+        except Exception as e:
+            print(f"Error in /bookings: {str(e)}")
+            record_error('api.bookings', e)
+            raise HTTPException(status_code=503, detail="Calendar unavailable.")
+        if event_id is None:
+            raise HTTPException(status_code=409, detail="That slot is no longer available.")
+        return {'event_id': event_id, 'start_time': start_time.isoformat()}
+
+    @app.get("/healthz")
+    def healthz():
+        with state.lock:
+            body: Dict[str, Any] = {
+                'status': 'ok',
+                'pid': os.getpid(),
+                'uptime_seconds': round(time.time() - state.started, 1),
+                'inflight': state.inflight - 1,  # Not counting this request
+            }
+        body['resources'] = sorted(
+            name for name in ('db_manager', 'calendar_manager', 'llm_gateway', 'turn_orchestrator', 'session_states')
+            if peek(name) is not None
+        )
+        return body
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def prometheus():
+        return PlainTextResponse(metrics.to_prometheus(), media_type='text/plain; version=0.0.4')
+
+    return app
+
+
+app = create_app()
+
+
+def serve(app_ref: str = "api:app", host: str = "127.0.0.1", port: int = 8000, workers: int = 1,
+          sync_index: bool = True, graceful_timeout: float = 30):
+    """
+    Prepare shared state, then run uvicorn with `workers` processes
+
+    Args:
+        app_ref (str): "module:attribute" of the ASGI app each worker imports
+        host (str): Bind address
+        port (int): Bind port
+        workers (int): Worker processes
+        sync_index (bool): Sync the data files into Chroma before forking
+        graceful_timeout (float): Seconds in-flight requests get on shutdown
+    """
+    import uvicorn
+
+    if sync_index:
+        from utils.database import ChromaDBManager
+        ChromaDBManager()
+    # Workers open the index without writing to it and share one availability snapshot
+    os.environ["DATABASE_SYNC"] = "0"
+    os.environ.setdefault(
+        "AVAILABILITY_SHARED_PATH",
+        os.path.join(tempfile.gettempdir(), f"portfolio-availability-{port}.json")
+    )
+    uvicorn.run(
+        app_ref, host=host, port=port, workers=workers,
+        timeout_graceful_shutdown=graceful_timeout, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the headless Portfolio Assistant API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "1")))
+    parser.add_argument("--app", default="api:app", help="ASGI app as module:attribute")
+    parser.add_argument("--no-sync", action="store_true", help="Skip syncing the Chroma index before starting")
+    parser.add_argument("--graceful-timeout", type=float, default=30)
+    args = parser.parse_args()
+    serve(args.app, args.host, args.port, args.workers, not args.no_sync, args.graceful_timeout)
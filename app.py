@@ -1,15 +1,24 @@
 import streamlit as st
 import os
-import openai
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List
+import uuid
 import requests
 
+from utils.chat_context import PERSONAL_INFO, ChatContext
+from utils.history import ConversationHistory, llm_summarizer
+from utils.llm_gateway import BUSY_MESSAGE, LLMRateLimited, session_scope
+from utils.metrics import metrics, record_error, span, trace
+from utils.registry import get_llm_gateway, get_response_cache, get_turn_orchestrator, start_metrics_exporters
+
 class PortfolioAssistant:
     def __init__(self):
         """Initialize Portfolio Assistant"""
-        # Set OpenAI API key from Streamlit secrets
-        openai.api_key = st.secrets["OPENAI_API_KEY"]
+        # Managers are built once per process and shared across reruns and sessions.
+        # LLM calls go through the gateway, which coalesces identical requests
+        # and rate-limits fairly across sessions.
+        self.llm = get_llm_gateway(api_key=st.secrets["OPENAI_API_KEY"])
         
         # Load personal information
         self.personal_info = self._load_personal_info()
@@ -17,20 +26,27 @@ class PortfolioAssistant:
         # Initialize session state for chat
         if 'messages' not in st.session_state:
             st.session_state.messages = []
+        if 'session_id' not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
+
+        # Keep the prompt within a token budget; older turns become a summary
+        self.history = ConversationHistory(
+            st.session_state,
+            summarize=llm_summarizer(self.llm),
+            budget_tokens=int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+        )
+
+        # Answers to common opening questions are served from a semantic cache
+        self.cache = get_response_cache()
+
+        # Context stages of a turn run in parallel, each bounded by a deadline
+        self.context = ChatContext(self.personal_info, get_turn_orchestrator())
+
+        start_metrics_exporters()
 
     def _load_personal_info(self) -> Dict[str, Any]:
         """Load personal information"""
-        return {
-            "name": "Pavan Tejavath",
-            "title": "Full Stack Developer & ML Engineer",
-            "bio": """Full Stack Developer and Machine Learning enthusiast with a passion for building interactive web applications. 
-            Originally from Hyderabad, India, and currently pursuing a Master's in Computer Science in the United States.""",
-            "skills": {
-                "Programming": ["Python", "JavaScript", "Java"],
-                "Web Development": ["React", "Node.js", "Django"],
-                "ML/AI": ["TensorFlow", "PyTorch", "NLP"]
-            }
-        }
+        return PERSONAL_INFO
 
     def initialize_streamlit(self):
         """Initialize Streamlit configuration"""
@@ -67,33 +83,33 @@ class PortfolioAssistant:
             </style>
             """, unsafe_allow_html=True)
 
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a prompt (see ChatContext)
+
+        Per-stage timings and the critical stage are kept in
+        st.session_state.last_turn_report.
+        """
+        messages, report = self.context.build(prompt, self.history, st.session_state.messages)
+        st.session_state.last_turn_report = report
+        return messages
+
     def generate_response(self, prompt: str) -> str:
         """Generate AI response"""
         try:
-            messages = [
-                {"role": "system", "content": """You are Pavan's AI assistant. Help users learn about his experience, schedule meetings, and answer questions about his skills and projects.
-                When users want to schedule a meeting, guide them to send an email to tejavathpavan2000@gmail.com with their preferred time slots."""}
-            ]
-
-            # Add chat history
-            for message in st.session_state.messages:
-                messages.append({"role": message["role"], "content": message["content"]})
-
-            # Add current prompt
-            messages.append({"role": "user", "content": prompt})
-
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500
-            )
-
-            return response.choices[0].message["content"]
+            return self.llm.chat(self._build_messages(prompt))
+        except LLMRateLimited as e:
+            record_error('llm.gateway', e)
+            return BUSY_MESSAGE
         except Exception as e:
             print(f"Error: {e}")
+            record_error('llm.chat', e)
             return "I apologize, but I'm having trouble generating a response. Please try again."
 
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """Stream the AI response token by token"""
+        return self.llm.stream_chat(self._build_messages(prompt))
+
     def show_chat_interface(self):
         """Display the chat interface"""
         st.title("Chat with Pavan's AI Assistant")
@@ -106,20 +122,103 @@ class PortfolioAssistant:
 
         # Chat input
         if prompt := st.chat_input("Type your message here..."):
-            st.session_state.messages.append({"role": "user", "content": prompt})
             with st.chat_message("user"):
                 st.markdown(prompt)
 
-            # Generate and display response
-            with st.chat_message("assistant"):
-                response = self.generate_response(prompt)
-                st.markdown(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
+            # Every stage of the turn is recorded under one trace id
+            with trace() as trace_id, session_scope(st.session_state.session_id), span('turn') as turn:
+                st.session_state.last_trace_id = trace_id
+
+                # Only opening questions are cached; later ones depend on the conversation
+                cacheable = self.cache is not None and not st.session_state.messages
+                cached = self.cache.lookup(prompt) if cacheable else None
+                turn['cached'] = cached is not None
+
+                # Stream the response as it is generated. The prompt is added to
+                # the history afterwards so it isn't sent twice.
+                with st.chat_message("assistant"):
+                    if cached is not None:
+                        response = cached
+                        st.markdown(response)
+                    else:
+                        started = time.perf_counter()
+                        response = st.write_stream(self.stream_response(prompt))
+                        if cacheable and not self.llm.last_stream_stats.get('error'):
+                            self.cache.store(prompt, response, time.perf_counter() - started)
+
+            st.session_state.messages.append({"role": "user", "content": prompt})
+            st.session_state.messages.append({"role": "assistant", "content": response})
+
+            if os.getenv("METRICS_FILE"):
+                metrics.write_prometheus(os.getenv("METRICS_FILE"))
+
+    def show_stats(self):
+        """Show prompt size per turn and cache effectiveness in the sidebar"""
+        history_metrics = self.history.metrics()
+        if history_metrics['prompt_tokens_per_turn']:
+            with st.sidebar.expander("Conversation stats"):
+                st.caption(
+                    f"Prompt tokens last turn: {history_metrics['last_prompt_tokens']} · "
+                    f"summary: {history_metrics['summary_tokens']} tokens covering "
+                    f"{history_metrics['summarized_messages']} messages"
+                )
+                st.line_chart(history_metrics['prompt_tokens_per_turn'])
+
+        if self.cache is not None:
+            stats = self.cache.get_stats()
+            with st.sidebar.expander("Response cache"):
+                st.caption(
+                    f"Hit rate: {stats['hit_rate']:.0%} ({stats['hits']}/{stats['lookups']}) · "
+                    f"saved ~{stats['saved_seconds']:.1f}s · {stats['entries']} entries"
+                )
+
+    def show_debug_panel(self):
+        """Show per-stage latency and the last turn's trace (enabled with SHOW_DEBUG_PANEL=1)"""
+        if os.getenv("SHOW_DEBUG_PANEL") != "1":
+            return
+
+        def ms(seconds):
+            return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+        with st.sidebar.expander("Latency (debug)"):
+            rows = ["| stage | n | p50 ms | p95 ms | errors |", "|---|---|---|---|---|"]
+            for stage, summary in metrics.stage_summary().items():
+                rows.append(
+                    f"| {stage} | {summary['count']} | {ms(summary['p50'])} | "
+                    f"{ms(summary['p95'])} | {summary['errors']:g} |"
+                )
+            st.markdown("\n".join(rows))
+
+            gateway = self.llm.get_stats()
+            st.caption(
+                f"LLM gateway: {gateway['upstream_calls']} upstream / {gateway['requests']} requests "
+                f"({gateway['coalesced']} coalesced, {gateway['rejected']} rejected) · "
+                f"queue {gateway['queue_depth']} · mean wait {gateway['mean_wait_seconds'] * 1000:.0f} ms"
+            )
+
+            report = st.session_state.get('last_turn_report')
+            if report:
+                stages = ", ".join(
+                    f"{name} {ms(stage['seconds'])} ms" + ("" if stage['status'] == 'ok' else f" ({stage['status']})")
+                    for name, stage in report['stages'].items()
+                )
+                st.caption(
+                    f"Context: {ms(report['wall_seconds'])} ms vs {ms(report['sequential_seconds'])} ms "
+                    f"sequential · critical: {report['critical']} · {stages}"
+                )
+
+            trace_id = st.session_state.get('last_trace_id')
+            if trace_id:
+                st.caption(f"Last turn ({trace_id})")
+                for recorded in metrics.trace(trace_id):
+                    st.text(f"{recorded['stage']:<24} {ms(recorded['seconds']):>9} ms  {recorded['status']}")
 
     def run(self):
         """Main application entry point"""
         self.initialize_streamlit()
         self.show_chat_interface()
+        self.show_stats()
+        self.show_debug_panel()
 
 if __name__ == "__main__":
     assistant = PortfolioAssistant()
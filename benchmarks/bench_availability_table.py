@@ -0,0 +1,76 @@
+"""
+Compare rendering-time availability lookups with the precomputed table
+
+    python -m benchmarks.bench_availability_table
+"""
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from utils.calendar_utils import GoogleCalendarManager
+
+from .fake_calendar import FakeCalendarService, make_busy_week
+
+
+def run(latency: float = 0.15, renders: int = 50) -> Dict[str, Any]:
+    """
+    Time what the widget needs per render: the per-day summary plus one day's free slots
+
+    Args:
+        latency (float): Simulated seconds per Calendar API round-trip
+        renders (int): Widget renders simulated per strategy
+    """
+    service = FakeCalendarService(latency=latency)
+    manager = GoogleCalendarManager(service=service)
+    make_busy_week(service, datetime.now(manager.timezone), days=30, fill=0.4)
+
+    table = manager.availability_table()
+    started = time.perf_counter()
+    while table.snapshot is None:
+        time.sleep(0.005)
+    first_ready = time.perf_counter() - started
+
+    # On demand: one freebusy query per render, as a widget without the table would need
+    service.reset_counters()
+    started = time.perf_counter()
+    for _ in range(renders):
+        on_demand = table.compute()
+    on_demand_seconds = time.perf_counter() - started
+    on_demand_trips = service.round_trips
+
+    service.reset_counters()
+    started = time.perf_counter()
+    for _ in range(renders):
+        summary = table.day_summary()
+        first_day = next(day for day, free, _ in summary if free)
+        slots = table.free_slots(first_day)
+    table_seconds = time.perf_counter() - started
+    table_trips = service.round_trips
+
+    # A booking disappears from the table immediately
+    slot = slots[0]
+    manager.schedule_meeting(slot, 'Bench', 'bench@example.com', 'benchmark')
+    hidden = slot not in table.free_slots(slot.date())
+    table.stop()
+
+    expected = {day: len(slots) for day, slots in on_demand.days.items()}
+    assert all(expected[day] >= free for day, free, _ in summary), 'table offers slots the calendar has booked'
+    return {
+        'first_snapshot_seconds': round(first_ready, 3),
+        'days': len(summary),
+        'free_slots': sum(free for _, free, _ in summary),
+        'on_demand': {
+            'round_trips': on_demand_trips,
+            'ms_per_render': round(on_demand_seconds / renders * 1000, 2),
+        },
+        'table': {
+            'round_trips': table_trips,
+            'ms_per_render': round(table_seconds / renders * 1000, 3),
+        },
+        'booking_hidden_immediately': hidden,
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
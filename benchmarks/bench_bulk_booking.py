@@ -0,0 +1,72 @@
+"""
+Compare booking meetings one at a time with schedule_many
+
+    python -m benchmarks.bench_bulk_booking
+"""
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from utils.availability import business_slots
+from utils.calendar_utils import GoogleCalendarManager
+
+from .fake_calendar import FakeCalendarService, make_busy_week
+
+
+def _requests(tz, count: int) -> List[Dict[str, Any]]:
+    """`count` meeting requests over upcoming business slots, every tenth repeating the one before"""
+    slots = business_slots(datetime.now(tz) + timedelta(days=1), tz)
+    meetings = []
+    for i in range(count):
+        start = meetings[-1]['start_time'] if i % 10 == 9 else next(slots)
+        meetings.append({
+            'start_time': start,
+            'name': f"Candidate {i}",
+            'email': f"candidate{i}@example.com",
+            'purpose': 'Interview',
+        })
+    return meetings
+
+
+def run(latency: float = 0.02, count: int = 120) -> Dict[str, Any]:
+    """
+    Book the same request list sequentially and in bulk on fresh calendars
+
+    Args:
+        latency (float): Simulated seconds per Calendar API round-trip
+        count (int): Number of meetings requested
+    """
+    results = {}
+    outcomes = {}
+    for name in ('sequential', 'schedule_many'):
+        service = FakeCalendarService(latency=latency)
+        manager = GoogleCalendarManager(service=service)
+        make_busy_week(service, datetime.now(manager.timezone) + timedelta(days=1), days=14, fill=0.2)
+        meetings = _requests(manager.timezone, count)
+
+        service.reset_counters()
+        started = time.perf_counter()
+        if name == 'sequential':
+            outcomes[name] = [
+                manager.schedule_meeting(m['start_time'], m['name'], m['email'], m['purpose']) is not None
+                for m in meetings
+            ]
+        else:
+            outcomes[name] = [r['status'] == 'scheduled' for r in manager.schedule_many(meetings)]
+        elapsed = time.perf_counter() - started
+
+        results[name] = {
+            'scheduled': sum(outcomes[name]),
+            'rejected': count - sum(outcomes[name]),
+            'round_trips': service.round_trips,
+            'seconds': round(elapsed, 4),
+        }
+
+    assert outcomes['sequential'] == outcomes['schedule_many'], 'bulk booking disagrees with sequential'
+    results['speedup'] = round(results['sequential']['seconds'] / results['schedule_many']['seconds'], 1)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,66 @@
+"""
+Compare availability checks against the live API and the local mirror
+
+    python -m benchmarks.bench_calendar_mirror
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from utils.availability import business_slots
+from utils.calendar_mirror import CalendarMirror
+from utils.calendar_utils import GoogleCalendarManager
+
+from .fake_calendar import FakeCalendarService, make_busy_week
+
+
+def run(latency: float = 0.01, checks: int = 200) -> Dict[str, Any]:
+    """
+    Time `checks` availability lookups with and without the mirror
+
+    Args:
+        latency (float): Simulated seconds per Calendar API round-trip
+        checks (int): Number of slots checked per strategy
+    """
+    service = FakeCalendarService(latency=latency)
+    tz = GoogleCalendarManager(service=service).timezone
+    make_busy_week(service, datetime.now(tz), days=14, fill=0.6)
+    candidates = business_slots(datetime.now(tz), tz)
+    slots = [next(candidates) for _ in range(checks)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror = CalendarMirror(os.path.join(tmp, 'mirror.db'), timezone=tz)
+        strategies = {
+            'live': GoogleCalendarManager(service=service),
+            'mirror': GoogleCalendarManager(service=service, mirror=mirror, max_staleness=60),
+        }
+
+        results = {}
+        answers = {}
+        for name, manager in strategies.items():
+            service.reset_counters()
+            started = time.perf_counter()
+            answers[name] = [manager.check_availability(slot) for slot in slots]
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                'round_trips': service.round_trips,
+                'seconds': round(elapsed, 4),
+                'us_per_check': round(elapsed / checks * 1e6, 1),
+            }
+
+        # Bookings are applied to the mirror immediately
+        manager = strategies['mirror']
+        free_slot = slots[answers['mirror'].index(True)]
+        manager.schedule_meeting(free_slot, 'Bench', 'bench@example.com', 'benchmark')
+        results['mirror_sees_booking'] = not manager.check_availability(free_slot)
+        mirror.close()
+
+    assert answers['live'] == answers['mirror'], 'mirror disagrees with live freebusy'
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
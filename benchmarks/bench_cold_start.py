@@ -0,0 +1,92 @@
+"""
+Import time of the utils package and per-rerun cost of building managers
+
+    python -m benchmarks.bench_cold_start
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTS = {
+    # What `import utils` used to pull in eagerly
+    'eager_all_managers': 'import utils.database, utils.calendar_utils, utils.llm_utils, utils.audio_utils',
+    'lazy_chat_only': 'from utils import OpenAIManager',
+}
+
+
+def _import_seconds(statement: str, repeats: int) -> float:
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def run(repeats: int = 3, reruns: int = 20) -> Dict[str, Any]:
+    """
+    Args:
+        repeats (int): Fresh interpreters per import measurement
+        reruns (int): Simulated Streamlit reruns per strategy
+    """
+    results: Dict[str, Any] = {
+        'import_ms': {name: round(_import_seconds(stmt, repeats) * 1000, 1) for name, stmt in IMPORTS.items()}
+    }
+
+    from utils import registry
+    from utils.calendar_utils import GoogleCalendarManager
+    from utils.database import ChromaDBManager
+
+    from .fake_calendar import FakeCalendarService
+    from .fake_embeddings import HashingEmbeddingFunction
+
+    service = FakeCalendarService(latency=0.05)
+    embedder = HashingEmbeddingFunction()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = tmp
+        try:
+            # Build the collection once so both strategies start from the same state
+            ChromaDBManager(embedding_function=embedder)
+
+            def build_managers():
+                return (
+                    ChromaDBManager(embedding_function=embedder),
+                    GoogleCalendarManager(service=service),
+                )
+
+            def registry_managers():
+                return (
+                    registry.get_resource('bench_db', lambda: ChromaDBManager(embedding_function=embedder)),
+                    registry.get_resource('bench_calendar', lambda: GoogleCalendarManager(service=service)),
+                )
+
+            for name, rerun in (('rebuild_every_rerun', build_managers), ('registry_rerun', registry_managers)):
+                samples = []
+                for _ in range(reruns):
+                    started = time.perf_counter()
+                    rerun()
+                    samples.append(time.perf_counter() - started)
+                results[f'{name}_ms'] = {
+                    'first': round(samples[0] * 1000, 2),
+                    'median': round(statistics.median(samples) * 1000, 3),
+                }
+        finally:
+            os.environ.pop('DATABASE_PATH', None)
+            registry.reset('bench_db')
+            registry.reset('bench_calendar')
+
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
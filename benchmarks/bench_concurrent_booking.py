@@ -0,0 +1,107 @@
+"""
+Stress concurrent bookings of overlapping slots with and without leases
+
+    python -m benchmarks.bench_concurrent_booking
+"""
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from dateutil.parser import isoparse
+
+from utils.calendar_utils import BookingInProgress, GoogleCalendarManager
+from utils.reservations import ReservationStore
+
+from .fake_calendar import FakeCalendarService
+
+
+def _double_bookings(service: FakeCalendarService) -> int:
+    """Number of booked events that overlap the previous one"""
+    events = sorted(
+        (isoparse(e['start']['dateTime']), isoparse(e['end']['dateTime']))
+        for e in service.calendars[service.calendar_id].values()
+        if e.get('status') != 'cancelled'
+    )
+    return sum(1 for (_, prev_end), (start, _) in zip(events, events[1:]) if start < prev_end)
+
+
+def _stress(
+    manager: GoogleCalendarManager,
+    service: FakeCalendarService,
+    threads: int,
+    candidates: List[datetime],
+    seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    # Every fifth submission is a retry of an earlier one with the same key
+    keys = [f"booking-{rng.randrange(i)}" if i and i % 5 == 0 else f"booking-{i}" for i in range(threads)]
+    starts = [candidates[rng.randrange(len(candidates))] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def book(i: int) -> Optional[str]:
+        barrier.wait()
+        try:
+            return manager.schedule_meeting(starts[i], f"Guest {i}", f"guest{i}@example.com", 'stress', keys[i])
+        except BookingInProgress:
+            # A retry racing its original; the original reports the booking
+            return None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(book, range(threads)))
+    elapsed = time.perf_counter() - started
+
+    events = service.calendars[service.calendar_id]
+    return {
+        'attempts': threads,
+        'booked': sum(1 for event_id in outcomes if event_id),
+        'events_created': len(events),
+        'double_bookings': _double_bookings(service),
+        'seconds': round(elapsed, 3),
+        'attempts_per_second': round(threads / elapsed, 1),
+    }
+
+
+def run(threads: int = 300, latency: float = 0.01, seed: int = 7) -> Dict[str, Any]:
+    """
+    Have `threads` sessions book 30-minute slots starting every 15 minutes at once
+
+    Args:
+        threads (int): Concurrent booking attempts
+        latency (float): Simulated seconds per Calendar API round-trip
+        seed (int): Seed for slot and retry selection
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('unguarded', 'leased'):
+            service = FakeCalendarService(latency=latency)
+            reservations = ReservationStore(os.path.join(tmp, 'reservations.db')) if name == 'leased' else None
+            manager = GoogleCalendarManager(service=service, reservations=reservations)
+            day = datetime.now(manager.timezone).replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            candidates = [day + timedelta(minutes=15 * i) for i in range(32)]
+            results[name] = _stress(manager, service, threads, candidates, seed)
+
+        # A retried submission returns the first event instead of booking again
+        service = FakeCalendarService()
+        manager = GoogleCalendarManager(
+            service=service,
+            reservations=ReservationStore(os.path.join(tmp, 'retry.db'))
+        )
+        slot = datetime.now(manager.timezone).replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=2)
+        first = manager.schedule_meeting(slot, 'Guest', 'guest@example.com', 'retry', 'form-42')
+        second = manager.schedule_meeting(slot, 'Guest', 'guest@example.com', 'retry', 'form-42')
+        results['retry_returns_same_event'] = first is not None and first == second
+        results['retry_events_created'] = len(service.calendars[service.calendar_id])
+
+    assert results['leased']['double_bookings'] == 0, 'leases allowed a double booking'
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,87 @@
+"""
+Embedding work saved by the query and document caches
+
+    python -m benchmarks.bench_embedding_cache
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict
+
+from .corpus import generate_corpus, write_jsonl
+from .fake_embeddings import HashingEmbeddingFunction
+
+
+class CountingEmbeddingFunction(HashingEmbeddingFunction):
+    """Hashing embedder that counts texts and adds a per-text model cost"""
+
+    def __init__(self, cost: float = 0.0005):
+        super().__init__()
+        self.cost = cost
+        self.texts = 0
+
+    def __call__(self, input):
+        self.texts += len(input)
+        time.sleep(self.cost * len(input))
+        return super().__call__(input)
+
+
+def run(size: int = 2000, queries: int = 500, distinct_queries: int = 50) -> Dict[str, Any]:
+    """
+    Ingest a corpus, rebuild the collection, and replay repeated queries
+
+    Args:
+        size (int): Corpus size
+        queries (int): Queries replayed
+        distinct_queries (int): Distinct query strings among them
+    """
+    items = generate_corpus(size)
+    rng = random.Random(0)
+    query_pool = [f"{item['tags'][0]} {item['type']}" for item in rng.sample(items, distinct_queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = tmp
+        try:
+            from utils.database import ChromaDBManager
+
+            embedder = CountingEmbeddingFunction()
+            db = ChromaDBManager(embedding_function=embedder)
+            corpus_path = os.path.join(tmp, 'corpus.jsonl')
+            write_jsonl(items, corpus_path)
+
+            started = time.perf_counter()
+            db.pipeline.sync_source(corpus_path, 'corpus')
+            first_ingest = (time.perf_counter() - started, embedder.texts)
+
+            # Rebuild from scratch: every document vector comes from disk
+            db.delete_all()
+            before = embedder.texts
+            started = time.perf_counter()
+            db.pipeline.sync_source(corpus_path, 'corpus')
+            rebuild = (time.perf_counter() - started, embedder.texts - before)
+
+            before = embedder.texts
+            started = time.perf_counter()
+            for _ in range(queries):
+                db.search_similar(rng.choice(query_pool), hybrid=False)
+            query_time = time.perf_counter() - started
+            stats = db.embedder.get_stats()
+        finally:
+            os.environ.pop('DATABASE_PATH', None)
+
+    return {
+        'first_ingest': {'seconds': round(first_ingest[0], 2), 'texts_embedded': first_ingest[1]},
+        'rebuild': {'seconds': round(rebuild[0], 2), 'texts_embedded': rebuild[1]},
+        'queries': {
+            'count': queries,
+            'texts_embedded': embedder.texts - before,
+            'ms_per_query': round(query_time / queries * 1000, 2),
+        },
+        'cache': stats,
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
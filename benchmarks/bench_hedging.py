@@ -0,0 +1,102 @@
+"""
+Tail latency with and without hedged requests against a stub that stalls
+
+    python -m benchmarks.bench_hedging
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+from utils.hedging import HedgePolicy
+from utils.llm_utils import OpenAIManager
+
+from .bench_hybrid_retrieval import _percentile
+from .openai_stub import StubConfig, start_stub
+
+MESSAGES = [{'role': 'user', 'content': 'What are his skills?'}]
+
+
+def _drive(llm: OpenAIManager, kind: str, requests: int, concurrency: int) -> List[float]:
+    """Latency of each request (full answer for chat, first token for stream)"""
+    latencies: List[float] = []
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def worker():
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            started = time.perf_counter()
+            if kind == 'chat':
+                llm.chat(MESSAGES)
+                elapsed = time.perf_counter() - started
+            else:
+                stream = llm.stream_chat(MESSAGES)
+                next(stream)
+                elapsed = time.perf_counter() - started
+                for _ in stream:
+                    pass
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def run(requests: int = 300, concurrency: int = 10, base_delay: float = 0.05, jitter: float = 0.03,
+        stall_probability: float = 0.03, stall_seconds: float = 1.0, max_hedge_rate: float = 0.1) -> Dict[str, Any]:
+    """
+    Streams are measured twice: stalling after the response headers, and
+    stalling before them as an upstream that queues the request does
+
+    Args:
+        requests (int): Requests per mode
+        concurrency (int): Concurrent callers
+        base_delay (float): Stub delay before the first token
+        jitter (float): Uniform extra delay per request
+        stall_probability (float): Fraction of upstream calls that stall
+        stall_seconds (float): Extra delay of a stalled call
+        max_hedge_rate (float): Hedge budget
+    """
+    results: Dict[str, Any] = {'stall_probability': stall_probability, 'stall_seconds': stall_seconds}
+    for label, kind, delay_headers in (('chat', 'chat', False), ('stream', 'stream', False),
+                                       ('stream_queued', 'stream', True)):
+        for hedged in (False, True):
+            config = StubConfig(tokens=10, first_token_delay=base_delay, token_delay=0.002, jitter=jitter,
+                                stall_probability=stall_probability, stall_seconds=stall_seconds,
+                                delay_headers=delay_headers, seed=11)
+            server, base_url = start_stub(config)
+            os.environ['OPENAI_API_BASE'] = base_url
+            try:
+                policy = HedgePolicy(max_hedge_rate=max_hedge_rate, initial_delay=stall_seconds) if hedged else None
+                llm = OpenAIManager(api_key='stub', hedging=policy)
+                latencies = _drive(llm, kind, requests, concurrency)
+            finally:
+                server.shutdown()
+                os.environ.pop('OPENAI_API_BASE', None)
+
+            row = {
+                'p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+                'p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+                'p99_ms': round(_percentile(latencies, 99) * 1000, 1),
+                'upstream_calls': config.requests,
+            }
+            if policy is not None:
+                stats = policy.get_stats()
+                row['hedge_rate'] = round(stats['hedge_rate'], 3)
+                row['hedge_wins'] = stats['hedge_wins']
+                row['hedge_delay_ms'] = round(stats['delays'][kind] * 1000, 1)
+            results[f"{label}_{'hedged' if hedged else 'plain'}"] = row
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,53 @@
+"""
+Show prompt size levelling off in long conversations
+
+    python -m benchmarks.bench_history
+"""
+import json
+from typing import Any, Dict, List
+
+from utils.history import ConversationHistory, count_message_tokens
+
+SYSTEM = [{"role": "system", "content": "You are Pavan's AI assistant."}]
+
+
+def run(turns: int = 200, budget_tokens: int = 1500) -> Dict[str, Any]:
+    """
+    Simulate a long chat with a local summarizer and compare prompt sizes
+    with sending the full history every turn
+
+    Args:
+        turns (int): Number of user/assistant exchanges
+        budget_tokens (int): History token budget
+    """
+    calls = {'summarize': 0}
+
+    def summarize(previous: str, evicted: List[Dict[str, str]]) -> str:
+        calls['summarize'] += 1
+        # Stand-in for the LLM: keep the first words of each evicted turn
+        notes = ' '.join(m['content'].split()[0] for m in evicted)
+        return (previous + ' ' + notes)[-1000:]
+
+    state: Dict[str, Any] = {}
+    history = ConversationHistory(state, summarize, budget_tokens=budget_tokens, max_log=turns)
+    messages: List[Dict[str, str]] = []
+    full_history = []
+
+    for turn in range(turns):
+        prompt = f"Question {turn}: tell me about project number {turn} and the stack it used. " * 3
+        history.build(SYSTEM, messages, prompt)
+        full_history.append(count_message_tokens(SYSTEM + messages + [{"role": "user", "content": prompt}]))
+        messages.append({"role": "user", "content": prompt})
+        messages.append({"role": "assistant", "content": f"Answer {turn}: " + "details " * 80})
+
+    log = history.metrics()['prompt_tokens_per_turn']
+    return {
+        'turns': turns,
+        'budgeted_prompt_tokens': {'turn_10': log[9], 'turn_100': log[99], 'last': log[-1], 'max': max(log)},
+        'full_history_prompt_tokens': {'turn_10': full_history[9], 'turn_100': full_history[99], 'last': full_history[-1]},
+        'summarizer_calls': calls['summarize'],
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,77 @@
+"""
+Recall and latency of vector-only vs. hybrid retrieval on a synthetic corpus
+
+    python -m benchmarks.bench_hybrid_retrieval
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from .corpus import generate_corpus, write_jsonl
+from .fake_embeddings import HashingEmbeddingFunction
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+
+def run(size: int = 20000, queries: int = 200, k: int = 5, seed: int = 1) -> Dict[str, Any]:
+    """
+    Each query names one document's unique codename plus a framework it
+    uses; recall@k counts how often that document is returned.
+
+    Args:
+        size (int): Corpus size
+        queries (int): Number of queries
+        k (int): Results per query
+        seed (int): Random seed for query selection
+    """
+    rng = random.Random(seed)
+    items = generate_corpus(size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = tmp
+        try:
+            from utils.database import ChromaDBManager
+
+            db = ChromaDBManager(embedding_function=HashingEmbeddingFunction())
+            corpus_path = os.path.join(tmp, 'corpus.jsonl')
+            write_jsonl(items, corpus_path)
+            db.pipeline.batch_size = 512
+            ingest = db.pipeline.sync_source(corpus_path, 'corpus')
+
+            targets = rng.sample(range(size), queries)
+            results: Dict[str, Any] = {'corpus_size': size, 'ingest_docs_per_second': ingest['docs_per_second']}
+            for mode, kwargs in (
+                ('vector', {'hybrid': False}),
+                ('hybrid', {'hybrid': True}),
+                ('hybrid_tag_filter', {'hybrid': True, 'filtered': True}),
+            ):
+                hits = 0
+                latencies = []
+                for index in targets:
+                    item = items[index]
+                    query = f"{item['tags'][0]} project codename zx{index:06d}"
+                    search_kwargs = {'hybrid': kwargs['hybrid']}
+                    if kwargs.get('filtered'):
+                        search_kwargs['tags'] = [item['tags'][1]]
+                    started = time.perf_counter()
+                    found = db.search_similar(query, n_results=k, **search_kwargs)
+                    latencies.append(time.perf_counter() - started)
+                    hits += any(f"zx{index:06d}" in doc for doc in found['documents'])
+                results[mode] = {
+                    f'recall_at_{k}': round(hits / queries, 3),
+                    'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+                    'p95_ms': round(_percentile(latencies, 95) * 1000, 2),
+                }
+        finally:
+            os.environ.pop('DATABASE_PATH', None)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,128 @@
+"""
+Upstream calls saved by coalescing, and per-session waits under a rate limit
+
+    python -m benchmarks.bench_llm_gateway
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from utils.llm_gateway import LLMGateway, session_scope
+from utils.llm_utils import OpenAIManager
+from utils.metrics import metrics
+
+from .openai_stub import StubConfig, start_stub
+
+QUESTIONS = ["What are his skills?", "How do I book a meeting?", "What projects has he built?"]
+
+
+def _burst(calls: List[Callable[[], Any]]) -> List[Any]:
+    """Start every call at the same moment on its own thread and collect the results"""
+    results: List[Any] = [None] * len(calls)
+    barrier = threading.Barrier(len(calls))
+
+    def worker(index: int):
+        barrier.wait()
+        results[index] = calls[index]()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(calls))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _fairness(llm: OpenAIManager, rpm: float, heavy: int, light: int, share_session: bool) -> Dict[str, Any]:
+    """
+    One session queues `heavy` distinct requests, then `light` other sessions
+    send one each; returns how long the light sessions waited
+    """
+    gateway = LLMGateway(llm, rpm=rpm, burst_seconds=60 / rpm)
+    waits: Dict[str, List[float]] = {'heavy': [], 'light': []}
+    lock = threading.Lock()
+
+    def ask(kind: str, session: str, prompt: str):
+        started = time.perf_counter()
+        with session_scope(session):
+            gateway.generate_response(prompt)
+        with lock:
+            waits[kind].append(time.perf_counter() - started)
+
+    threads = [
+        threading.Thread(target=ask, args=('heavy', 'heavy', f"Question {i}"))
+        for i in range(heavy)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    for i in range(light):
+        session = 'heavy' if share_session else f'light-{i}'
+        thread = threading.Thread(target=ask, args=('light', session, f"Light question {i}"))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    return {
+        'light_median_s': round(statistics.median(waits['light']), 2),
+        'light_max_s': round(max(waits['light']), 2),
+        'heavy_max_s': round(max(waits['heavy']), 2),
+        'max_queue_wait_s': round(gateway.get_stats()['max_wait_seconds'], 2),
+    }
+
+
+def run(visitors: int = 30, first_token_delay: float = 0.3, rpm: float = 600, heavy: int = 20, light: int = 5) -> Dict[str, Any]:
+    """
+    Args:
+        visitors (int): Concurrent sessions asking the suggested questions
+        first_token_delay (float): Stub latency before the first token
+        rpm (float): Requests per minute for the fairness run
+        heavy (int): Requests queued by the heavy session
+        light (int): Sessions sending one request each behind it
+    """
+    config = StubConfig(tokens=20, first_token_delay=first_token_delay, token_delay=0.005)
+    server, base_url = start_stub(config)
+    os.environ['OPENAI_API_BASE'] = base_url
+    metrics.reset()
+    results: Dict[str, Any] = {'visitors': visitors, 'distinct_questions': len(QUESTIONS)}
+    try:
+        llm = OpenAIManager(api_key='stub')
+        prompts = [QUESTIONS[i % len(QUESTIONS)] for i in range(visitors)]
+
+        config.requests = 0
+        started = time.perf_counter()
+        _burst([lambda p=p: llm.generate_response(p) for p in prompts])
+        results['direct'] = {'upstream_calls': config.requests, 'seconds': round(time.perf_counter() - started, 2)}
+
+        gateway = LLMGateway(llm)
+        config.requests = 0
+        started = time.perf_counter()
+        answers = _burst([lambda p=p: gateway.generate_response(p) for p in prompts])
+        assert len(set(answers)) == 1 and answers[0] == config.text * config.tokens, 'coalesced answers differ'
+        results['gateway_chat'] = {'upstream_calls': config.requests, 'seconds': round(time.perf_counter() - started, 2)}
+
+        config.requests = 0
+        started = time.perf_counter()
+        streams = _burst([lambda p=p: ''.join(gateway.stream_response(p)) for p in prompts])
+        assert all(text == config.text * config.tokens for text in streams), 'coalesced streams differ'
+        results['gateway_stream'] = {'upstream_calls': config.requests, 'seconds': round(time.perf_counter() - started, 2)}
+
+        config.first_token_delay = 0.01
+        config.tokens = 1
+        results['rate_limited'] = {
+            'rpm': rpm,
+            'fifo_one_queue': _fairness(llm, rpm, heavy, light, share_session=True),
+            'fair_per_session': _fairness(llm, rpm, heavy, light, share_session=False),
+        }
+    finally:
+        server.shutdown()
+        os.environ.pop('OPENAI_API_BASE', None)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
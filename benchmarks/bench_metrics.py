@@ -0,0 +1,70 @@
+"""
+Measure instrumentation overhead and show a traced chat turn
+
+    python -m benchmarks.bench_metrics
+"""
+import json
+import os
+import time
+from typing import Any, Dict
+
+from utils.metrics import MetricsRegistry, metrics, span, trace
+from utils.llm_utils import OpenAIManager
+
+from .openai_stub import StubConfig, start_stub
+
+
+def _per_call_ns(func, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def run(calls: int = 100_000) -> Dict[str, Any]:
+    """
+    Args:
+        calls (int): Iterations per overhead measurement
+    """
+    registry = MetricsRegistry()
+
+    def empty_span():
+        with span('bench.empty'):
+            pass
+
+    results: Dict[str, Any] = {
+        'baseline_ns': round(_per_call_ns(lambda: None, calls), 1),
+        'observe_ns': round(_per_call_ns(lambda: registry.observe('bench', 0.01, stage='x'), calls), 1),
+        'span_ns': round(_per_call_ns(empty_span, calls), 1),
+    }
+
+    # One streamed turn against the local stub, traced end to end
+    server, base_url = start_stub(StubConfig(tokens=40, first_token_delay=0.15, token_delay=0.005))
+    os.environ['OPENAI_API_BASE'] = base_url
+    try:
+        llm = OpenAIManager(api_key='stub')
+        with trace() as trace_id, span('turn'):
+            with span('prompt.assembly'):
+                messages = llm._build_messages('What are his skills?')
+            ''.join(llm.stream_chat(messages))
+    finally:
+        server.shutdown()
+
+    results['turn'] = {
+        recorded['stage']: round(recorded['seconds'] * 1000, 2)
+        for recorded in metrics.trace(trace_id)
+    }
+    started = time.perf_counter()
+    exposition = metrics.to_prometheus()
+    results['prometheus_render_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    assert f"# TYPE {metrics.namespace}_stage_seconds histogram" in exposition, "stage histogram missing from exposition"
+    assert 'stage="llm.ttft"' in exposition, "traced turn missing from exposition"
+    results['prometheus_sample'] = [
+        line for line in exposition.splitlines()
+        if 'stage="llm.ttft"' in line and ('le="0.25"' in line or '_count' in line)
+    ]
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
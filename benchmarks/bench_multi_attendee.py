@@ -0,0 +1,136 @@
+"""
+Compare per-slot multi-calendar checks with the bitmap availability engine
+
+    python -m benchmarks.bench_multi_attendee
+"""
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pytz
+
+from utils.availability import AvailabilityEngine, BusyIntervals, SlotGrid, WorkingHours
+from utils.calendar_utils import GoogleCalendarManager
+
+from .fake_calendar import FakeCalendarService
+
+ZONES = ['America/New_York', 'America/Chicago', 'America/Denver', 'America/Los_Angeles', 'Europe/London']
+
+
+def _populate(
+    service: FakeCalendarService,
+    calendar_ids: List[str],
+    start: datetime,
+    days: int,
+    density: float,
+    seed: int
+):
+    """Book each 30-minute slot of every calendar with probability `density`"""
+    rng = random.Random(seed)
+    step = timedelta(minutes=30)
+    for cid in calendar_ids:
+        slot = start
+        for _ in range(days * 48):
+            if rng.random() < density:
+                service.add_busy(slot, slot + step * rng.choice((1, 2)), calendar_id=cid)
+            slot += step
+
+
+def _per_slot(grid: SlotGrid, busy: Dict[str, BusyIntervals], hours: Dict[str, WorkingHours]) -> np.ndarray:
+    """Reference answer: check every slot against every calendar in Python"""
+    step = timedelta(seconds=grid.step)
+    free = np.zeros(grid.size, dtype=bool)
+    for i in range(grid.size):
+        start = grid.slot(i)
+        end = start + step
+        ok = True
+        for cid, intervals in busy.items():
+            h = hours[cid]
+            local_start = start.astimezone(h.tz)
+            local_end = end.astimezone(h.tz)
+            day = local_start.replace(hour=0, minute=0, second=0, microsecond=0).replace(tzinfo=None)
+            window_start = h.tz.localize(day + timedelta(hours=h.start_hour))
+            window_end = h.tz.localize(day + timedelta(hours=h.end_hour))
+            if (local_start.weekday() not in h.weekdays or local_start < window_start
+                    or local_end > window_end or not intervals.is_free(start, end)):
+                ok = False
+                break
+        free[i] = ok
+    return free
+
+
+def run(calendar_counts=(4, 12, 24, 48), days: int = 30, slot_minutes: int = 15,
+        density: float = 0.01, seed: int = 3) -> Dict[str, Any]:
+    """
+    Find common free slots for growing attendee lists
+
+    Args:
+        calendar_counts: Attendee list sizes to measure (host included)
+        days (int): Search horizon
+        slot_minutes (int): Grid resolution
+        density (float): Chance each half hour is busy on a calendar
+        seed (int): Seed for generated calendars
+    """
+    service = FakeCalendarService()
+    manager = GoogleCalendarManager(service=service)
+    manager.slot_minutes = slot_minutes
+    now = datetime.now(manager.timezone)
+    ids = [manager.calendar_id] + [f"colleague{i}@example.com" for i in range(max(calendar_counts) - 1)]
+    _populate(service, ids, now.replace(minute=0, second=0, microsecond=0), days + 1, density, seed)
+    hours = {cid: WorkingHours(pytz.timezone(ZONES[i % len(ZONES)]), 8, 18) for i, cid in enumerate(ids)}
+    grid = SlotGrid(now, days=days, slot_minutes=slot_minutes)
+
+    results: Dict[str, Any] = {'slots': grid.size, 'days': days, 'slot_minutes': slot_minutes}
+    for count in calendar_counts:
+        attendees = ids[:count]
+        service.reset_counters()
+        started = time.perf_counter()
+        busy = manager.get_busy_intervals_many(attendees, grid.start, grid.end)
+        fetch_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        engine = AvailabilityEngine(grid)
+        for cid in attendees:
+            engine.add_calendar(cid, busy[cid], hours[cid])
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        common = engine.common_free()
+        top = engine.earliest(5, duration_slots=2)
+        intersect_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reference = _per_slot(grid, busy, hours)
+        per_slot_seconds = time.perf_counter() - started
+
+        assert np.array_equal(common, reference), f"bitmap disagrees with per-slot check for {count} calendars"
+        results[f"{count}_calendars"] = {
+            'freebusy_queries': service.round_trips,
+            'freebusy_fetch_ms': round(fetch_seconds * 1000, 2),
+            'common_free_slots': int(common.sum()),
+            'first_slot': top[0].isoformat() if top else None,
+            'bitmap_build_ms': round(build_seconds * 1000, 2),
+            'bitmap_intersect_ms': round(intersect_seconds * 1000, 3),
+            'per_slot_ms': round(per_slot_seconds * 1000, 1),
+            'speedup': round(per_slot_seconds / (build_seconds + intersect_seconds), 1),
+            'bytes_per_calendar': int(engine.bitmaps[attendees[0]].nbytes),
+        }
+
+    # End to end through the manager: host plus three colleagues
+    manager.slot_minutes = 30
+    service.reset_counters()
+    started = time.perf_counter()
+    slots = manager.find_common_slots(ids[1:4], num_slots=5, working_hours=hours)
+    results['find_common_slots'] = {
+        'seconds': round(time.perf_counter() - started, 4),
+        'round_trips': service.round_trips,
+        'slots': [slot.isoformat() for slot in slots],
+    }
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,63 @@
+"""
+Retrieval latency against corpus size
+
+    python -m benchmarks.bench_retrieval_scaling
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from .bench_hybrid_retrieval import _percentile
+from .corpus import generate_corpus, write_jsonl
+from .fake_embeddings import HashingEmbeddingFunction
+
+
+def run(sizes=(500, 2000, 8000), queries: int = 100, k: int = 5, seed: int = 2) -> Dict[str, Any]:
+    """
+    Ingest corpora of increasing size and time search_similar on each
+
+    Args:
+        sizes (tuple): Corpus sizes
+        queries (int): Queries per size and mode
+        k (int): Results per query
+        seed (int): Random seed for query selection
+    """
+    rng = random.Random(seed)
+    results: Dict[str, Any] = {}
+    for size in sizes:
+        items = generate_corpus(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ['DATABASE_PATH'] = tmp
+            try:
+                from utils.database import ChromaDBManager
+
+                db = ChromaDBManager(embedding_function=HashingEmbeddingFunction())
+                corpus_path = os.path.join(tmp, 'corpus.jsonl')
+                write_jsonl(items, corpus_path)
+                db.pipeline.batch_size = 512
+                ingest = db.pipeline.sync_source(corpus_path, 'corpus')
+
+                targets = [rng.randrange(size) for _ in range(queries)]
+                row: Dict[str, Any] = {'ingest_docs_per_second': ingest['docs_per_second']}
+                for mode, hybrid in (('vector', False), ('hybrid', True)):
+                    latencies: List[float] = []
+                    for index in targets:
+                        query = f"{items[index]['tags'][0]} project codename zx{index:06d}"
+                        started = time.perf_counter()
+                        db.search_similar(query, n_results=k, hybrid=hybrid)
+                        latencies.append(time.perf_counter() - started)
+                    row[mode] = {
+                        'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+                        'p95_ms': round(_percentile(latencies, 95) * 1000, 2),
+                    }
+                results[str(size)] = row
+            finally:
+                os.environ.pop('DATABASE_PATH', None)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
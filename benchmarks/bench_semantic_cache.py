@@ -0,0 +1,65 @@
+"""
+Replay a stream of visitor questions through the semantic response cache
+
+    python -m benchmarks.bench_semantic_cache
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict
+
+QUESTIONS = [
+    ["What are his skills?", "what are his skills", "What skills does he have?"],
+    ["How do I book a meeting?", "how do I book a meeting", "How can I book a meeting with him?"],
+    ["What projects has he built?", "What projects has he built", "Which projects has he built?"],
+    ["Where did he study?", "where did he study?", "Where did he go to university?"],
+    ["What is his experience with machine learning?", "What's his experience with machine learning?"],
+]
+
+
+def run(requests: int = 200, llm_latency: float = 0.5, max_distance: float = 0.15, seed: int = 0) -> Dict[str, Any]:
+    """
+    Args:
+        requests (int): Questions replayed
+        llm_latency (float): Simulated seconds per LLM call, counted not slept
+        max_distance (float): Cache hit threshold
+        seed (int): Random seed for the question stream
+    """
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = tmp
+        try:
+            from utils.database import ChromaDBManager
+            from utils.semantic_cache import SemanticCache
+
+            from .fake_embeddings import HashingEmbeddingFunction
+
+            db = ChromaDBManager(embedding_function=HashingEmbeddingFunction())
+            cache = SemanticCache(db, max_distance=max_distance)
+            lookup_times = []
+            for _ in range(requests):
+                question = rng.choice(rng.choice(QUESTIONS))
+                started = time.perf_counter()
+                answer = cache.lookup(question)
+                lookup_times.append(time.perf_counter() - started)
+                if answer is None:
+                    cache.store(question, f"Answer to: {question}", latency=llm_latency)
+            stats = cache.get_stats()
+        finally:
+            os.environ.pop('DATABASE_PATH', None)
+
+    lookup_times.sort()
+    return {
+        'requests': requests,
+        'hit_rate': round(stats['hit_rate'], 3),
+        'entries': stats['entries'],
+        'llm_seconds_saved': round(stats['saved_seconds'], 1),
+        'lookup_p50_ms': round(lookup_times[len(lookup_times) // 2] * 1000, 2),
+        'lookup_p95_ms': round(lookup_times[int(len(lookup_times) * 0.95)] * 1000, 2),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,68 @@
+"""
+Compare the per-slot availability loop with the batched slot finder
+
+    python -m benchmarks.bench_slot_search
+"""
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from utils.availability import business_slots
+from utils.calendar_utils import GoogleCalendarManager
+
+from .fake_calendar import FakeCalendarService, make_busy_week
+
+
+def _per_slot_search(manager: GoogleCalendarManager, num_slots: int) -> List[datetime]:
+    """The original search: one freebusy round-trip per candidate slot"""
+    slots = []
+    now = datetime.now(manager.timezone)
+    for slot in business_slots(now, manager.timezone, manager.slot_minutes, *manager.business_hours):
+        if manager.check_availability(slot):
+            slots.append(slot)
+            if len(slots) >= num_slots:
+                break
+    return slots
+
+
+def run(latency: float = 0.01, busy_days: int = 5, num_slots: int = 5) -> Dict[str, Any]:
+    """
+    Run both search strategies against a fake calendar
+
+    Args:
+        latency (float): Simulated seconds per Calendar API round-trip
+        busy_days (int): Number of fully booked days ahead of now
+        num_slots (int): Slots requested from each search
+    """
+    service = FakeCalendarService(latency=latency)
+    manager = GoogleCalendarManager(service=service)
+    make_busy_week(service, datetime.now(manager.timezone), days=busy_days)
+
+    results = {}
+    for name, search in (
+        ('per_slot', lambda: _per_slot_search(manager, num_slots)),
+        ('batched', lambda: manager.get_next_available_slots(num_slots)),
+    ):
+        service.reset_counters()
+        started = time.perf_counter()
+        slots = search()
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'round_trips': service.round_trips,
+            'seconds': round(elapsed, 4),
+            'slots': [slot.isoformat() for slot in slots],
+        }
+
+    assert results['per_slot']['slots'] == results['batched']['slots'], 'strategies disagree'
+    return {
+        'latency_per_call': latency,
+        'busy_days': busy_days,
+        'per_slot': {k: v for k, v in results['per_slot'].items() if k != 'slots'},
+        'batched': {k: v for k, v in results['batched'].items() if k != 'slots'},
+        'speedup': round(results['per_slot']['seconds'] / max(results['batched']['seconds'], 1e-9), 1),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,57 @@
+"""
+Measure time-to-first-token for streamed vs. buffered chat responses
+
+    python -m benchmarks.bench_streaming
+"""
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict
+
+from utils.llm_utils import OpenAIManager
+
+from .openai_stub import StubConfig, start_stub
+
+
+def run(turns: int = 5, first_token_delay: float = 0.2, token_delay: float = 0.01, tokens: int = 100) -> Dict[str, Any]:
+    """
+    Compare the first visible output of generate_response and stream_response
+
+    Args:
+        turns (int): Requests per mode
+        first_token_delay (float): Stub delay before the first token
+        token_delay (float): Stub delay between tokens
+        tokens (int): Tokens per response
+    """
+    config = StubConfig(tokens=tokens, first_token_delay=first_token_delay, token_delay=token_delay)
+    server, base_url = start_stub(config)
+    os.environ['OPENAI_API_BASE'] = base_url
+    try:
+        llm = OpenAIManager(api_key='stub')
+
+        buffered = []
+        for _ in range(turns):
+            started = time.perf_counter()
+            llm.generate_response('What are his skills?')
+            buffered.append(time.perf_counter() - started)
+
+        ttft, total = [], []
+        for _ in range(turns):
+            text = ''.join(llm.stream_response('What are his skills?'))
+            assert text == config.text * tokens, 'stream lost tokens'
+            ttft.append(llm.last_stream_stats['ttft'])
+            total.append(llm.last_stream_stats['total'])
+    finally:
+        server.shutdown()
+        os.environ.pop('OPENAI_API_BASE', None)
+
+    return {
+        'buffered_first_output_ms': round(statistics.median(buffered) * 1000, 1),
+        'stream_ttft_ms': round(statistics.median(ttft) * 1000, 1),
+        'stream_total_ms': round(statistics.median(total) * 1000, 1),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,73 @@
+"""
+Compare whole-answer speech synthesis with sentence-chunked streaming
+
+    python -m benchmarks.bench_streaming_tts [--pyttsx3]
+"""
+import json
+import sys
+import time
+from typing import Any, Dict
+
+from utils.tts import AudioCache, StreamingTTS, split_sentences
+
+from .fake_tts import SimulatedTTSBackend
+
+ANSWER = (
+    "Pavan is a full-stack developer with several years of experience. "
+    "He has built web applications with React, Node.js and Python, and he enjoys working on data-heavy products. "
+    "Recently he led the migration of a monolith to microservices on Kubernetes. "
+    "He also mentors junior developers and writes about software architecture. "
+    "Would you like to schedule a meeting to talk about a project? "
+    "You can pick any free slot in the calendar below."
+)
+
+
+def _measure(backend, workers: int, cache_bytes: int = 8 * 1024 * 1024) -> Dict[str, Any]:
+    cache = AudioCache(max_bytes=cache_bytes)
+    tts = StreamingTTS(backend, cache=cache, workers=workers)
+
+    started = time.perf_counter()
+    tts.synthesize(ANSWER)
+    whole = time.perf_counter() - started
+
+    runs = {}
+    for name in ('cold', 'cached'):
+        chunks = list(tts.stream(ANSWER))
+        stats = tts.last_stream_stats
+        runs[name] = {
+            'first_audio_ms': round(stats['first_audio'] * 1000, 1),
+            'total_ms': round(stats['total'] * 1000, 1),
+            'chunks': len(chunks),
+        }
+    tts.pool.shutdown()
+    return {
+        'whole_answer_ms': round(whole * 1000, 1),
+        'stream_cold': runs['cold'],
+        'stream_cached': runs['cached'],
+        'cache': cache.get_stats(),
+    }
+
+
+def run(use_pyttsx3: bool = False) -> Dict[str, Any]:
+    """
+    Time to first audio and total synthesis time per strategy
+
+    Args:
+        use_pyttsx3 (bool): Also measure the offline pyttsx3 engine (needs pyttsx3 and espeak)
+    """
+    results: Dict[str, Any] = {'sentences': len(split_sentences(ANSWER)), 'characters': len(ANSWER)}
+    for workers in (1, 3):
+        results[f"simulated_{workers}_workers"] = _measure(SimulatedTTSBackend(), workers)
+
+    # A cap smaller than the answer's audio forces LRU eviction
+    small = _measure(SimulatedTTSBackend(), 3, cache_bytes=100_000)
+    results['simulated_small_cache'] = small['cache']
+
+    if use_pyttsx3:
+        from utils.tts import Pyttsx3Backend
+        results['pyttsx3'] = _measure(Pyttsx3Backend(), 3)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run('--pyttsx3' in sys.argv), indent=2))
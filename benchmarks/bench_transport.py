@@ -0,0 +1,60 @@
+"""
+Compare bare requests.post calls with the pooled, retrying transport
+
+    python -m benchmarks.bench_transport
+"""
+import json
+import time
+from typing import Any, Dict
+
+import requests
+
+from utils.http_transport import HTTPTransport
+
+from .openai_stub import StubConfig, start_stub
+
+
+def run(calls: int = 200) -> Dict[str, Any]:
+    """
+    Time sequential calls with and without connection reuse, then show
+    retries absorbing injected 429 responses
+
+    Args:
+        calls (int): Requests per strategy
+    """
+    config = StubConfig(tokens=1, first_token_delay=0, token_delay=0)
+    server, base_url = start_stub(config)
+    url = f'{base_url}/chat/completions'
+    body = {'model': 'stub', 'messages': []}
+    results = {}
+    try:
+        started = time.perf_counter()
+        for _ in range(calls):
+            requests.post(url, json=body, timeout=5).json()
+        results['bare_ms_per_call'] = round((time.perf_counter() - started) / calls * 1000, 3)
+
+        transport = HTTPTransport(pool_size=4, max_retries=3, backoff_base=0.01)
+        started = time.perf_counter()
+        for _ in range(calls):
+            transport.post(url, json=body).json()
+        results['pooled_ms_per_call'] = round((time.perf_counter() - started) / calls * 1000, 3)
+
+        # Every 5th request is rate limited; the transport should hide all of them
+        config.fail_every = 5
+        config.retry_after = 0.01
+        transport = HTTPTransport(pool_size=4, max_retries=3, backoff_base=0.01)
+        statuses = [transport.post(url, json=body).status_code for _ in range(calls)]
+        stats = transport.get_stats()
+        results['with_429s'] = {
+            'ok': statuses.count(200),
+            'retries': stats['retries'],
+            'failures': stats['failures'],
+            'latency_p95_ms': round(stats['latency_p95'] * 1000, 3),
+        }
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
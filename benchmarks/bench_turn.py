@@ -0,0 +1,124 @@
+"""
+End-to-end chat turn latency against the local OpenAI stub
+
+    python -m benchmarks.bench_turn
+
+Each turn goes through the same stages as PortfolioAssistant: response
+cache lookup for opening questions, budgeted prompt assembly (with LLM
+summaries once history overflows), the streamed completion and the cache
+store. Stage timings come from the metrics spans recorded under each
+turn's trace id.
+"""
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from utils.history import ConversationHistory, llm_summarizer
+from utils.llm_utils import OpenAIManager
+from utils.metrics import metrics, span, trace
+
+from .bench_semantic_cache import QUESTIONS
+from .openai_stub import StubConfig, start_stub
+
+SYSTEM_MESSAGES = [{"role": "system", "content": "You are Pavan's AI assistant."}]
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+
+def run(conversations: int = 6, turns: int = 8, first_token_delay: float = 0.15,
+        token_delay: float = 0.005, tokens: int = 60, budget_tokens: int = 400, seed: int = 0) -> Dict[str, Any]:
+    """
+    Args:
+        conversations (int): Independent visitor sessions
+        turns (int): Turns per session
+        first_token_delay (float): Stub delay before the first token
+        token_delay (float): Stub delay between tokens
+        tokens (int): Tokens per response
+        budget_tokens (int): History budget; small enough that later turns summarize
+        seed (int): Random seed for the questions
+    """
+    rng = random.Random(seed)
+    config = StubConfig(tokens=tokens, first_token_delay=first_token_delay, token_delay=token_delay)
+    server, base_url = start_stub(config)
+    os.environ['OPENAI_API_BASE'] = base_url
+    metrics.reset()
+
+    turn_seconds: Dict[str, List[float]] = {'cached': [], 'opening': [], 'follow_up': []}
+    first_output: List[float] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = tmp
+        try:
+            from utils.database import ChromaDBManager
+            from utils.semantic_cache import SemanticCache
+
+            from .fake_embeddings import HashingEmbeddingFunction
+
+            llm = OpenAIManager(api_key='stub')
+            cache = SemanticCache(ChromaDBManager(embedding_function=HashingEmbeddingFunction()), max_distance=0.15)
+            for _ in range(conversations):
+                state: Dict[str, Any] = {}
+                messages: List[Dict[str, str]] = []
+                history = ConversationHistory(state, summarize=llm_summarizer(llm), budget_tokens=budget_tokens)
+                for _ in range(turns):
+                    prompt = rng.choice(rng.choice(QUESTIONS))
+                    started = time.perf_counter()
+                    first = None
+                    with trace(), span('turn'):
+                        cacheable = not messages
+                        response = cache.lookup(prompt) if cacheable else None
+                        cached = response is not None
+                        if cached:
+                            first = time.perf_counter() - started
+                        else:
+                            with span('prompt.assembly'):
+                                built = history.build(SYSTEM_MESSAGES, messages, prompt)
+                            parts = []
+                            for token in llm.stream_chat(built):
+                                if first is None:
+                                    first = time.perf_counter() - started
+                                parts.append(token)
+                            response = ''.join(parts)
+                            if cacheable:
+                                cache.store(prompt, response, time.perf_counter() - started)
+                    elapsed = time.perf_counter() - started
+                    turn_seconds['cached' if cached else 'opening' if cacheable else 'follow_up'].append(elapsed)
+                    first_output.append(first if first is not None else elapsed)
+                    messages.append({'role': 'user', 'content': prompt})
+                    messages.append({'role': 'assistant', 'content': response})
+        finally:
+            server.shutdown()
+            os.environ.pop('OPENAI_API_BASE', None)
+            os.environ.pop('DATABASE_PATH', None)
+
+    all_turns = [seconds for samples in turn_seconds.values() for seconds in samples]
+    stages = {
+        stage: {
+            'count': summary['count'],
+            'p50_ms': round(summary['p50'] * 1000, 2),
+            'p95_ms': round(summary['p95'] * 1000, 2),
+        }
+        for stage, summary in metrics.stage_summary().items()
+    }
+    return {
+        'turns': len(all_turns),
+        'turn_p50_ms': round(_percentile(all_turns, 50) * 1000, 1),
+        'turn_p95_ms': round(_percentile(all_turns, 95) * 1000, 1),
+        'first_output_p50_ms': round(_percentile(first_output, 50) * 1000, 1),
+        'by_kind_median_ms': {
+            kind: round(statistics.median(samples) * 1000, 1) if samples else None
+            for kind, samples in turn_seconds.items()
+        },
+        'turns_by_kind': {kind: len(samples) for kind, samples in turn_seconds.items()},
+        'stages': stages,
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,118 @@
+"""
+Context gathering for a chat turn: stages one after another vs. the orchestrator
+
+    python -m benchmarks.bench_turn_pipeline
+"""
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from utils.calendar_utils import GoogleCalendarManager
+from utils.history import ConversationHistory, llm_summarizer
+from utils.llm_utils import OpenAIManager
+from utils.orchestrator import TurnOrchestrator
+
+from .bench_embedding_cache import CountingEmbeddingFunction
+from .corpus import generate_corpus, write_jsonl
+from .fake_calendar import FakeCalendarService, make_busy_week
+from .openai_stub import StubConfig, start_stub
+
+SYSTEM = [{"role": "system", "content": "You are Pavan's AI assistant."}]
+
+
+def run(turns: int = 12, embed_seconds: float = 0.25, calendar_latency: float = 0.35,
+        summary_delay: float = 0.3, slow_calendar_latency: float = 3.0, deadline: float = 1.5) -> Dict[str, Any]:
+    """
+    Each turn needs retrieval (query embedding plus vector search), a
+    free-slot lookup and the budgeted history, which calls the LLM for a
+    summary whenever old turns are evicted.
+
+    Args:
+        turns (int): Turns per strategy
+        embed_seconds (float): Simulated query embedding latency
+        calendar_latency (float): Simulated Calendar API round trip
+        summary_delay (float): Stub latency of the summary call
+        slow_calendar_latency (float): Calendar round trip in the degraded run
+        deadline (float): Deadline of the background stages
+    """
+    config = StubConfig(tokens=20, first_token_delay=summary_delay, token_delay=0)
+    server, base_url = start_stub(config)
+    os.environ['OPENAI_API_BASE'] = base_url
+    orchestrator = TurnOrchestrator()
+    results: Dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = tmp
+        try:
+            from utils.database import ChromaDBManager
+
+            embedder = CountingEmbeddingFunction(cost=0)
+            db = ChromaDBManager(embedding_function=embedder)
+            corpus_path = os.path.join(tmp, 'corpus.jsonl')
+            write_jsonl(generate_corpus(2000), corpus_path)
+            db.pipeline.sync_source(corpus_path, 'corpus')
+            embedder.cost = embed_seconds
+
+            llm = OpenAIManager(api_key='stub')
+            service = FakeCalendarService(latency=calendar_latency)
+            calendar = GoogleCalendarManager(service=service)
+            make_busy_week(service, datetime.now(calendar.timezone), days=2)
+
+            def simulate(mode: str, label: str) -> Dict[str, Any]:
+                state: Dict[str, Any] = {}
+                history = ConversationHistory(state, llm_summarizer(llm), budget_tokens=300)
+                messages: List[Dict[str, str]] = []
+                walls, sums, critical, timeouts = [], [], {}, 0
+                for turn in range(turns):
+                    prompt = f"Turn {turn} ({label}): which projects used Django, and when can we meet?"
+                    stages = {
+                        'retrieval': lambda: db.search_similar(prompt, n_results=3),
+                        'availability': lambda: calendar.get_next_available_slots(5),
+                    }
+                    build = lambda: history.build(SYSTEM, messages, prompt)
+                    started = time.perf_counter()
+                    if mode == 'sequential':
+                        for func in stages.values():
+                            func()
+                        build()
+                        walls.append(time.perf_counter() - started)
+                        sums.append(walls[-1])
+                    else:
+                        _, report = orchestrator.run(
+                            {name: (func, deadline) for name, func in stages.items()},
+                            foreground={'history': build}
+                        )
+                        walls.append(report['wall_seconds'])
+                        sums.append(report['sequential_seconds'])
+                        critical[report['critical']] = critical.get(report['critical'], 0) + 1
+                        timeouts += sum(1 for stage in report['stages'].values() if stage['status'] == 'timeout')
+                    messages.append({'role': 'user', 'content': prompt})
+                    messages.append({'role': 'assistant', 'content': 'details ' * 60})
+                row: Dict[str, Any] = {
+                    'context_p50_ms': round(statistics.median(walls) * 1000, 1),
+                    'context_max_ms': round(max(walls) * 1000, 1),
+                }
+                if mode == 'orchestrated':
+                    row['sum_of_stages_p50_ms'] = round(statistics.median(sums) * 1000, 1)
+                    row['critical_stage'] = critical
+                    row['timeouts'] = timeouts
+                return row
+
+            results['sequential'] = simulate('sequential', 'a')
+            results['orchestrated'] = simulate('orchestrated', 'b')
+            service.latency = slow_calendar_latency
+            results['slow_calendar_sequential'] = simulate('sequential', 'c')
+            results['slow_calendar_orchestrated'] = simulate('orchestrated', 'd')
+        finally:
+            server.shutdown()
+            os.environ.pop('OPENAI_API_BASE', None)
+            os.environ.pop('DATABASE_PATH', None)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,120 @@
+"""
+Vector search through Chroma vs. the in-process quantized index
+
+    python -m benchmarks.bench_vector_index
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from utils.retrieval import build_where, matches
+from utils.vector_index import QuantizedVectorIndex
+
+from .bench_hybrid_retrieval import _percentile
+from .corpus import generate_corpus, write_jsonl
+from .fake_embeddings import HashingEmbeddingFunction
+
+
+def _dir_bytes(path: str, suffix: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names if name.endswith(suffix)
+    )
+
+
+def run(sizes=(2000, 8000), queries: int = 100, k: int = 5, seed: int = 4) -> Dict[str, Any]:
+    """
+    Time pure vector search_similar calls and score them against exact
+    float32 neighbours, unfiltered and with a doc_type filter
+
+    Args:
+        sizes (tuple): Corpus sizes
+        queries (int): Queries per size, mode and filter
+        k (int): Results per query
+        seed (int): Random seed for query selection
+    """
+    rng = random.Random(seed)
+    results: Dict[str, Any] = {}
+    for size in sizes:
+        items = generate_corpus(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ['DATABASE_PATH'] = tmp
+            try:
+                from utils.database import ChromaDBManager
+
+                db = ChromaDBManager(embedding_function=HashingEmbeddingFunction(), vector_index='int8')
+                corpus_path = os.path.join(tmp, 'corpus.jsonl')
+                write_jsonl(items, corpus_path)
+                db.pipeline.batch_size = 512
+                db.pipeline.sync_source(corpus_path, 'corpus')
+                db.vector_index.save(db.vector_index_path)
+
+                # Exact neighbours from the float32 vectors Chroma stores
+                stored = db.collection.get(include=['embeddings', 'metadatas'])
+                ids = stored['ids']
+                matrix = np.asarray(stored['embeddings'], dtype=np.float32)
+                matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+                def exact(query: str, where: Optional[Dict[str, Any]]) -> List[str]:
+                    vector = np.asarray(db.embedder.embed_queries([query])[0], dtype=np.float32)
+                    scores = matrix @ (vector / np.linalg.norm(vector))
+                    if where:
+                        allowed = np.array([matches(m, where) for m in stored['metadatas']])
+                        scores[~allowed] = -np.inf
+                    return [ids[i] for i in np.argsort(-scores)[:k]]
+
+                float16 = QuantizedVectorIndex(db.embedder.embed_documents, dtype='float16')
+                float16.load_collection(db.collection)
+                int8 = db.vector_index
+                modes = {'chroma': None, 'int8': int8, 'float16': float16}
+
+                targets = [rng.randrange(size) for _ in range(queries)]
+                row: Dict[str, Any] = {}
+                for label, doc_type in (('unfiltered', None), ('filtered', 'project')):
+                    where = build_where(doc_type)
+                    prompts = [f"{items[i]['tags'][0]} project codename zx{i:06d}" for i in targets]
+                    truth = [exact(prompt, where) for prompt in prompts]
+                    for mode, index in modes.items():
+                        db.vector_index = index
+                        latencies: List[float] = []
+                        hits = 0
+                        for prompt, expected in zip(prompts, truth):
+                            started = time.perf_counter()
+                            found = db.search_similar(prompt, n_results=k, doc_type=doc_type, hybrid=False)
+                            latencies.append(time.perf_counter() - started)
+                            hits += len(set(found['ids']) & set(expected))
+                        row[f'{label}_{mode}'] = {
+                            'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+                            'p95_ms': round(_percentile(latencies, 95) * 1000, 2),
+                            'recall_at_k': round(hits / (k * len(prompts)), 3),
+                        }
+                db.vector_index = int8
+
+                row['memory'] = {
+                    'float32_bytes': int8.get_stats()['float32_bytes'],
+                    'int8_bytes': int8.get_stats()['vector_bytes'],
+                    'float16_bytes': float16.get_stats()['vector_bytes'],
+                    'chroma_hnsw_bytes': _dir_bytes(tmp, '.bin'),
+                }
+
+                # Opening the snapshot in another process: map vs. rebuild from Chroma
+                started = time.perf_counter()
+                mapped = QuantizedVectorIndex(db.embedder.embed_documents)
+                mapped.load(db.vector_index_path)
+                row['snapshot_load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                started = time.perf_counter()
+                QuantizedVectorIndex(db.embedder.embed_documents).load_collection(db.collection)
+                row['rebuild_from_chroma_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                results[str(size)] = row
+            finally:
+                os.environ.pop('DATABASE_PATH', None)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,77 @@
+"""
+Compare fixed-length recording with VAD-endpointed streaming capture
+
+    python -m benchmarks.bench_voice_capture
+"""
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+from utils.voice_capture import EnergyVAD, StreamingCapture, WavFileSource
+
+from .fake_asr import SimulatedRecognizer, write_utterance
+
+
+def _fixed_duration(path: str, duration: float, recognizer: SimulatedRecognizer) -> Dict[str, Any]:
+    """The original flow: record for `duration` seconds, then recognize everything"""
+    source = WavFileSource(path, realtime=True)
+    recognizer.start(source.sample_rate, source.sample_width)
+    started = time.perf_counter()
+    audio = b''
+    for frame in source.frames():
+        audio += frame
+        if time.perf_counter() - started >= duration:
+            break
+    recorded = time.perf_counter() - started
+    recognizer.feed(audio)
+    text = recognizer.finish()
+    return {'seconds_until_text': round(time.perf_counter() - started, 3), 'recorded_seconds': round(recorded, 2), 'text': text}
+
+
+def run(utterances=(1.2, 3.0, 7.0), lead_silence: float = 0.5) -> Dict[str, Any]:
+    """
+    Time from the end of each utterance until its transcript is available
+
+    Args:
+        utterances: Lengths of the spoken segments, in seconds
+        lead_silence (float): Silence before speech starts
+    """
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, length in enumerate(utterances):
+            path = os.path.join(tmp, f"utterance_{i}.wav")
+            write_utterance(path, length, lead_silence=lead_silence, seed=i)
+            speech_end = lead_silence + length
+
+            fixed = _fixed_duration(path, 5.0, SimulatedRecognizer(streaming=False))
+
+            entry: Dict[str, Any] = {
+                'fixed_5s': {
+                    # A cut-off utterance never gets a complete transcript
+                    'end_of_speech_to_text': (
+                        None if speech_end > 5.0 else round(fixed['seconds_until_text'] - speech_end, 3)
+                    ),
+                    'truncated': speech_end > 5.0,
+                },
+            }
+            for mode, streaming in (('vad_batch', False), ('vad_streaming', True)):
+                capture = StreamingCapture(
+                    WavFileSource(path, realtime=True),
+                    SimulatedRecognizer(streaming=streaming),
+                    vad=EnergyVAD()
+                )
+                capture.listen()
+                stats = capture.last_stats
+                entry[mode] = {
+                    'endpoint': stats['endpoint'],
+                    'speech_seconds': round(stats['speech_seconds'], 2),
+                    'end_of_speech_to_text': round(stats['end_of_speech_to_text'], 3),
+                }
+            results[f"{length}s"] = entry
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
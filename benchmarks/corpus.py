@@ -0,0 +1,53 @@
+"""Synthetic portfolio corpora of arbitrary size"""
+import json
+import random
+from typing import Any, Dict, List
+
+TYPES = ['project', 'skill', 'experience', 'education', 'achievement']
+FRAMEWORKS = [
+    'React', 'Django', 'FastAPI', 'Flask', 'TensorFlow', 'PyTorch', 'Streamlit', 'Node.js',
+    'Express', 'Kubernetes', 'Docker', 'PostgreSQL', 'MongoDB', 'Redis', 'Kafka', 'Spark',
+    'Airflow', 'LangChain', 'Next.js', 'Vue', 'Svelte', 'GraphQL', 'Terraform', 'Pandas',
+]
+TOPICS = [
+    'recommendation engine', 'chat assistant', 'data pipeline', 'image classifier',
+    'realtime dashboard', 'payment service', 'search backend', 'mobile app',
+    'speech recognizer', 'scheduling tool', 'analytics platform', 'language tutor',
+]
+VERBS = ['Built', 'Designed', 'Shipped', 'Led', 'Prototyped', 'Scaled', 'Maintained', 'Optimized']
+
+
+def generate_corpus(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate portfolio items shaped like data/portfolio_data.json
+
+    Every item also carries a unique code word in its content so retrieval
+    benchmarks have an exact-match target per document.
+    """
+    rng = random.Random(seed)
+    items = []
+    for i in range(size):
+        tags = rng.sample(FRAMEWORKS, 3)
+        topic = rng.choice(TOPICS)
+        items.append({
+            'type': rng.choice(TYPES),
+            'content': (
+                f"{rng.choice(VERBS)} a {topic} using {tags[0]}, {tags[1]} and {tags[2]}. "
+                f"Internal codename zx{i:06d}. "
+                f"Focused on {rng.choice(TOPICS)} performance and {rng.choice(TOPICS)} reliability."
+            ),
+            'tags': tags,
+            'date': f"{rng.randint(2015, 2025)}-{rng.randint(1, 12):02d}",
+        })
+    return items
+
+
+def write_jsonl(items: List[Dict[str, Any]], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item) + '\n')
+
+
+def write_json(items: List[Dict[str, Any]], path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(items, f)
@@ -0,0 +1,71 @@
+"""Synthetic utterances and a recognizer backend that simulates decoding time"""
+import time
+import wave
+from typing import Optional
+
+import numpy as np
+
+
+def write_utterance(
+    path: str,
+    speech_seconds: float,
+    lead_silence: float = 0.5,
+    trail_silence: float = 3.0,
+    sample_rate: int = 16000,
+    seed: int = 0
+):
+    """
+    Write a 16-bit mono WAV: low background noise, a voiced segment made of
+    syllable-like harmonic bursts with short gaps, then silence
+    """
+    rng = np.random.default_rng(seed)
+    total = lead_silence + speech_seconds + trail_silence
+    samples = rng.normal(0, 60, int(total * sample_rate))
+
+    t = np.arange(int(speech_seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6)) * 4000
+    # Syllables of ~200ms separated by ~80ms dips, well under the endpointing pause
+    envelope = (np.sin(2 * np.pi * t / 0.28) > -0.6).astype(float)
+    start = int(lead_silence * sample_rate)
+    samples[start:start + t.size] += voice * envelope
+
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.clip(samples, -32768, 32767).astype(np.int16).tobytes())
+
+
+class SimulatedRecognizer:
+    """
+    Recognizer backend with decoding cost proportional to audio length
+
+    A streaming recognizer pays that cost in feed() while capture is still
+    running; a batch recognizer pays all of it in finish().
+    """
+
+    def __init__(self, seconds_per_audio_second: float = 0.15, finalize: float = 0.05, streaming: bool = True):
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.finalize = finalize
+        self.streaming = streaming
+
+    def start(self, sample_rate: int, sample_width: int):
+        self.bytes_per_second = sample_rate * sample_width
+        self.audio_seconds = 0.0
+
+    def _decode(self, seconds: float):
+        time.sleep(seconds * self.seconds_per_audio_second)
+
+    def feed(self, chunk: bytes):
+        seconds = len(chunk) / self.bytes_per_second
+        self.audio_seconds += seconds
+        if self.streaming:
+            self._decode(seconds)
+
+    def finish(self) -> Optional[str]:
+        if not self.streaming:
+            self._decode(self.audio_seconds)
+        time.sleep(self.finalize)
+        return f"utterance of {self.audio_seconds:.2f}s"
@@ -0,0 +1,206 @@
+"""In-memory fake of the Google Calendar `service` used by GoogleCalendarManager"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httplib2
+from dateutil.parser import isoparse
+from googleapiclient.errors import HttpError
+
+
+def _http_error(status: int, message: str) -> HttpError:
+    return HttpError(httplib2.Response({'status': status}), message.encode())
+
+
+class _Request:
+    """Mimics a googleapiclient HttpRequest: work happens on execute()"""
+
+    def __init__(self, service: 'FakeCalendarService', method: str, handler):
+        self.service = service
+        self.method = method
+        self.handler = handler
+
+    def execute(self) -> Dict[str, Any]:
+        self.service._round_trip(self.method)
+        return self.handler()
+
+
+class _BatchRequest:
+    """Mimics BatchHttpRequest: queued requests share one round-trip"""
+
+    def __init__(self, service: 'FakeCalendarService', callback=None):
+        self.service = service
+        self.callback = callback
+        self.requests: List[Any] = []
+
+    def add(self, request: _Request, callback=None, request_id: Optional[str] = None):
+        if len(self.requests) >= self.service.max_batch_size:
+            raise ValueError(f"Batch is limited to {self.service.max_batch_size} requests")
+        request_id = request_id if request_id is not None else str(len(self.requests) + 1)
+        self.requests.append((request, callback or self.callback, request_id))
+
+    def execute(self):
+        self.service._round_trip('batch')
+        for request, callback, request_id in self.requests:
+            try:
+                response, exception = request.handler(), None
+            except Exception as e:
+                response, exception = None, e
+            if callback is not None:
+                callback(request_id, response, exception)
+
+
+class _Resource:
+    def __init__(self, service: 'FakeCalendarService', methods: Dict[str, Any]):
+        self._service = service
+        self._methods = methods
+
+    def __getattr__(self, name):
+        handler = self._methods[name]
+
+        def method(**kwargs):
+            return _Request(self._service, name, lambda: handler(**kwargs))
+
+        return method
+
+
+class FakeCalendarService:
+    """
+    Fake Calendar v3 service holding events in memory
+
+    Every execute() counts as one HTTP round-trip and sleeps for `latency`
+    seconds so benchmarks can compare round-trip counts and wall-clock time.
+    """
+
+    def __init__(self, calendar_id: str = 'primary@example.com', latency: float = 0.0):
+        self.calendar_id = calendar_id
+        self.latency = latency
+        self.calendars: Dict[str, Dict[str, Dict[str, Any]]] = {calendar_id: {}}
+        self.calls: Dict[str, int] = {}
+        self.version = 0  # Bumped on every change; sync tokens are versions
+        self.max_batch_size = 50
+        self.lock = threading.Lock()
+
+    # Helpers
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    def reset_counters(self):
+        with self.lock:
+            self.calls = {}
+
+    def _round_trip(self, method: str):
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_busy(self, start: datetime, end: datetime, calendar_id: Optional[str] = None, **fields) -> str:
+        """Add an event directly, without counting a round-trip"""
+        calendar_id = calendar_id or self.calendar_id
+        event_id = fields.pop('id', None) or uuid.uuid4().hex
+        event = {
+            'id': event_id,
+            'status': 'confirmed',
+            'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': end.isoformat()},
+        }
+        event.update(fields)
+        with self.lock:
+            self._store(calendar_id, event)
+        return event_id
+
+    def _store(self, calendar_id: str, event: Dict[str, Any]):
+        self.version += 1
+        event['_version'] = self.version
+        self.calendars.setdefault(calendar_id, {})[event['id']] = event
+
+    def cancel(self, event_id: str, calendar_id: Optional[str] = None):
+        """Cancel an event directly, without counting a round-trip"""
+        calendar_id = calendar_id or self.calendar_id
+        with self.lock:
+            event = dict(self.calendars[calendar_id][event_id], status='cancelled')
+            self._store(calendar_id, event)
+
+    def _busy(self, calendar_id: str, time_min: datetime, time_max: datetime) -> List[Dict[str, str]]:
+        intervals = []
+        for event in self.calendars.get(calendar_id, {}).values():
+            if event.get('status') == 'cancelled' or event.get('transparency') == 'transparent':
+                continue
+            start = isoparse(event['start']['dateTime'])
+            end = isoparse(event['end']['dateTime'])
+            if start < time_max and end > time_min:
+                intervals.append((max(start, time_min), min(end, time_max)))
+        intervals.sort()
+        return [{'start': s.isoformat(), 'end': e.isoformat()} for s, e in intervals]
+
+    # Calendar API surface
+
+    def new_batch_http_request(self, callback=None) -> _BatchRequest:
+        return _BatchRequest(self, callback)
+
+    def calendarList(self):
+        def list_():
+            return {'items': [
+                {'id': cid, 'primary': cid == self.calendar_id}
+                for cid in self.calendars
+            ]}
+        return _Resource(self, {'list': list_})
+
+    def freebusy(self):
+        def query(body):
+            time_min = isoparse(body['timeMin'])
+            time_max = isoparse(body['timeMax'])
+            with self.lock:
+                return {'calendars': {
+                    item['id']: {'busy': self._busy(item['id'], time_min, time_max)}
+                    for item in body['items']
+                }}
+        return _Resource(self, {'query': query})
+
+    def events(self):
+        def insert(calendarId, body, **kwargs):
+            event = dict(body)
+            event.setdefault('id', uuid.uuid4().hex)
+            event.setdefault('status', 'confirmed')
+            with self.lock:
+                if event['id'] in self.calendars.get(calendarId, {}):
+                    raise _http_error(409, 'The requested identifier already exists.')
+                self._store(calendarId, event)
+            return dict(event)
+
+        def get(calendarId, eventId, **kwargs):
+            with self.lock:
+                event = self.calendars.get(calendarId, {}).get(eventId)
+                if event is None:
+                    raise _http_error(404, 'Not Found')
+                return dict(event)
+
+        def list_(calendarId, syncToken=None, **kwargs):
+            since = int(syncToken) if syncToken else 0
+            with self.lock:
+                items = [
+                    dict(e) for e in self.calendars.get(calendarId, {}).values()
+                    if e['_version'] > since and (since or e.get('status') != 'cancelled')
+                ]
+                return {'items': items, 'nextSyncToken': str(self.version)}
+
+        return _Resource(self, {'insert': insert, 'get': get, 'list': list_})
+
+
+def make_busy_week(service: FakeCalendarService, start: datetime, days: int = 14, fill: float = 1.0):
+    """Book every business-hours slot on the next `days` days at the given fill ratio"""
+    step = timedelta(minutes=30)
+    count = 0
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    for offset in range(days + 1):
+        current = day + timedelta(days=offset)
+        for half_hour in range(9 * 2, 17 * 2):
+            slot = current + half_hour * step
+            if (count % 100) < fill * 100:
+                service.add_busy(slot, slot + step)
+            count += 1
@@ -0,0 +1,44 @@
+"""Deterministic local embedding function so benchmarks run without model downloads"""
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbeddingFunction:
+    """
+    Feature-hashing embedder over words and character trigrams
+
+    Similar texts share most features and land close together in cosine
+    space, which is all the benchmarks need. Compatible with Chroma's
+    EmbeddingFunction protocol.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN.findall(text.lower())
+        grams = []
+        for word in words:
+            padded = f"#{word}#"
+            grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return words + words + grams
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], 'little') % self.dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in input]
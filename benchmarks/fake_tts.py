@@ -0,0 +1,25 @@
+"""Speech synthesis backend that simulates engine latency without producing real audio"""
+import hashlib
+import time
+
+
+class SimulatedTTSBackend:
+    """
+    Sleeps like a TTS engine (fixed overhead plus time per character) and
+    returns deterministic bytes of roughly MP3 size for the text.
+    """
+
+    mime = 'audio/mp3'
+
+    def __init__(self, overhead: float = 0.15, per_char: float = 0.003, bytes_per_char: int = 400):
+        self.overhead = overhead
+        self.per_char = per_char
+        self.bytes_per_char = bytes_per_char
+        self.name = 'simulated'
+        self.calls = 0
+
+    def synthesize(self, text: str) -> bytes:
+        self.calls += 1
+        time.sleep(self.overhead + self.per_char * len(text))
+        seed = hashlib.sha256(text.encode('utf-8')).digest()
+        return (seed * (len(text) * self.bytes_per_char // len(seed) + 1))[:len(text) * self.bytes_per_char]
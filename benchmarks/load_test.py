@@ -0,0 +1,211 @@
+"""
+Load-test the headless API with 1, 2, 4, ... workers against local stubs
+
+    python -m benchmarks.load_test
+
+Each run starts `python -m api` with this module's `app` (the real API on
+a hashing embedder and a fake Calendar service), drives it with a mix of
+/chat and /slots requests for a fixed time, then stops it with SIGTERM
+while a streamed answer is in flight to check that the stream completes.
+"""
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from .openai_stub import StubConfig, start_stub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _worker_app():
+    """The API with fake backends, built in each worker process"""
+    from api import create_app
+    from utils import registry
+    from utils.calendar_utils import GoogleCalendarManager
+    from utils.database import ChromaDBManager
+    from utils.reservations import ReservationStore
+
+    from .fake_calendar import FakeCalendarService
+    from .fake_embeddings import HashingEmbeddingFunction
+
+    registry.get_resource('db_manager', lambda: ChromaDBManager(
+        embedding_function=HashingEmbeddingFunction(), sync_sources=False
+    ))
+    registry.get_resource('calendar_manager', lambda: GoogleCalendarManager(
+        service=FakeCalendarService(latency=float(os.getenv("LOAD_TEST_CALENDAR_LATENCY", "0.05"))),
+        reservations=ReservationStore()
+    ))
+    return create_app()
+
+
+app = _worker_app() if os.getenv("LOAD_TEST_WORKER") == "1" else None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(workers: int, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'api', '--app', 'benchmarks.load_test:app', '--no-sync',
+         '--workers', str(workers), '--port', str(port)],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f'http://127.0.0.1:{port}'
+    pids = set()
+    deadline = time.time() + 60
+    # Wait until every worker has answered a health check
+    while time.time() < deadline and len(pids) < workers:
+        try:
+            pids.add(requests.get(f'{base}/healthz', timeout=1).json()['pid'])
+        except requests.RequestException:
+            time.sleep(0.2)
+    if len(pids) < workers:
+        process.kill()
+        raise RuntimeError(f'only {len(pids)} of {workers} workers came up')
+    return process
+
+
+def _drive(base: str, seconds: float, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def client(index: int):
+        session = requests.Session()
+        n = 0
+        while time.perf_counter() < stop_at:
+            n += 1
+            started = time.perf_counter()
+            try:
+                if n % 10 < 7:
+                    response = session.post(f'{base}/chat', json={
+                        'message': f'Which projects used Django? ({index}-{n})',
+                        'session_id': f'client-{index}',
+                    }, timeout=30)
+                else:
+                    response = session.get(f'{base}/slots', timeout=30)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            with lock:
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        'requests_per_second': round(len(latencies) / seconds, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+        'errors': errors[0],
+    }
+
+
+def _graceful_stop(process: subprocess.Popen, base: str) -> Dict[str, Any]:
+    """SIGTERM the server while a streamed answer is in flight"""
+    result: Dict[str, Any] = {}
+
+    def stream():
+        with requests.post(f'{base}/chat', json={'message': 'Tell me everything', 'stream': True},
+                           stream=True, timeout=30) as response:
+            events = [line for line in response.iter_lines() if line.startswith(b'data:')]
+        result['stream_completed'] = bool(events) and json.loads(events[-1][5:]).get('done', False)
+
+    reader = threading.Thread(target=stream)
+    reader.start()
+    time.sleep(0.3)
+    started = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    reader.join()
+    exit_code = process.wait(timeout=60)
+    # A single uvicorn process re-raises SIGTERM after its graceful shutdown
+    result['clean_exit'] = exit_code in (0, -signal.SIGTERM)
+    result['shutdown_seconds'] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def run(worker_counts=(1, 2, 4), seconds: float = 10, concurrency: int = 32,
+        llm_latency: float = 0.05, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Args:
+        worker_counts (tuple): Worker processes per run
+        seconds (float): Load duration per run
+        concurrency (int): Concurrent clients
+        llm_latency (float): Stub delay before the first token
+        max_workers (int): Skip worker counts above this (default: no limit)
+    """
+    from utils.database import ChromaDBManager
+
+    from .corpus import generate_corpus, write_jsonl
+    from .fake_embeddings import HashingEmbeddingFunction
+
+    config = StubConfig(tokens=20, first_token_delay=llm_latency, token_delay=0.002)
+    stub, stub_base = start_stub(config)
+    results: Dict[str, Any] = {'cpu_count': os.cpu_count(), 'concurrency': concurrency, 'runs': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            'LOAD_TEST_WORKER': '1',
+            'DATABASE_PATH': tmp,
+            'OPENAI_API_BASE': stub_base,
+            'OPENAI_API_KEY': 'stub',
+            'RESERVATIONS_PATH': os.path.join(tmp, 'reservations.db'),
+        })
+        # Build the index once here, as serve() does before forking
+        os.environ['DATABASE_PATH'] = tmp
+        try:
+            db = ChromaDBManager(embedding_function=HashingEmbeddingFunction())
+            corpus = os.path.join(tmp, 'corpus.jsonl')
+            write_jsonl(generate_corpus(2000), corpus)
+            db.pipeline.sync_source(corpus, 'corpus')
+            del db
+        finally:
+            os.environ.pop('DATABASE_PATH', None)
+
+        try:
+            for workers in worker_counts:
+                if max_workers and workers > max_workers:
+                    continue
+                port = _free_port()
+                env['AVAILABILITY_SHARED_PATH'] = os.path.join(tmp, f'availability-{port}.json')
+                process = _start_server(workers, port, env)
+                base = f'http://127.0.0.1:{port}'
+                try:
+                    row = _drive(base, seconds, concurrency)
+                    row['shutdown'] = _graceful_stop(process, base)
+                finally:
+                    if process.poll() is None:
+                        process.kill()
+                results['runs'][str(workers)] = row
+        finally:
+            stub.shutdown()
+
+    runs = results['runs']
+    if '1' in runs and runs['1']['requests_per_second']:
+        for row in runs.values():
+            row['speedup'] = round(row['requests_per_second'] / runs['1']['requests_per_second'], 2)
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
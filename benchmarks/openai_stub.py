@@ -0,0 +1,157 @@
+"""
+Local stub of the OpenAI chat-completions endpoint
+
+Serves both regular JSON responses and server-sent event streams with
+configurable latency so streaming and transport behaviour can be measured
+without network access or an API key.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class StubConfig:
+    def __init__(
+        self,
+        tokens: int = 50,
+        first_token_delay: float = 0.2,
+        token_delay: float = 0.01,
+        text: str = 'lorem ',
+        fail_every: int = 0,
+        fail_status: int = 429,
+        retry_after: Optional[float] = None,
+        jitter: float = 0.0,
+        stall_probability: float = 0.0,
+        stall_seconds: float = 0.0,
+        delay_headers: bool = False,
+        seed: int = 0,
+    ):
+        self.tokens = tokens
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.text = text
+        self.fail_every = fail_every  # Every Nth request fails with fail_status
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.jitter = jitter  # Uniform extra delay before the first token
+        self.stall_probability = stall_probability  # Chance a request stalls for stall_seconds
+        self.stall_seconds = stall_seconds
+        # Hold a stream's headers until its first token, as a queued upstream does
+        self.delay_headers = delay_headers
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def first_delay(self) -> float:
+        """Delay before the first token of one response, with jitter and stalls"""
+        with self.lock:
+            delay = self.first_token_delay + self.rng.uniform(0, self.jitter)
+            if self.rng.random() < self.stall_probability:
+                delay += self.stall_seconds
+        return delay
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    config: StubConfig = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        config = self.config
+        with config.lock:
+            config.requests += 1
+            count = config.requests
+
+        if config.fail_every and count % config.fail_every == 0:
+            self._fail(config)
+        elif body.get('stream'):
+            self._stream(config)
+        else:
+            self._complete(config, body)
+
+    def _fail(self, config: StubConfig):
+        payload = b'{"error": {"message": "stub failure"}}'
+        self.send_response(config.fail_status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if config.retry_after is not None:
+            self.send_header('Retry-After', str(config.retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _complete(self, config: StubConfig, body: Dict[str, Any]):
+        time.sleep(config.first_delay() + config.token_delay * config.tokens)
+        payload = json.dumps({
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': config.text * config.tokens},
+                'finish_reason': 'stop',
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': config.tokens},
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def _stream(self, config: StubConfig):
+        delay = config.first_delay()
+        if config.delay_headers:
+            time.sleep(delay)
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            if not config.delay_headers:
+                time.sleep(delay)
+            for i in range(config.tokens):
+                if i:
+                    time.sleep(config.token_delay)
+                event = {'choices': [{'index': 0, 'delta': {'content': config.text}}]}
+                self._chunk(f'data: {json.dumps(event)}\n\n'.encode())
+            self._chunk(b'data: [DONE]\n\n')
+            self._chunk(b'')
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early (e.g. a cancelled hedge)
+            self.close_connection = True
+
+
+def start_stub(config: Optional[StubConfig] = None, port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stub in a background thread
+
+    Returns:
+        Tuple: The server (call shutdown() when done) and its API base URL
+    """
+    config = config or StubConfig()
+    handler = type('StubHandler', (_Handler,), {'config': config})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/v1'
+
+
+if __name__ == '__main__':
+    server, base_url = start_stub(port=8765)
+    print(f'OpenAI stub listening on {base_url}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,210 @@
+"""
+Run every benchmark offline and write a machine-readable baseline
+
+    python -m benchmarks.run_all -o baseline.json
+    python -m benchmarks.run_all --quick --compare baseline.json
+
+All benchmarks use the local fakes (OpenAI stub, fake Calendar service,
+hashing embeddings, synthetic corpora), so no credentials or network
+access are needed. Benchmark chatter goes to stderr; stdout only carries
+the comparison against a previous baseline.
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import subprocess
+import sys
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+# Smaller parameters for a fast smoke run; results are not comparable with full runs
+QUICK = {
+    'bench_bulk_booking': {'count': 40},
+    'bench_cold_start': {'repeats': 1, 'reruns': 5},
+    'bench_concurrent_booking': {'threads': 60},
+    'bench_embedding_cache': {'size': 500, 'queries': 100},
+    'bench_hedging': {'requests': 100},
+    'bench_hybrid_retrieval': {'size': 3000, 'queries': 50},
+    'bench_ingestion': {'size': 1000},
+    'bench_metrics': {'calls': 20000},
+    'bench_multi_attendee': {'calendar_counts': (4, 12)},
+    'bench_retrieval_scaling': {'sizes': (500, 2000), 'queries': 30},
+    'bench_semantic_cache': {'requests': 50},
+    'bench_streaming': {'turns': 2},
+    'bench_transport': {'calls': 50},
+    'bench_turn': {'conversations': 2, 'turns': 4},
+    'bench_turn_pipeline': {'turns': 4},
+    'bench_vector_index': {'sizes': (2000,), 'queries': 30},
+    'bench_voice_capture': {'utterances': (1.2, 3.0)},
+}
+
+# Metric name fragments that tell which direction is an improvement
+LOWER_IS_BETTER = ('_ms', 'seconds', '_ns', 'round_trips', 'latency', 'double_bookings', 'bytes')
+HIGHER_IS_BETTER = ('per_second', 'speedup', 'hit_rate', 'recall', 'throughput')
+
+
+def discover() -> List[str]:
+    """Names of all benchmark modules in this package"""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    return sorted(
+        module.name for module in pkgutil.iter_modules([package_dir])
+        if module.name.startswith('bench_')
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(names: List[str], quick: bool = False) -> Dict[str, Any]:
+    """
+    Run each benchmark's run() in turn
+
+    A failing benchmark is recorded with its error and does not stop the
+    others.
+    """
+    results: Dict[str, Any] = {}
+    for name in names:
+        print(f"[run_all] {name} ...", file=sys.stderr, flush=True)
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(f"{__package__}.{name}")
+            with contextlib.redirect_stdout(sys.stderr):
+                result = module.run(**(QUICK.get(name, {}) if quick else {}))
+            results[name] = {'seconds': round(time.perf_counter() - started, 2), 'result': result}
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            results[name] = {'seconds': round(time.perf_counter() - started, 2), 'error': repr(e)}
+        print(f"[run_all] {name} done in {results[name]['seconds']}s", file=sys.stderr, flush=True)
+
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'benchmarks': results,
+    }
+
+
+def flatten(value: Any, prefix: str = '') -> Dict[str, float]:
+    """Numeric leaves of a nested result keyed by dotted path"""
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {prefix: float(value)}
+    flat: Dict[str, float] = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(value, (list, tuple)):
+        for index, item in enumerate(value):
+            flat.update(flatten(item, f"{prefix}.{index}" if prefix else str(index)))
+    return flat
+
+
+def _direction(key: str) -> int:
+    """-1 if lower is better, 1 if higher is better, 0 if unknown"""
+    leaf = key.rsplit('.', 1)[-1]
+    if any(fragment in leaf for fragment in HIGHER_IS_BETTER):
+        return 1
+    if any(fragment in leaf for fragment in LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> List[Tuple[str, float, float, float, str]]:
+    """
+    Metrics that moved by more than threshold (relative) between two baselines
+
+    Returns:
+        List: (metric, previous, current, relative change, verdict) where
+            verdict is 'regression', 'improvement' or 'changed'
+    """
+    before = {
+        f"{name}.{key}": value
+        for name, entry in previous.get('benchmarks', {}).items()
+        for key, value in flatten(entry.get('result', {})).items()
+    }
+    after = {
+        f"{name}.{key}": value
+        for name, entry in current.get('benchmarks', {}).items()
+        for key, value in flatten(entry.get('result', {})).items()
+    }
+    rows = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if old == new:
+            continue
+        change = (new - old) / abs(old) if old else float('inf')
+        if abs(change) < threshold:
+            continue
+        direction = _direction(key)
+        verdict = 'changed' if not direction else 'improvement' if change * direction > 0 else 'regression'
+        rows.append((key, old, new, change, verdict))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-o', '--output', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Previous baseline JSON to diff against')
+    parser.add_argument('--only', help='Comma-separated benchmark names (with or without the bench_ prefix)')
+    parser.add_argument('--quick', action='store_true', help='Smaller parameters for a fast smoke run')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change reported by --compare')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with 1 if --compare finds regressions')
+    args = parser.parse_args(argv)
+
+    names = discover()
+    if args.only:
+        wanted = {n if n.startswith('bench_') else f"bench_{n}" for n in args.only.split(',')}
+        unknown = wanted - set(names)
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        names = [n for n in names if n in wanted]
+
+    current = run_benchmarks(names, quick=args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2, default=str)
+        print(f"[run_all] wrote {args.output}", file=sys.stderr)
+    failed = [name for name, entry in current['benchmarks'].items() if 'error' in entry]
+    if failed:
+        print(f"[run_all] failed: {', '.join(failed)}", file=sys.stderr)
+
+    if not args.compare:
+        if not args.output:
+            print(json.dumps(current, indent=2, default=str))
+        return 1 if failed else 0
+
+    with open(args.compare) as f:
+        previous = json.load(f)
+    if previous.get('meta', {}).get('quick') != args.quick:
+        print("[run_all] warning: comparing a quick run with a full run", file=sys.stderr)
+    rows = compare(previous, current, args.threshold)
+    print(f"Compared with {args.compare} (commit {previous.get('meta', {}).get('commit')}), "
+          f"threshold {args.threshold:.0%}")
+    for key, old, new, change, verdict in rows:
+        print(f"  {verdict:<11} {key}: {old:g} -> {new:g} ({change:+.0%})")
+    if not rows:
+        print("  no changes above threshold")
+    regressions = sum(1 for row in rows if row[4] == 'regression')
+    return 1 if failed or (args.fail_on_regression and regressions) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,25 @@
-from .database import ChromaDBManager
-from .calendar_utils import GoogleCalendarManager
-from .llm_utils import OpenAIManager
-from .audio_utils import AudioManager
+import importlib
 
-__all__ = ['ChromaDBManager', 'GoogleCalendarManager', 'OpenAIManager', 'AudioManager']
\ No newline at end of file
+# Managers are imported on first use so that, e.g., a chat-only page does
+# not pay for chromadb, googleapiclient or the audio stack at startup.
+_LAZY_IMPORTS = {
+    'ChromaDBManager': '.database',
+    'GoogleCalendarManager': '.calendar_utils',
+    'OpenAIManager': '.llm_utils',
+    'AudioManager': '.audio_utils',
+}
+
+__all__ = ['ChromaDBManager', 'GoogleCalendarManager', 'OpenAIManager', 'AudioManager']
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,17 +1,57 @@
 import speech_recognition as sr
-from gtts import gTTS
+import io
 import os
-import tempfile
+from typing import Iterator, Optional
+
+from .tts import AudioCache, GTTSBackend, StreamingTTS
+from .voice_capture import EnergyVAD, MicrophoneSource, SpeechRecognitionBackend, StreamingCapture
 
 class AudioManager:
-    def __init__(self):
+    def __init__(self, tts_backend=None, audio_cache: Optional[AudioCache] = None):
+        """
+        Args:
+            tts_backend: Speech synthesis backend (GTTSBackend by default;
+                Pyttsx3Backend works offline)
+            audio_cache (AudioCache): Cache of synthesized phrases, capped at
+                TTS_CACHE_BYTES (default 32 MB) if not given
+        """
         self.recognizer = sr.Recognizer()
+        self.tts = StreamingTTS(
+            tts_backend or GTTSBackend(),
+            cache=audio_cache or AudioCache(int(os.getenv("TTS_CACHE_BYTES", str(32 * 1024 * 1024)))),
+            workers=int(os.getenv("TTS_WORKERS", "3"))
+        )
+        self.vad = EnergyVAD()  # Shared across listen() calls to keep its noise floor
+        self.last_listen_stats = {}
 
     def record_audio(self, duration=5):
         with sr.Microphone() as source:
             audio = self.recognizer.record(source, duration=duration)
         return audio
 
+    def listen(self, source=None, backend=None, vad: Optional[EnergyVAD] = None) -> Optional[str]:
+        """
+        Capture one utterance, stopping at the first pause, and transcribe it
+
+        Unlike record_audio, capture ends as soon as the speaker stops and
+        audio reaches the recognizer while it is still being spoken. Timings
+        of the last call are in last_listen_stats.
+
+        Args:
+            source: Frame source; the default microphone if omitted (a
+                WavFileSource works without one)
+            backend: Recognizer backend; Google via self.recognizer if omitted
+            vad (EnergyVAD): Endpointer; self.vad if omitted
+        """
+        capture = StreamingCapture(
+            source or MicrophoneSource(),
+            backend or SpeechRecognitionBackend(self.recognizer),
+            vad=vad or self.vad
+        )
+        text = capture.listen()
+        self.last_listen_stats = capture.last_stats
+        return text
+
     def speech_to_text(self, audio_data):
         try:
             text = self.recognizer.recognize_google(audio_data)
@@ -19,10 +59,10 @@ class AudioManager:
         except sr.UnknownValueError:
             return None
 
-    def text_to_speech(self, text):
-        tts = gTTS(text=text, lang='en')
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-            tts.save(fp.name)
-            return fp.name
\ No newline at end of file
+    def text_to_speech(self, text) -> io.BytesIO:
+        """Synthesize text into an in-memory buffer (st.audio accepts it directly)"""
+        return self.tts.synthesize(text)
+
+    def stream_speech(self, text) -> Iterator[io.BytesIO]:
+        """Yield audio one sentence at a time so playback can start on the first"""
+        return self.tts.stream(text)
@@ -0,0 +1,245 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Interval = Tuple[datetime, datetime]
+
+
+class BusyIntervals:
+    """Sorted, merged busy intervals answering overlap checks with a binary search"""
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                # Overlapping or touching: extend the previous interval
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(zip(self.starts, self.ends))
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """Return True if [start, end) does not overlap any busy interval"""
+        # First busy interval that ends after the requested start
+        idx = bisect_right(self.ends, start)
+        return idx == len(self.starts) or self.starts[idx] >= end
+
+
+def business_slots(
+    start: datetime,
+    tz,
+    slot_minutes: int = 30,
+    start_hour: int = 9,
+    end_hour: int = 17,
+) -> Iterator[datetime]:
+    """
+    Yield candidate meeting slots from start onwards, skipping weekends and
+    anything outside business hours.
+
+    The first candidate is start rounded up to the next slot boundary; slots
+    then advance in slot_minutes steps and restart at start_hour on the next
+    weekday. Wall-clock times are localized in tz on every step so slots stay
+    on business hours across DST changes.
+
+    Args:
+        start (datetime): Timezone-aware datetime to search from
+        tz: pytz timezone the business hours are expressed in
+        slot_minutes (int): Slot length and step in minutes
+        start_hour (int): First business hour (inclusive)
+        end_hour (int): Last business hour (exclusive)
+    """
+    step = timedelta(minutes=slot_minutes)
+    current = start.astimezone(tz).replace(tzinfo=None)
+
+    # Round up to the next slot boundary
+    day_start = current.replace(hour=0, minute=0, second=0, microsecond=0)
+    offset = current - day_start
+    if offset % step:
+        current = day_start + (offset // step + 1) * step
+
+    while True:
+        if current.weekday() >= 5:
+            current = current.replace(
+                hour=start_hour, minute=0, second=0, microsecond=0
+            ) + timedelta(days=1)
+            continue
+
+        if start_hour <= current.hour < end_hour:
+            yield tz.localize(current)
+            current += step
+        elif current.hour < start_hour:
+            current = current.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+        else:
+            # Skip to next day at the start of business hours
+            current = current.replace(
+                hour=start_hour,
+                minute=0,
+                second=0,
+                microsecond=0
+            ) + timedelta(days=1)
+
+
+class WorkingHours:
+    """Daily working window of one calendar, in its own timezone"""
+
+    def __init__(self, tz, start_hour: int = 9, end_hour: int = 17, weekdays: Sequence[int] = range(5)):
+        """
+        Args:
+            tz: pytz timezone the hours are expressed in
+            start_hour (int): First working hour (inclusive)
+            end_hour (int): Last working hour (exclusive)
+            weekdays (Sequence[int]): Working days, Monday is 0
+        """
+        self.tz = tz
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.weekdays = frozenset(weekdays)
+
+    def windows(self, time_min: datetime, time_max: datetime) -> Iterator[Interval]:
+        """Yield the working windows of each local day overlapping [time_min, time_max)"""
+        day = time_min.astimezone(self.tz).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+        last = time_max.astimezone(self.tz).replace(tzinfo=None)
+        while day <= last:
+            if day.weekday() in self.weekdays:
+                # Localize every day so windows follow DST changes
+                yield (
+                    self.tz.localize(day + timedelta(hours=self.start_hour)),
+                    self.tz.localize(day + timedelta(hours=self.end_hour)),
+                )
+            day += timedelta(days=1)
+
+
+class SlotGrid:
+    """Fixed-length slots from a start time, addressed by index"""
+
+    def __init__(self, start: datetime, days: int = 30, slot_minutes: int = 30):
+        """
+        Args:
+            start (datetime): Timezone-aware time; rounded up to a slot boundary (in UTC)
+            days (int): Horizon covered by the grid
+            slot_minutes (int): Slot length in minutes
+        """
+        self.step = slot_minutes * 60
+        self.origin = -(-int(start.timestamp()) // self.step) * self.step
+        self.size = days * 24 * 60 // slot_minutes
+        self.tz = start.tzinfo
+
+    @property
+    def start(self) -> datetime:
+        return datetime.fromtimestamp(self.origin, self.tz)
+
+    @property
+    def end(self) -> datetime:
+        return datetime.fromtimestamp(self.origin + self.size * self.step, self.tz)
+
+    def slot(self, index: int) -> datetime:
+        return datetime.fromtimestamp(self.origin + int(index) * self.step, self.tz)
+
+    def _offsets(self, intervals: Iterable[Interval]) -> Tuple[np.ndarray, np.ndarray]:
+        pairs = np.array(
+            [(start.timestamp(), end.timestamp()) for start, end in intervals],
+            dtype=np.float64
+        ).reshape(-1, 2)
+        return (pairs[:, 0] - self.origin) / self.step, (pairs[:, 1] - self.origin) / self.step
+
+    def _paint(self, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+        """Boolean array marking slots first[i] <= slot < last[i], via a difference array"""
+        first = np.clip(first, 0, self.size).astype(np.int64)
+        last = np.clip(last, 0, self.size).astype(np.int64)
+        keep = last > first
+        diff = np.zeros(self.size + 1, dtype=np.int32)
+        np.add.at(diff, first[keep], 1)
+        np.add.at(diff, last[keep], -1)
+        return np.cumsum(diff[:-1]) > 0
+
+    def busy_mask(self, intervals: Iterable[Interval]) -> np.ndarray:
+        """Slots overlapping any of the intervals"""
+        first, last = self._offsets(intervals)
+        return self._paint(np.floor(first), np.ceil(last))
+
+    def within_mask(self, intervals: Iterable[Interval]) -> np.ndarray:
+        """Slots lying entirely inside one of the intervals"""
+        first, last = self._offsets(intervals)
+        return self._paint(np.ceil(first), np.floor(last))
+
+
+class AvailabilityEngine:
+    """
+    Common free time across many calendars, computed on packed bitmaps
+
+    Each calendar is reduced to one bit per grid slot (free during its
+    working hours and not busy), packed 8 slots per byte. Intersecting
+    calendars is a vectorized AND over the packed rows.
+    """
+
+    def __init__(self, grid: SlotGrid):
+        self.grid = grid
+        self.bitmaps: Dict[str, np.ndarray] = {}
+        # Calendars usually share a few working-hour schedules
+        self._hours_masks: Dict[Tuple, np.ndarray] = {}
+
+    def add_calendar(self, calendar_id: str, busy: Iterable[Interval], hours: Optional[WorkingHours] = None):
+        """
+        Register a calendar's busy time
+
+        Args:
+            calendar_id (str): Calendar the bitmap belongs to
+            busy (Iterable[Interval]): Busy intervals, e.g. a BusyIntervals
+            hours (WorkingHours): Working window; any time counts if omitted
+        """
+        free = ~self.grid.busy_mask(busy)
+        if hours is not None:
+            key = (str(hours.tz), hours.start_hour, hours.end_hour, hours.weekdays)
+            if key not in self._hours_masks:
+                self._hours_masks[key] = self.grid.within_mask(hours.windows(self.grid.start, self.grid.end))
+            free &= self._hours_masks[key]
+        self.bitmaps[calendar_id] = np.packbits(free)
+
+    def common_free(self, calendar_ids: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Boolean array of slots free on every given calendar (all registered by default)"""
+        ids = list(self.bitmaps) if calendar_ids is None else list(calendar_ids)
+        if not ids:
+            return np.ones(self.grid.size, dtype=bool)
+        packed = np.bitwise_and.reduce(np.stack([self.bitmaps[cid] for cid in ids]), axis=0)
+        return np.unpackbits(packed, count=self.grid.size).astype(bool)
+
+    def earliest(
+        self,
+        k: int = 5,
+        duration_slots: int = 1,
+        calendar_ids: Optional[Sequence[str]] = None,
+        not_before: Optional[datetime] = None
+    ) -> List[datetime]:
+        """
+        Earliest k start times where every calendar is free
+
+        Args:
+            k (int): Number of start times to return
+            duration_slots (int): Consecutive free slots a meeting needs
+            calendar_ids (Sequence[str]): Calendars to intersect (all by default)
+            not_before (datetime): Ignore starts before this time
+
+        Returns:
+            List[datetime]: Start times in the grid's timezone, earliest first
+        """
+        free = self.common_free(calendar_ids)
+        if duration_slots > 1:
+            # A start is usable if the next duration_slots slots are all free
+            runs = np.concatenate(([0], np.cumsum(free, dtype=np.int64)))
+            free = runs[duration_slots:] - runs[:-duration_slots] == duration_slots
+        starts = np.flatnonzero(free)
+        if not_before is not None:
+            first = -(-(int(not_before.timestamp()) - self.grid.origin) // self.grid.step)
+            starts = starts[starts >= first]
+        return [self.grid.slot(index) for index in starts[:k]]
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: every process refreshes on its own
+    fcntl = None
+
+from .availability import SlotGrid, WorkingHours
+from .metrics import record_error, span
+
+
+class AvailabilitySnapshot:
+    """Free slots per local day, computed at one point in time; never mutated after publishing"""
+
+    def __init__(self, days: Dict[date, List[datetime]], totals: Dict[date, int], refreshed_at: float):
+        self.days = days
+        self.totals = totals
+        self.refreshed_at = refreshed_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.refreshed_at
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'refreshed_at': self.refreshed_at,
+            'days': {day.isoformat(): [slot.isoformat() for slot in slots] for day, slots in self.days.items()},
+            'totals': {day.isoformat(): total for day, total in self.totals.items()},
+        })
+
+    @classmethod
+    def from_json(cls, text: str, tz) -> 'AvailabilitySnapshot':
+        data = json.loads(text)
+        return cls(
+            {
+                date.fromisoformat(day): [datetime.fromisoformat(slot).astimezone(tz) for slot in slots]
+                for day, slots in data['days'].items()
+            },
+            {date.fromisoformat(day): total for day, total in data['totals'].items()},
+            data['refreshed_at']
+        )
+
+
+class AvailabilityTable:
+    """
+    Precomputed free slots for the next `days` days
+
+    A daemon thread recomputes the table every refresh_seconds from one
+    busy-time query (served by the calendar mirror when the manager has
+    one) and swaps in a new snapshot, so readers such as the calendar
+    widget never wait on the Calendar API. Bookings can be marked right
+    away so a just-taken slot disappears before the next refresh.
+
+    With a shared_path, processes on one host (API workers) share a single
+    snapshot file: whichever process holds the lock refreshes and writes
+    it, the others load it when it changes instead of querying the
+    Calendar API themselves.
+    """
+
+    def __init__(self, manager, days: int = 30, refresh_seconds: float = 60, shared_path: Optional[str] = None):
+        """
+        Args:
+            manager (GoogleCalendarManager): Source of busy time, timezone and business hours
+            days (int): Horizon of the table
+            refresh_seconds (float): Interval between background refreshes
+            shared_path (str): Snapshot file shared between processes
+        """
+        self.manager = manager
+        self.days = days
+        self.refresh_seconds = refresh_seconds
+        self.shared_path = shared_path
+        self._shared_mtime = 0.0
+        self.snapshot: Optional[AvailabilitySnapshot] = None
+        self.last_error: Optional[str] = None
+        self.refresh_count = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def compute(self) -> AvailabilitySnapshot:
+        """Build a snapshot from the calendar's current busy time"""
+        tz = self.manager.timezone
+        now = datetime.now(tz)
+        grid = SlotGrid(now, days=self.days, slot_minutes=self.manager.slot_minutes)
+        hours = WorkingHours(tz, *self.manager.business_hours)
+
+        working = grid.within_mask(hours.windows(grid.start, grid.end))
+        busy = self.manager.get_busy_intervals(grid.start, grid.end)
+        free = working & ~grid.busy_mask(busy)
+
+        days: Dict[date, List[datetime]] = {}
+        totals: Dict[date, int] = {}
+        for index in np.flatnonzero(working):
+            slot = grid.slot(index).astimezone(tz)
+            totals[slot.date()] = totals.get(slot.date(), 0) + 1
+            days.setdefault(slot.date(), [])
+            if free[index]:
+                days[slot.date()].append(slot)
+        return AvailabilitySnapshot(days, totals, time.time())
+
+    def _load_shared(self) -> bool:
+        """Adopt the shared snapshot if the file changed since it was last read"""
+        try:
+            mtime = os.stat(self.shared_path).st_mtime
+            if mtime == self._shared_mtime:
+                return False
+            with open(self.shared_path) as f:
+                snapshot = AvailabilitySnapshot.from_json(f.read(), self.manager.timezone)
+        except (OSError, ValueError, KeyError):
+            return False
+        with self.lock:
+            self.snapshot = snapshot
+            self._shared_mtime = mtime
+        return True
+
+    def _save_shared(self, snapshot: AvailabilitySnapshot):
+        tmp = f"{self.shared_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(snapshot.to_json())
+        os.replace(tmp, self.shared_path)
+        self._shared_mtime = os.stat(self.shared_path).st_mtime
+
+    def refresh(self) -> bool:
+        """Recompute now; on failure the previous snapshot stays in place"""
+        lock_file = None
+        if self.shared_path:
+            self._load_shared()
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot.age < self.refresh_seconds:
+                return True
+            if fcntl is not None:
+                lock_file = open(f"{self.shared_path}.lock", 'w')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    # Another process is refreshing; its snapshot is picked up on read
+                    lock_file.close()
+                    return False
+        try:
+            with span('availability.refresh'):
+                snapshot = self.compute()
+            if self.shared_path:
+                self._save_shared(snapshot)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Error refreshing availability: {str(e)}")
+            record_error('availability.refresh', e)
+            return False
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+        with self.lock:
+            self.snapshot = snapshot
+            self.last_error = None
+            self.refresh_count += 1
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+
+    def start(self) -> 'AvailabilityTable':
+        """Start the background refresher (once)"""
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='availability-refresh', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def request_refresh(self):
+        """Ask the background thread to refresh without waiting for the interval"""
+        self._wake.set()
+
+    def mark_busy(self, start_time: datetime, end_time: Optional[datetime] = None):
+        """Drop slots overlapping a new booking from the current snapshot"""
+        end_time = end_time or start_time + timedelta(minutes=self.manager.slot_minutes)
+        slot_length = timedelta(minutes=self.manager.slot_minutes)
+        lock_file = None
+        if self.shared_path and fcntl is not None:
+            # Wait out a refresh in progress, then edit the snapshot it published
+            lock_file = open(f"{self.shared_path}.lock", 'w')
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if self.shared_path:
+                self._load_shared()
+            with self.lock:
+                if self.snapshot is None:
+                    return
+                days = dict(self.snapshot.days)
+                for day, slots in days.items():
+                    days[day] = [s for s in slots if s >= end_time or s + slot_length <= start_time]
+                self.snapshot = AvailabilitySnapshot(days, self.snapshot.totals, self.snapshot.refreshed_at)
+                if self.shared_path:
+                    try:
+                        self._save_shared(self.snapshot)
+                    except OSError as e:
+                        record_error('availability.share', e)
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+
+    def free_slots(self, day: date) -> List[datetime]:
+        """Free slot start times on a local day, excluding ones already in the past"""
+        if self.shared_path:
+            self._load_shared()
+        snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        now = datetime.now(self.manager.timezone)
+        return [slot for slot in snapshot.days.get(day, []) if slot > now]
+
+    def day_summary(self) -> List[Tuple[date, int, int]]:
+        """(day, free slots, working slots) for every day in the horizon"""
+        if self.shared_path:
+            self._load_shared()
+        snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        return [(day, len(self.free_slots(day)), snapshot.totals[day]) for day in snapshot.days]
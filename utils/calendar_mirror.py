@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from dateutil.parser import isoparse
+from googleapiclient.errors import HttpError
+
+from .availability import BusyIntervals
+from .metrics import timed
+
+
+class CalendarMirror:
+    """
+    Local SQLite mirror of a calendar's events
+
+    The mirror is kept current with incremental events().list sync tokens,
+    so availability can be answered from a local index instead of a
+    freebusy round-trip.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, timezone=None):
+        self.db_path = db_path or os.getenv("CALENDAR_MIRROR_PATH", "./calendar_mirror.db")
+        self.timezone = timezone
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._create_tables()
+
+    def _create_tables(self):
+        """Create the events and sync state tables if needed"""
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    calendar_id TEXT NOT NULL,
+                    event_id TEXT NOT NULL,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    busy INTEGER NOT NULL,
+                    PRIMARY KEY (calendar_id, event_id)
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_start ON events (calendar_id, start_ts)"
+            )
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    calendar_id TEXT PRIMARY KEY,
+                    sync_token TEXT,
+                    synced_at REAL NOT NULL
+                )
+            """)
+
+    def _parse_time(self, value: Dict[str, str]) -> float:
+        """Convert an event start/end object to a UTC timestamp"""
+        if 'dateTime' in value:
+            return isoparse(value['dateTime']).timestamp()
+
+        # All-day events carry a date in the calendar's timezone
+        day = datetime.strptime(value['date'], '%Y-%m-%d')
+        if self.timezone is not None:
+            return self.timezone.localize(day).timestamp()
+        return day.timestamp()
+
+    def _apply(self, calendar_id: str, event: Dict[str, Any]):
+        """Insert, update or delete a single event (caller holds the lock)"""
+        if event.get('status') == 'cancelled' or 'start' not in event:
+            self.conn.execute(
+                "DELETE FROM events WHERE calendar_id = ? AND event_id = ?",
+                (calendar_id, event['id'])
+            )
+            return
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO events (calendar_id, event_id, start_ts, end_ts, busy) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                calendar_id,
+                event['id'],
+                self._parse_time(event['start']),
+                self._parse_time(event['end']),
+                0 if event.get('transparency') == 'transparent' else 1,
+            )
+        )
+
+    def apply_event(self, calendar_id: str, event: Dict[str, Any]):
+        """Apply an event we just created or changed, without waiting for the next sync"""
+        with self.lock, self.conn:
+            self._apply(calendar_id, event)
+
+    @timed('calendar.sync')
+    def sync(self, service, calendar_id: str) -> int:
+        """
+        Pull changes since the last sync
+
+        Runs a full sync the first time, or when Google expires the sync token
+        (HTTP 410), and an incremental sync otherwise.
+
+        Returns:
+            int: Number of events applied
+        """
+        sync_token = self.get_sync_token(calendar_id)
+        try:
+            return self._sync(service, calendar_id, sync_token)
+        except HttpError as e:
+            if sync_token and e.resp.status == 410:
+                # Sync token expired: wipe the mirror and start over
+                with self.lock, self.conn:
+                    self.conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+                    self.conn.execute("DELETE FROM sync_state WHERE calendar_id = ?", (calendar_id,))
+                return self._sync(service, calendar_id, None)
+            raise
+
+    def _sync(self, service, calendar_id: str, sync_token: Optional[str]) -> int:
+        applied = 0
+        page_token = None
+
+        while True:
+            params = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': 2500}
+            if sync_token:
+                params['syncToken'] = sync_token
+            if page_token:
+                params['pageToken'] = page_token
+
+            result = service.events().list(**params).execute()
+
+            with self.lock, self.conn:
+                for event in result.get('items', []):
+                    self._apply(calendar_id, event)
+                    applied += 1
+
+                page_token = result.get('nextPageToken')
+                if not page_token:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO sync_state (calendar_id, sync_token, synced_at) "
+                        "VALUES (?, ?, ?)",
+                        (calendar_id, result.get('nextSyncToken'), time.time())
+                    )
+                    return applied
+
+    def get_sync_token(self, calendar_id: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT sync_token FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def age(self, calendar_id: str) -> float:
+        """Seconds since the last successful sync (inf if never synced)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT synced_at FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+        return time.time() - row[0] if row else float('inf')
+
+    def is_free(self, calendar_id: str, start_time: datetime, end_time: datetime) -> bool:
+        """Check a time range against the mirrored busy events"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM events WHERE calendar_id = ? AND busy = 1 "
+                "AND start_ts < ? AND end_ts > ? LIMIT 1",
+                (calendar_id, end_time.timestamp(), start_time.timestamp())
+            ).fetchone()
+        return row is None
+
+    def busy_intervals(self, calendar_id: str, time_min: datetime, time_max: datetime) -> BusyIntervals:
+        """Return mirrored busy time within a window, clipped to the window"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT start_ts, end_ts FROM events WHERE calendar_id = ? AND busy = 1 "
+                "AND start_ts < ? AND end_ts > ?",
+                (calendar_id, time_max.timestamp(), time_min.timestamp())
+            ).fetchall()
+
+        tz = time_min.tzinfo
+        intervals: List[Tuple[datetime, datetime]] = [
+            (
+                max(datetime.fromtimestamp(start, tz), time_min),
+                min(datetime.fromtimestamp(end, tz), time_max),
+            )
+            for start, end in rows
+        ]
+        return BusyIntervals(intervals)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
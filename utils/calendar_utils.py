@@ -3,20 +3,79 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+import google_auth_httplib2
+import httplib2
+import hashlib
 import os
 import pickle
+import threading
+import uuid
+from bisect import bisect_right
 import streamlit as st
 from datetime import datetime, timedelta
 import pytz
-from typing import List, Dict, Optional
+from dateutil.parser import isoparse
+from typing import Any, List, Dict, Optional, Sequence
+
+from .availability import AvailabilityEngine, BusyIntervals, SlotGrid, WorkingHours, business_slots
+from .availability_table import AvailabilityTable
+from .calendar_mirror import CalendarMirror
+from .metrics import record_error, span
+from .reservations import ReservationStore
+
+class BookingInProgress(RuntimeError):
+    """Another request is still booking under the same idempotency key"""
+
 
 class GoogleCalendarManager:
-    def __init__(self):
+    TOKEN_PATH = 'token.pickle'
+
+    def __init__(
+        self,
+        service=None,
+        mirror: Optional[CalendarMirror] = None,
+        max_staleness: float = 60,
+        reservations: Optional[ReservationStore] = None,
+        interactive: bool = True
+    ):
+        """
+        Initialize the calendar manager
+
+        Args:
+            service: Optional pre-built Calendar API service. When omitted the
+                service is built from the stored OAuth credentials.
+            mirror (CalendarMirror): Optional local mirror used to answer
+                availability queries without a freebusy round-trip
+            max_staleness (float): Seconds a mirror may go without an
+                incremental sync before it is refreshed
+            reservations (ReservationStore): Optional slot leases and
+                idempotency keys shared by concurrent bookings
+            interactive (bool): If False, raise instead of opening the
+                browser OAuth flow when there is no usable stored token
+        """
         self.SCOPES = ['https://www.googleapis.com/auth/calendar']
         self.credentials_path = 'credentials.json'
-        self.token_path = 'token.pickle'
+        self.token_path = self.TOKEN_PATH
+        self.interactive = interactive
         self.timezone = pytz.timezone('America/New_York')  # Adjust to your timezone
-        self.initialize_calendar()
+        self.slot_minutes = 30
+        self.business_hours = (9, 17)  # 9 AM - 5 PM
+        self.search_window_days = 7  # Days of busy time fetched per freebusy call
+        self.batch_size = 50  # Calendar API limit on requests per batch
+        self.freebusy_max_calendars = 50  # Calendar API limit on items per freebusy query
+        self.mirror = mirror
+        self.max_staleness = max_staleness
+        self.reservations = reservations
+        self._availability_table: Optional[AvailabilityTable] = None
+        self._table_lock = threading.Lock()
+
+        if service is not None:
+            self.service = service
+            self.calendar_id = self._get_primary_calendar_id()
+        else:
+            self.initialize_calendar()
 
     def initialize_calendar(self):
         """Initialize Google Calendar API connection"""
@@ -32,6 +91,9 @@ class GoogleCalendarManager:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
             else:
+                if not self.interactive:
+                    # run_local_server() waits for a browser; never block a worker on it
+                    raise RuntimeError(f"No usable calendar token at {self.token_path}; authorize interactively first")
                 if not os.path.exists(self.credentials_path):
                     raise FileNotFoundError(
                         "credentials.json not found. Please download it from Google Cloud Console"
@@ -45,147 +107,560 @@ class GoogleCalendarManager:
             with open(self.token_path, 'wb') as token:
                 pickle.dump(creds, token)
 
-        self.service = build('calendar', 'v3', credentials=creds)
-        
-        # Get calendar ID
+        # httplib2 is not thread-safe; give every request its own connection
+        # so one manager can be shared across Streamlit sessions
+        def build_request(http, *args, **kwargs):
+            new_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+            return HttpRequest(new_http, *args, **kwargs)
+
+        authorized_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+        self.service = build(
+            'calendar', 'v3',
+            requestBuilder=build_request,
+            http=authorized_http
+        )
+        self.calendar_id = self._get_primary_calendar_id()
+
+    def _get_primary_calendar_id(self) -> str:
+        """Look up the ID of the primary calendar"""
         calendar_list = self.service.calendarList().list().execute()
-        self.calendar_id = next(
+        return next(
             calendar['id'] for calendar in calendar_list['items']
             if calendar.get('primary', False)
         )
 
-    def get_calendar_widget(self):
-        """Display an interactive calendar widget"""
+    def availability_table(self) -> AvailabilityTable:
+        """
+        Background-refreshed free slots for the next 30 days, started on first use
+
+        Set AVAILABILITY_SHARED_PATH to share one snapshot between processes.
+        """
+        with self._table_lock:
+            if self._availability_table is None:
+                self._availability_table = AvailabilityTable(
+                    self,
+                    days=30,
+                    refresh_seconds=float(os.getenv("AVAILABILITY_REFRESH_SECONDS", "60")),
+                    shared_path=os.getenv("AVAILABILITY_SHARED_PATH")
+                ).start()
+        return self._availability_table
+
+    def _mark_booked(self, start_time: datetime):
+        """Hide a just-booked slot from the availability table until its next refresh"""
+        if self._availability_table is not None:
+            self._availability_table.mark_busy(start_time)
+
+    def get_calendar_widget(self) -> Optional[datetime]:
+        """Display an interactive calendar widget offering only free slots"""
         st.write("### Select Meeting Date and Time")
-        
-        # Date selection
+
+        table = self.availability_table()
+        if table.snapshot is None:
+            st.info("Loading availability, please try again in a moment.")
+            return None
+        summary = [(day, free, total) for day, free, total in table.day_summary() if free]
+        if not summary:
+            st.warning("No free slots in the next 30 days.")
+            return None
+
+        with st.expander("Availability by day"):
+            st.bar_chart(
+                {
+                    'Day': [day.strftime('%m-%d') for day, _, _ in summary],
+                    'Free slots': [free for _, free, _ in summary],
+                },
+                x='Day',
+                y='Free slots'
+            )
+
         col1, col2 = st.columns([2, 1])
-        
+
         with col1:
-            # Show next 30 days only
-            min_date = datetime.now().date()
-            max_date = min_date + timedelta(days=30)
-            selected_date = st.date_input(
+            free_by_day = {day: (free, total) for day, free, total in summary}
+            selected_date = st.selectbox(
                 "Select Date",
-                min_value=min_date,
-                max_value=max_date,
-                value=min_date
+                list(free_by_day),
+                format_func=lambda day: (
+                    f"{day.strftime('%a %b %d')} ({free_by_day[day][0]} of {free_by_day[day][1]} free)"
+                )
             )
 
         with col2:
-            # Business hours with 30-min slots
-            hours = []
-            for hour in range(9, 18):  # 9 AM to 5 PM
-                hours.extend([
-                    f"{hour:02d}:00",
-                    f"{hour:02d}:30"
-                ])
-            selected_time = st.selectbox("Select Time", hours)
-
-        # Combine date and time
-        if selected_date and selected_time:
-            hour, minute = map(int, selected_time.split(':'))
-            selected_datetime = datetime.combine(
-                selected_date,
-                datetime.min.time().replace(hour=hour, minute=minute)
+            slots = table.free_slots(selected_date)
+            selected_time = st.selectbox(
+                "Select Time",
+                slots,
+                format_func=lambda slot: slot.strftime('%H:%M')
             )
-            return selected_datetime.replace(tzinfo=self.timezone)
-        return None
 
-    def check_availability(self, start_time: datetime) -> bool:
-        """Check if the selected time slot is available"""
-        end_time = start_time + timedelta(minutes=30)
-        
+        if table.last_error:
+            st.caption(f"Availability last updated {int(table.snapshot.age)}s ago")
+
+        # Slots are already timezone-aware, localized per day
+        return selected_time
+
+    def _refresh_mirror(self) -> bool:
+        """Sync the mirror if it is older than max_staleness; return True if usable"""
+        if self.mirror is None:
+            return False
+        if self.mirror.age(self.calendar_id) <= self.max_staleness:
+            return True
+        try:
+            self.mirror.sync(self.service, self.calendar_id)
+            return True
+        except Exception as e:
+            print(f"Error syncing calendar mirror: {str(e)}")
+            record_error('calendar.sync', e)
+            return False
+
+    def get_busy_intervals(
+        self,
+        time_min: datetime,
+        time_max: datetime,
+        live: bool = False
+    ) -> BusyIntervals:
+        """
+        Get busy time for the primary calendar
+
+        Answered from the local mirror when one is configured and fresh,
+        otherwise with a single freebusy query.
+
+        Args:
+            time_min (datetime): Start of the window (timezone-aware)
+            time_max (datetime): End of the window (timezone-aware)
+            live (bool): Skip the mirror and ask the Calendar API directly
+
+        Returns:
+            BusyIntervals: Merged busy intervals within the window
+        """
+        if not live and self._refresh_mirror():
+            return self.mirror.busy_intervals(self.calendar_id, time_min, time_max)
+
         body = {
-            'timeMin': start_time.isoformat(),
-            'timeMax': end_time.isoformat(),
+            'timeMin': time_min.isoformat(),
+            'timeMax': time_max.isoformat(),
+            'timeZone': str(self.timezone),
             'items': [{'id': self.calendar_id}],
         }
-        
-        events_result = self.service.freebusy().query(body=body).execute()
+
+        with span('calendar.freebusy', calendars=1):
+            events_result = self.service.freebusy().query(body=body).execute()
         busy = events_result['calendars'][self.calendar_id]['busy']
-        
-        return len(busy) == 0
 
-    def schedule_meeting(
+        return BusyIntervals(
+            (isoparse(interval['start']), isoparse(interval['end']))
+            for interval in busy
+        )
+
+    def get_busy_intervals_many(
+        self,
+        calendar_ids: Sequence[str],
+        time_min: datetime,
+        time_max: datetime
+    ) -> Dict[str, BusyIntervals]:
+        """
+        Get busy time for several calendars with as few freebusy queries as possible
+
+        Args:
+            calendar_ids (Sequence[str]): Calendars to query
+            time_min (datetime): Start of the window (timezone-aware)
+            time_max (datetime): End of the window (timezone-aware)
+
+        Returns:
+            Dict[str, BusyIntervals]: Busy intervals per calendar
+
+        Raises:
+            ValueError: If the API could not read one of the calendars
+        """
+        busy: Dict[str, BusyIntervals] = {}
+        ids = list(dict.fromkeys(calendar_ids))
+        for offset in range(0, len(ids), self.freebusy_max_calendars):
+            body = {
+                'timeMin': time_min.isoformat(),
+                'timeMax': time_max.isoformat(),
+                'timeZone': str(self.timezone),
+                'items': [{'id': cid} for cid in ids[offset:offset + self.freebusy_max_calendars]],
+            }
+            with span('calendar.freebusy', calendars=len(body['items'])):
+                calendars = self.service.freebusy().query(body=body).execute()['calendars']
+            for cid, result in calendars.items():
+                if result.get('errors'):
+                    reasons = ", ".join(error.get('reason', 'unknown') for error in result['errors'])
+                    raise ValueError(f"Cannot read calendar {cid}: {reasons}")
+                busy[cid] = BusyIntervals(
+                    (isoparse(interval['start']), isoparse(interval['end']))
+                    for interval in result['busy']
+                )
+        return busy
+
+    def find_common_slots(
+        self,
+        calendar_ids: Sequence[str],
+        num_slots: int = 5,
+        days: int = 30,
+        duration_minutes: Optional[int] = None,
+        working_hours: Optional[Dict[str, WorkingHours]] = None
+    ) -> List[datetime]:
+        """
+        Earliest slots when the host and every other calendar are free
+
+        Busy time for all calendars is fetched together and intersected as
+        bitmaps over the whole horizon.
+
+        Args:
+            calendar_ids (Sequence[str]): Attendee calendars; the host calendar is always included
+            num_slots (int): Number of slots to return
+            days (int): Horizon to search
+            duration_minutes (int): Meeting length; defaults to slot_minutes
+            working_hours (Dict[str, WorkingHours]): Per-calendar working hours;
+                calendars not listed use the host's business hours
+
+        Returns:
+            List[datetime]: Start times in the configured timezone, earliest first
+        """
+        working_hours = working_hours or {}
+        ids = list(dict.fromkeys([self.calendar_id, *calendar_ids]))
+        now = datetime.now(self.timezone)
+        grid = SlotGrid(now, days=days, slot_minutes=self.slot_minutes)
+        default_hours = WorkingHours(self.timezone, *self.business_hours)
+
+        try:
+            busy = self.get_busy_intervals_many(ids, grid.start, grid.end)
+        except Exception as e:
+            print(f"Error fetching availability: {str(e)}")
+            record_error('calendar.freebusy', e)
+            return []
+
+        engine = AvailabilityEngine(grid)
+        for cid in ids:
+            engine.add_calendar(cid, busy.get(cid, ()), working_hours.get(cid, default_hours))
+
+        duration = duration_minutes or self.slot_minutes
+        return engine.earliest(
+            num_slots,
+            duration_slots=-(-duration // self.slot_minutes),
+            not_before=now
+        )
+
+    def is_bookable_slot(self, start_time: datetime) -> bool:
+        """Whether start_time is a future slot on the grid, on a weekday within business hours"""
+        if start_time <= datetime.now(self.timezone):
+            return False
+        start_hour, end_hour = self.business_hours
+        # business_slots rounds up to the grid and skips off-hours, so a valid slot maps to itself
+        first = next(business_slots(start_time, self.timezone, self.slot_minutes, start_hour, end_hour))
+        return first == start_time
+
+    def check_availability(self, start_time: datetime, live: bool = False) -> bool:
+        """Check if the selected time slot is available"""
+        end_time = start_time + timedelta(minutes=self.slot_minutes)
+        if not live and self._refresh_mirror():
+            return self.mirror.is_free(self.calendar_id, start_time, end_time)
+
+        busy = self.get_busy_intervals(start_time, end_time, live=True)
+        return busy.is_free(start_time, end_time)
+
+    def _event_id(self, idempotency_key: str) -> str:
+        """Deterministic event id for an idempotency key (hex is valid base32hex)"""
+        return hashlib.sha1(f"{self.calendar_id}:{idempotency_key}".encode()).hexdigest()
+
+    def _build_event(
         self,
         start_time: datetime,
         name: str,
         email: str,
-        purpose: str
-    ) -> Optional[str]:
-        """Schedule a meeting and return the event ID if successful"""
+        purpose: str,
+        event_id: Optional[str] = None
+    ) -> Dict:
+        """Event body for a meeting starting at start_time, optionally with a fixed event id"""
+        end_time = start_time + timedelta(minutes=self.slot_minutes)
+        event = {
+            'summary': f"Meeting with {name}",
+            'description': purpose,
+            'start': {
+                'dateTime': start_time.isoformat(),
+                'timeZone': str(self.timezone),
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+                'timeZone': str(self.timezone),
+            },
+            'attendees': [
+                {'email': email},
+            ],
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'email', 'minutes': 24 * 60},
+                    {'method': 'popup', 'minutes': 30},
+                ],
+            },
+            'conferenceData': {
+                'createRequest': {
+                    'requestId': event_id or f"meeting_{uuid.uuid4().hex}",
+                    'conferenceSolutionKey': {'type': 'hangoutsMeet'},
+                }
+            },
+        }
+        if event_id:
+            event['id'] = event_id
+        return event
+
+    def _get_event(self, event_id: str) -> Optional[Dict]:
+        """Fetch an event by id; None if it does not exist or was cancelled"""
         try:
-            if not self.check_availability(start_time):
+            event = self.service.events().get(calendarId=self.calendar_id, eventId=event_id).execute()
+        except HttpError as e:
+            if e.resp.status in (404, 410):
                 return None
+            raise
+        return None if event.get('status') == 'cancelled' else event
 
-            end_time = start_time + timedelta(minutes=30)
-            
-            event = {
-                'summary': f"Meeting with {name}",
-                'description': purpose,
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': str(self.timezone),
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': str(self.timezone),
-                },
-                'attendees': [
-                    {'email': email},
-                ],
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': 24 * 60},
-                        {'method': 'popup', 'minutes': 30},
-                    ],
-                },
-                'conferenceData': {
-                    'createRequest': {
-                        'requestId': f"meeting_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                        'conferenceSolutionKey': {'type': 'hangoutsMeet'},
-                    }
-                },
-            }
+    def _insert_event(self, body: Dict) -> Dict:
+        """Insert an event; an id conflict means an earlier attempt already created it"""
+        try:
+            with span('calendar.insert'):
+                event = self.service.events().insert(
+                    calendarId=self.calendar_id,
+                    body=body,
+                    conferenceDataVersion=1,
+                    sendUpdates='all'
+                ).execute()
+        except HttpError as e:
+            existing = self._get_event(body['id']) if body.get('id') and e.resp.status == 409 else None
+            if existing is None:
+                raise
+            event = existing
+
+        if self.mirror is not None:
+            self.mirror.apply_event(self.calendar_id, event)
+        return event
+
+    def schedule_meeting(
+        self,
+        start_time: datetime,
+        name: str,
+        email: str,
+        purpose: str,
+        idempotency_key: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Schedule a meeting and return the event ID if successful
+
+        With a reservation store the slot is leased before the live
+        availability check, so concurrent bookings of one slot cannot both
+        succeed. A retry with the same idempotency_key returns the event the
+        first attempt created instead of booking a second one.
+
+        Raises:
+            BookingInProgress: If a request under the same idempotency_key
+                has not finished yet (None would read as "slot taken")
+        """
+        reservations = self.reservations
+        use_key = idempotency_key is not None and reservations is not None
+        if use_key:
+            state, event_id = reservations.claim_key(idempotency_key)
+            if state == 'pending':
+                raise BookingInProgress(f"Booking under key {idempotency_key!r} is still in progress")
+            if state != 'new':
+                return event_id
+
+        event_id = self._event_id(idempotency_key) if idempotency_key is not None else None
+        end_time = start_time + timedelta(minutes=self.slot_minutes)
+        lease_id = None
+        booked = None
+        try:
+            if reservations is not None:
+                lease_id = reservations.acquire(self.calendar_id, start_time, end_time)
+                if lease_id is None:
+                    return None
 
-            event = self.service.events().insert(
-                calendarId=self.calendar_id,
-                body=event,
-                conferenceDataVersion=1,
-                sendUpdates='all'
-            ).execute()
+            # Always confirm against the live calendar right before inserting
+            if not self.check_availability(start_time, live=True):
+                # The slot may be taken by our own earlier attempt under this key
+                existing = self._get_event(event_id) if event_id else None
+                booked = existing['id'] if existing else None
+                return booked
 
-            return event['id']
+            event = self._insert_event(self._build_event(start_time, name, email, purpose, event_id))
+            booked = event['id']
+            self._mark_booked(start_time)
+            return booked
 
         except Exception as e:
             print(f"Error scheduling meeting: {str(e)}")
+            record_error('calendar.schedule', e)
             return None
 
-    def get_next_available_slots(self, num_slots: int = 5) -> List[datetime]:
-        """Get next available meeting slots"""
-        slots = []
-        current = datetime.now(self.timezone)
-        
-        while len(slots) < num_slots:
-            # Skip to next business day if weekend
-            if current.weekday() >= 5:
-                current += timedelta(days=1)
+        finally:
+            try:
+                if lease_id is not None:
+                    if booked:
+                        reservations.confirm(lease_id, booked)
+                    else:
+                        reservations.release(lease_id)
+                if use_key:
+                    if booked:
+                        reservations.complete_key(idempotency_key, booked)
+                    else:
+                        reservations.abandon_key(idempotency_key)
+            except Exception as e:
+                print(f"Error updating reservations: {str(e)}")
+
+    def schedule_many(self, meetings: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Book several meetings with one freebusy query and batched inserts
+
+        Requests that overlap an earlier request in the list are rejected in
+        memory. The rest are leased (when a reservation store is configured),
+        checked against a single live freebusy query covering all of them,
+        and inserted through batch HTTP requests of up to batch_size events.
+
+        Args:
+            meetings (Sequence[Dict]): Items with start_time, name, email and purpose
+
+        Returns:
+            List[Dict]: One result per meeting, in input order, with
+                'start_time', 'event_id' and 'status' ('scheduled',
+                'conflict' or 'failed') plus a 'reason' when not scheduled
+        """
+        results = [
+            {'start_time': meeting['start_time'], 'event_id': None, 'status': 'failed', 'reason': None}
+            for meeting in meetings
+        ]
+        slot_length = timedelta(minutes=self.slot_minutes)
+
+        # Slots accepted so far, kept sorted for overlap checks
+        starts: List[datetime] = []
+        accepted: List[int] = []
+        for i, meeting in enumerate(meetings):
+            start = meeting['start_time']
+            pos = bisect_right(starts, start)
+            clash = (
+                (pos > 0 and starts[pos - 1] + slot_length > start)
+                or (pos < len(starts) and starts[pos] < start + slot_length)
+            )
+            if clash:
+                results[i].update(status='conflict', reason='overlaps another requested meeting')
                 continue
-                
-            # Check business hours (9 AM - 5 PM)
-            if 9 <= current.hour < 17:
-                if self.check_availability(current):
-                    slots.append(current)
-                current += timedelta(minutes=30)
-            else:
-                # Skip to next day at 9 AM
-                current = current.replace(
-                    hour=9, 
-                    minute=0, 
-                    second=0, 
-                    microsecond=0
-                ) + timedelta(days=1)
-        
-        return slots
\ No newline at end of file
+            starts.insert(pos, start)
+            accepted.append(i)
+
+        leases: Dict[int, str] = {}
+        if self.reservations is not None:
+            for i in list(accepted):
+                start = meetings[i]['start_time']
+                lease_id = self.reservations.acquire(self.calendar_id, start, start + slot_length)
+                if lease_id is None:
+                    results[i].update(status='conflict', reason='slot is being booked by another request')
+                    accepted.remove(i)
+                else:
+                    leases[i] = lease_id
+
+        try:
+            if accepted:
+                busy = self.get_busy_intervals(
+                    min(meetings[i]['start_time'] for i in accepted),
+                    max(meetings[i]['start_time'] for i in accepted) + slot_length,
+                    live=True
+                )
+                free = []
+                for i in accepted:
+                    start = meetings[i]['start_time']
+                    if busy.is_free(start, start + slot_length):
+                        free.append(i)
+                    else:
+                        results[i].update(status='conflict', reason='calendar is busy')
+                accepted = free
+        except Exception as e:
+            print(f"Error checking availability: {str(e)}")
+            record_error('calendar.freebusy', e)
+            for i in accepted:
+                results[i]['reason'] = f"availability check failed: {e}"
+            accepted = []
+
+        def on_insert(request_id, response, exception):
+            result = results[int(request_id)]
+            if exception is not None:
+                result['reason'] = str(exception)
+                return
+            result.update(status='scheduled', event_id=response['id'])
+            if self.mirror is not None:
+                self.mirror.apply_event(self.calendar_id, response)
+            self._mark_booked(result['start_time'])
+
+        for offset in range(0, len(accepted), self.batch_size):
+            batch = self.service.new_batch_http_request(callback=on_insert)
+            for i in accepted[offset:offset + self.batch_size]:
+                meeting = meetings[i]
+                batch.add(
+                    self.service.events().insert(
+                        calendarId=self.calendar_id,
+                        body=self._build_event(
+                            meeting['start_time'], meeting['name'], meeting['email'], meeting['purpose']
+                        ),
+                        conferenceDataVersion=1,
+                        sendUpdates='all'
+                    ),
+                    request_id=str(i)
+                )
+            try:
+                with span('calendar.batch_insert', size=len(accepted[offset:offset + self.batch_size])):
+                    batch.execute()
+            except Exception as e:
+                print(f"Error scheduling meetings: {str(e)}")
+                record_error('calendar.batch_insert', e)
+                for i in accepted[offset:offset + self.batch_size]:
+                    if results[i]['status'] != 'scheduled':
+                        results[i]['reason'] = str(e)
+
+        for i, lease_id in leases.items():
+            try:
+                if results[i]['status'] == 'scheduled':
+                    self.reservations.confirm(lease_id, results[i]['event_id'])
+                else:
+                    self.reservations.release(lease_id)
+            except Exception as e:
+                print(f"Error updating reservations: {str(e)}")
+
+        return results
+
+    def get_next_available_slots(self, num_slots: int = 5, max_days: int = 30) -> List[datetime]:
+        """
+        Get next available meeting slots
+
+        Busy time is fetched once per search window rather than once per
+        candidate slot, and free slots are computed in memory.
+
+        Args:
+            num_slots (int): Number of slots to return
+            max_days (int): How far ahead to search before giving up
+
+        Returns:
+            List[datetime]: Free slot start times in the configured timezone
+        """
+        slots = []
+        now = datetime.now(self.timezone)
+        horizon = now + timedelta(days=max_days)
+        slot_length = timedelta(minutes=self.slot_minutes)
+        start_hour, end_hour = self.business_hours
+
+        busy = None
+        window_end = None
+
+        for slot in business_slots(now, self.timezone, self.slot_minutes, start_hour, end_hour):
+            slot_end = slot + slot_length
+            if slot_end > horizon:
+                break
+
+            # Fetch the next window of busy time once the current one is used up
+            if window_end is None or slot_end > window_end:
+                window_end = min(slot + timedelta(days=self.search_window_days), horizon)
+                busy = self.get_busy_intervals(slot, window_end)
+
+            if busy.is_free(slot, slot_end):
+                slots.append(slot)
+                if len(slots) >= num_slots:
+                    break
+
+        return slots
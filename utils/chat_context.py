@@ -0,0 +1,127 @@
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .history import ConversationHistory
+from .metrics import span
+from .orchestrator import TurnOrchestrator
+from .registry import calendar_configured, get_calendar_manager, get_db_manager
+
+PERSONAL_INFO = {
+    "name": "Pavan Tejavath",
+    "title": "Full Stack Developer & ML Engineer",
+    "bio": """Full Stack Developer and Machine Learning enthusiast with a passion for building interactive web applications.
+    Originally from Hyderabad, India, and currently pursuing a Master's in Computer Science in the United States.""",
+    "skills": {
+        "Programming": ["Python", "JavaScript", "Java"],
+        "Web Development": ["React", "Node.js", "Django"],
+        "ML/AI": ["TensorFlow", "PyTorch", "NLP"]
+    }
+}
+
+SYSTEM_PROMPT = """You are Pavan's AI assistant. Help users learn about his experience, schedule meetings, and answer questions about his skills and projects.
+            When users want to schedule a meeting, offer the free slots listed in the context and ask which one suits them, along with their name and email, so it can be booked.
+            If no free slots are listed, ask for their preferred times instead; never invent availability."""
+
+# Prompts asking to set up a meeting: booking verbs, or free slots/time.
+# Bare "free", "call" or "available" ("is he available for full-time roles?") don't count.
+MEETING_PATTERN = re.compile(
+    r"\b(meet|meeting|meetings|schedul\w*|book|booking)\b|\bfree\s+(slot|time)s?\b",
+    re.IGNORECASE
+)
+
+
+def next_free_slots(manager, count: int = 5) -> List[datetime]:
+    """Upcoming free slots from the background availability table, or a live search while it loads"""
+    table = manager.availability_table()
+    slots: List[datetime] = []
+    for day, _, _ in table.day_summary():
+        slots.extend(table.free_slots(day)[:count - len(slots)])
+        if len(slots) >= count:
+            break
+    return slots or manager.get_next_available_slots(count)
+
+
+class ChatContext:
+    """
+    Builds the chat messages for a turn
+
+    Retrieval and, for scheduling questions once the calendar has been
+    authorized, a free-slot lookup run in the background while the budgeted history is assembled on the calling
+    thread (in the app it reads st.session_state and may call the
+    summarizer). Context that misses its deadline is left out.
+    """
+
+    def __init__(
+        self,
+        personal_info: Dict[str, Any],
+        orchestrator: TurnOrchestrator,
+        deadlines: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            personal_info (Dict): Name, title, bio and skills
+            orchestrator (TurnOrchestrator): Runs the context stages
+            deadlines (Dict): Seconds per background stage; defaults to
+                RETRIEVAL_DEADLINE_SECONDS (1.0) and CALENDAR_DEADLINE_SECONDS (1.5)
+        """
+        self.personal_info = personal_info
+        self.orchestrator = orchestrator
+        self.deadlines = deadlines or {
+            'retrieval': float(os.getenv("RETRIEVAL_DEADLINE_SECONDS", "1.0")),
+            'availability': float(os.getenv("CALENDAR_DEADLINE_SECONDS", "1.5")),
+        }
+
+    def personal_context(self) -> str:
+        """Personal information as prompt context"""
+        info = self.personal_info
+        skills = "; ".join(f"{area}: {', '.join(items)}" for area, items in info["skills"].items())
+        return f"About {info['name']} ({info['title']}): {' '.join(info['bio'].split())} Skills - {skills}"
+
+    def retrieval_context(self, prompt: str) -> str:
+        """Portfolio entries most relevant to the prompt"""
+        documents = get_db_manager().search_similar(prompt, n_results=3)['documents']
+        return "Relevant portfolio entries:\n" + "\n".join(f"- {doc}" for doc in documents) if documents else ""
+
+    def availability_context(self) -> str:
+        """Pavan's next free meeting slots"""
+        manager = get_calendar_manager(interactive=False)
+        return f"Pavan's next free {manager.slot_minutes}-minute slots: " + ", ".join(
+            slot.strftime("%a %b %d %I:%M %p %Z") for slot in next_free_slots(manager)
+        )
+
+    def build(
+        self,
+        prompt: str,
+        history: ConversationHistory,
+        messages: List[Dict[str, str]]
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """
+        Returns:
+            Tuple: The chat messages and the orchestrator's stage report
+        """
+        system_messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        background = {'retrieval': (lambda: self.retrieval_context(prompt), self.deadlines['retrieval'])}
+        if MEETING_PATTERN.search(prompt) and calendar_configured():
+            background['availability'] = (self.availability_context, self.deadlines['availability'])
+
+        with span('prompt.assembly') as assembly:
+            results, report = self.orchestrator.run(background, foreground={
+                'personal_info': self.personal_context,
+                'history': lambda: history.build(system_messages, messages, prompt, log=False),
+            })
+            assembly['critical'] = report['critical']
+
+        context = [
+            {"role": "system", "content": results[name]}
+            for name in ('personal_info', 'retrieval', 'availability') if results.get(name)
+        ]
+        if 'history' not in results:
+            # Summarizing failed; fall back to the prompt alone
+            final = system_messages + context + [{"role": "user", "content": prompt}]
+        else:
+            built = results['history']
+            final = built[:len(system_messages)] + context + built[len(system_messages):]
+        history.record_prompt(final)
+        return final, report
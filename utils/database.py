@@ -2,11 +2,38 @@ import chromadb
 import os
 from dotenv import load_dotenv
 from chromadb.config import Settings
-from typing import List, Dict, Any
-import json
+from chromadb.utils import embedding_functions
+from typing import List, Dict, Any, Optional, Sequence
+
+from .embedding_cache import EmbeddingCache
+from .ingestion import IngestionPipeline, filterable_metadata
+from .metrics import record_error, span, timed
+from .retrieval import BM25Index, build_where, matches, reciprocal_rank_fusion
+from .vector_index import QuantizedVectorIndex
 
 class ChromaDBManager:
-    def __init__(self):
+    def __init__(
+        self,
+        embedding_function=None,
+        cache_embeddings: bool = True,
+        sync_sources: bool = True,
+        vector_index: Optional[str] = None
+    ):
+        """
+        Initialize the ChromaDB client and portfolio collection
+
+        Args:
+            embedding_function: Optional Chroma embedding function; Chroma's
+                default model is used when omitted
+            cache_embeddings (bool): Cache query and document embeddings so
+                repeated queries and collection rebuilds skip the model
+            sync_sources (bool): Sync the data files into the collection; off
+                for read-only API workers, whose parent process syncs once
+            vector_index (str): 'int8', 'float16' or 'off' for the in-process
+                vector index that serves searches while the collection has
+                at most VECTOR_INDEX_MAX_ROWS documents; defaults to
+                VECTOR_INDEX ('int8'). Needs cache_embeddings.
+        """
         load_dotenv()
         self.db_path = os.getenv("DATABASE_PATH", "./chroma_db")
         
@@ -19,58 +46,154 @@ class ChromaDBManager:
             )
         )
         
+        self.embedder = None
+        if cache_embeddings:
+            self.embedder = EmbeddingCache(
+                embedding_function or embedding_functions.DefaultEmbeddingFunction(),
+                cache_dir=os.getenv("EMBEDDING_CACHE_DIR", os.path.join(self.db_path, "embedding_cache"))
+            )
+            embedding_function = self.embedder
+
+        # Only pass an embedding function if one was given, so Chroma keeps its default
+        self.embedding_function = embedding_function
+        self.collection_kwargs = {"metadata": {"hnsw:space": "cosine"}}
+        if embedding_function is not None:
+            self.collection_kwargs["embedding_function"] = embedding_function
+
         # Create or get the collection
         self.collection = self.client.get_or_create_collection(
             name="portfolio_data",
-            metadata={"hnsw:space": "cosine"}
+            **self.collection_kwargs
         )
         
-        # Initialize the database if empty
-        self._initialize_database()
+        # Data files kept in sync with the collection, with their source names
+        self.sources = [
+            ('data/portfolio_data.json', 'portfolio_data'),
+            ('data/personal_info.json', 'personal_info'),
+        ]
+        self.pipeline = IngestionPipeline(
+            self.collection,
+            batch_size=int(os.getenv("INGEST_BATCH_SIZE", "64"))
+        )
+
+        # Keyword index kept in sync with every pipeline write
+        self.keyword_index = BM25Index()
+        self.pipeline.indexes.append(self.keyword_index)
+
+        # Quantized copy of the embeddings for exact in-process search,
+        # snapshotted next to the collection for other processes to map
+        vector_index = vector_index or os.getenv("VECTOR_INDEX", "int8")
+        self.vector_index = None
+        self.vector_index_path = os.path.join(self.db_path, "vector_index")
+        if vector_index != "off" and self.embedder is not None:
+            self.vector_index = QuantizedVectorIndex(
+                self.embedder.embed_documents,
+                dtype=vector_index,
+                max_rows=int(os.getenv("VECTOR_INDEX_MAX_ROWS", "100000"))
+            )
+            self.pipeline.indexes.append(self.vector_index)
+
+        # Pick up new, changed and removed records
+        self.sync_sources = sync_sources
+        if sync_sources:
+            self._initialize_database()
+        else:
+            self._load_keyword_index()
+            self._load_vector_index()
 
     def _initialize_database(self):
-        """Initialize the database with portfolio data if it's empty"""
+        """Bring the collection in line with the portfolio data files"""
         try:
-            # Check if collection is empty
-            if self.collection.count() == 0:
-                self._load_initial_data()
+            self._remove_legacy_documents()
+            self._load_keyword_index()
+            # Load first so the sync's writes land on the index
+            self._load_vector_index()
+            changed = False
+            for path, source in self.sources:
+                if os.path.exists(path):
+                    stats = self.pipeline.sync_source(path, source)
+                    if stats['added'] or stats['deleted']:
+                        changed = True
+                        print(
+                            f"Synced {source}: {stats['added']} added, {stats['deleted']} deleted, "
+                            f"{stats['unchanged']} unchanged ({stats['docs_per_second']} docs/s)"
+                        )
+            if changed and self.vector_index is not None:
+                self.vector_index.save(self.vector_index_path)
         except Exception as e:
             print(f"Error initializing database: {e}")
 
-    def _load_initial_data(self):
-        """Load initial portfolio data into ChromaDB"""
-        try:
-            with open('data/portfolio_data.json', 'r') as f:
-                portfolio_data = json.load(f)
-            
-            # Prepare data for insertion
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for idx, item in enumerate(portfolio_data):
-                documents.append(item['content'])
-                metadatas.append({
-                    'type': item['type'],
-                    'tags': ','.join(item.get('tags', [])),
-                    'date': item.get('date', '')
-                })
-                ids.append(f"doc_{idx}")
-            
-            # Add data to collection
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
+    def _remove_legacy_documents(self):
+        """Drop documents stored under the old sequential doc_N ids"""
+        if not self.collection.get(ids=['doc_0'], include=[])['ids']:
+            return
+        ids = self.collection.get(include=[])['ids']
+        legacy = [doc_id for doc_id in ids if doc_id.startswith('doc_')]
+        if legacy:
+            self.collection.delete(ids=legacy)
+
+    def _load_keyword_index(self, page_size: int = 1000):
+        """Rebuild the keyword index from the documents in the collection"""
+        self.keyword_index.clear()
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=['documents', 'metadatas'],
+                limit=page_size,
+                offset=offset
             )
-            print(f"Successfully initialized database with {len(documents)} documents")
+            if not page['ids']:
+                break
+            self.keyword_index.add(page['ids'], page['documents'], page['metadatas'])
+            offset += len(page['ids'])
+
+    def _load_vector_index(self):
+        """
+        Bring the vector index in line with the collection
+
+        Maps the saved snapshot when it matches the collection, otherwise
+        rebuilds from the stored embeddings; a syncing process then saves
+        a fresh snapshot for the others.
+        """
+        index = self.vector_index
+        if index is None:
+            return
+        try:
+            count = self.collection.count()
+            if count > index.max_rows:
+                index.clear()
+                index.overflowed = True
+                return
+            if len(index) == count and not index.overflowed:
+                return
+            if index.load(self.vector_index_path) and len(index) == count:
+                if set(index.rows) == set(self.collection.get(include=[])['ids']):
+                    return
+            index.load_collection(self.collection)
+            if self.sync_sources:
+                index.save(self.vector_index_path)
         except Exception as e:
-            print(f"Error loading initial data: {e}")
+            print(f"Error loading vector index: {e}")
+            record_error('retrieval.vector_index', e)
+            index.clear()
+
+    def _vector_index_ready(self, count: int) -> bool:
+        """Whether the in-process index can answer for a collection of this size"""
+        index = self.vector_index
+        if index is None or count > index.max_rows:
+            return False
+        # Another process may have written to the collection
+        if len(index) != count:
+            self._load_vector_index()
+        return len(index) == count
 
     def add_data(self, texts: List[str], metadata_list: List[Dict[str, Any]]) -> bool:
         """
         Add new data to the database
         
+        Documents get content-hash ids, so adding the same document twice
+        keeps a single copy.
+
         Args:
             texts (List[str]): List of text documents to add
             metadata_list (List[Dict]): List of metadata dictionaries for each document
@@ -79,45 +202,115 @@ class ChromaDBManager:
             bool: Success status
         """
         try:
-            ids = [f"doc_{i}" for i in range(self.collection.count(), 
-                                           self.collection.count() + len(texts))]
-            
-            self.collection.add(
-                documents=texts,
-                metadatas=metadata_list,
-                ids=ids
-            )
+            metadata_list = [
+                filterable_metadata({'source': 'manual', **metadata})
+                for metadata in metadata_list
+            ]
+            self.pipeline.upsert(texts, metadata_list)
             return True
         except Exception as e:
             print(f"Error adding data: {e}")
             return False
 
-    def search_similar(self, query: str, n_results: int = 3) -> Dict[str, Any]:
+    @timed('retrieval')
+    def search_similar(
+        self,
+        query: str,
+        n_results: int = 3,
+        doc_type: Optional[str] = None,
+        tags: Optional[Sequence[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        hybrid: bool = True
+    ) -> Dict[str, Any]:
         """
         Search for similar documents
         
+        Vector results are fused with BM25 keyword results by reciprocal
+        rank. Filters are applied before scoring in both searches.
+
         Args:
             query (str): Query text
             n_results (int): Number of results to return
+            doc_type (str): Only documents of this type
+            tags (Sequence[str]): Only documents carrying all of these tags
+            date_from (str): Only documents dated on/after this (YYYY or YYYY-MM)
+            date_to (str): Only documents dated on/before this (YYYY or YYYY-MM)
+            hybrid (bool): Fuse in keyword results; False gives pure vector search
             
         Returns:
-            Dict: Search results with documents and metadata
+            Dict: Search results with ids, documents, metadata, distances
+                (None for keyword-only hits) and fused scores
         """
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                include=['documents', 'metadatas', 'distances']
-            )
-            
-            return {
-                'documents': results['documents'][0],
-                'metadata': results['metadatas'][0],
-                'distances': results['distances'][0]
-            }
+            where = build_where(doc_type, tags, date_from, date_to)
+            count = self.collection.count()
+            if count == 0:
+                return {'ids': [], 'documents': [], 'metadata': [], 'distances': [], 'scores': []}
+
+            # Another process may have written to the collection
+            if hybrid and len(self.keyword_index) != count:
+                self._load_keyword_index()
+
+            # Fetch extra candidates from each retriever so fusion has room to rerank
+            candidates = min(count, n_results * 4 if hybrid else n_results)
+            if self.embedder is not None:
+                query_kwargs = {'query_embeddings': self.embedder.embed_queries([query])}
+            else:
+                query_kwargs = {'query_texts': [query]}
+            if self._vector_index_ready(count):
+                with span('retrieval.vector_index', rows=count):
+                    hits = self.vector_index.search(query_kwargs['query_embeddings'][0], candidates, where)
+                found = {}
+                for doc_id, distance in hits:
+                    entry = self.vector_index.get(doc_id)
+                    if entry is not None:
+                        found[doc_id] = (*entry, distance)
+                vector_ids = list(found)
+            else:
+                results = self.collection.query(
+                    **query_kwargs,
+                    n_results=candidates,
+                    where=where,
+                    include=['documents', 'metadatas', 'distances']
+                )
+                vector_ids = results['ids'][0]
+                found = {
+                    doc_id: (document, metadata, distance)
+                    for doc_id, document, metadata, distance in zip(
+                        vector_ids,
+                        results['documents'][0],
+                        results['metadatas'][0],
+                        results['distances'][0]
+                    )
+                }
+
+            if not hybrid:
+                ranked = [(doc_id, 1.0 - found[doc_id][2]) for doc_id in vector_ids]
+            else:
+                keyword_ids = [doc_id for doc_id, _ in self.keyword_index.search(query, candidates, where)]
+                ranked = reciprocal_rank_fusion([vector_ids, keyword_ids])[:n_results]
+
+            output = {'ids': [], 'documents': [], 'metadata': [], 'distances': [], 'scores': []}
+            for doc_id, score in ranked[:n_results]:
+                if doc_id in found:
+                    document, metadata, distance = found[doc_id]
+                else:
+                    document = self.keyword_index.documents.get(doc_id)
+                    metadata = self.keyword_index.metadatas.get(doc_id)
+                    distance = None
+                    if document is None or not matches(metadata, where):
+                        continue
+                output['ids'].append(doc_id)
+                output['documents'].append(document)
+                output['metadata'].append(metadata)
+                output['distances'].append(distance)
+                output['scores'].append(score)
+            return output
         except Exception as e:
             print(f"Error searching database: {e}")
-            return {'documents': [], 'metadata': [], 'distances': []}
+            record_error('retrieval', e)
+            return {'ids': [], 'documents': [], 'metadata': [], 'distances': [], 'scores': []}
 
     def delete_all(self) -> bool:
         """Delete all data from the collection"""
@@ -125,8 +318,12 @@ class ChromaDBManager:
             self.client.delete_collection("portfolio_data")
             self.collection = self.client.create_collection(
                 name="portfolio_data",
-                metadata={"hnsw:space": "cosine"}
+                **self.collection_kwargs
             )
+            self.pipeline.collection = self.collection
+            self.keyword_index.clear()
+            if self.vector_index is not None:
+                self.vector_index.clear()
             return True
         except Exception as e:
             print(f"Error deleting collection: {e}")
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: don't share a cache_dir between processes
+    fcntl = None
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by a hash of the model name and text
+
+    Queries go through a small in-memory LRU. Document vectors are stored
+    on disk as one contiguous float32 array, read through a memory map,
+    with a hash-to-row index, so rebuilding a collection skips embedding
+    documents that were seen before.
+
+    An instance can be used directly as a Chroma embedding function; calls
+    made that way use the document tier. Appends take an exclusive flock on
+    the cache directory and place rows by the file size under it, so
+    processes sharing a cache_dir never write over each other's rows.
+    """
+
+    def __init__(
+        self,
+        embedding_function,
+        model_name: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        memory_entries: int = 1024
+    ):
+        """
+        Args:
+            embedding_function: Chroma-compatible function mapping texts to vectors
+            model_name (str): Name mixed into cache keys; inferred if omitted
+            cache_dir (str): Directory for the on-disk tier
+            memory_entries (int): Capacity of the in-memory query tier
+        """
+        self.embedding_function = embedding_function
+        self.model_name = model_name or (
+            getattr(embedding_function, 'MODEL_NAME', None)
+            or getattr(embedding_function, 'model_name', None)
+            or type(embedding_function).__name__
+        )
+        self.cache_dir = cache_dir or os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache")
+        self.memory_entries = memory_entries
+
+        self.memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.lock = threading.RLock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.vectors_path = os.path.join(self.cache_dir, 'vectors.f32')
+        self.index_path = os.path.join(self.cache_dir, 'index.tsv')
+        self.meta_path = os.path.join(self.cache_dir, 'meta.json')
+        self.lock_path = os.path.join(self.cache_dir, 'append.lock')
+        self.dim: Optional[int] = None
+        self.index: Dict[str, int] = {}
+        self.rows = 0
+        self._index_offset = 0
+        self._mmap: Optional[np.memmap] = None
+        self._load()
+
+    def _load(self):
+        """Catch up with the files on disk, ignoring rows whose vectors were never fully written"""
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path, 'r') as f:
+                self.dim = json.load(f)['dim']
+
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        self.rows = size // (self.dim * 4)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                f.seek(self._index_offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Another process is mid-write; read it next time
+                    self._index_offset += len(line)
+                    key, _, row = line.decode('utf-8').rstrip('\n').partition('\t')
+                    if row and int(row) < self.rows:
+                        self.index[key] = int(row)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _read_row(self, row: int) -> np.ndarray:
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(self.rows, self.dim))
+        return np.array(self._mmap[row])
+
+    def _append(self, keys: List[str], vectors: np.ndarray):
+        """Append vectors to the disk tier, then record their rows in the index"""
+        with open(self.lock_path, 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Pick up rows other processes appended since the last look
+            self._load()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.meta_path, 'w') as f:
+                    json.dump({'dim': self.dim, 'model': self.model_name}, f)
+            fresh = [i for i, key in enumerate(keys) if key not in self.index]
+            if not fresh:
+                return
+
+            row_bytes = self.dim * 4
+            with open(self.vectors_path, 'ab') as f:
+                # Drop a partial row left by a writer that died mid-append
+                f.truncate(self.rows * row_bytes)
+                f.write(np.ascontiguousarray(vectors[fresh], dtype=np.float32).tobytes())
+            with open(self.index_path, 'a') as f:
+                f.truncate(self._index_offset)
+                for offset, i in enumerate(fresh):
+                    row = self.rows + offset
+                    self.index[keys[i]] = row
+                    f.write(f"{keys[i]}\t{row}\n")
+                self._index_offset = f.tell()
+            self.rows += len(fresh)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _embed(self, texts: List[str], persist: bool) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    vectors[i] = self.memory[key]
+                    self.stats['memory_hits'] += 1
+                elif key in self.index:
+                    vectors[i] = self._read_row(self.index[key])
+                    self.stats['disk_hits'] += 1
+                    if not persist:
+                        self._remember(key, vectors[i])
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing:
+            # Embed each distinct missing text once
+            missing_keys = list(missing)
+            computed = np.asarray(
+                self.embedding_function([texts[missing[key][0]] for key in missing_keys]),
+                dtype=np.float32
+            )
+            with self.lock:
+                self.stats['misses'] += len(missing_keys)
+                if persist:
+                    new = [(j, key) for j, key in enumerate(missing_keys) if key not in self.index]
+                    if new:
+                        self._append([key for _, key in new], computed[[j for j, _ in new]])
+                for key, vector in zip(missing_keys, computed):
+                    if not persist:
+                        self._remember(key, vector)
+                    for i in missing[key]:
+                        vectors[i] = vector
+
+        return [vector.tolist() for vector in vectors]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed query texts through the in-memory tier (falling back to disk)"""
+        return self._embed(list(texts), persist=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed document texts through the on-disk tier"""
+        return self._embed(list(texts), persist=True)
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self.embed_documents(input)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rates per tier and memory/disk footprint"""
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            lookups = sum(self.stats.values())
+            stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+            stats['memory_entries'] = len(self.memory)
+            stats['memory_bytes'] = sum(vector.nbytes for vector in self.memory.values())
+            stats['disk_rows'] = self.rows
+            stats['disk_bytes'] = self.rows * (self.dim or 0) * 4
+            # Rough size of the hash-to-row index held in memory
+            stats['index_bytes'] = len(self.index) * 200
+        return stats
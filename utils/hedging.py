@@ -0,0 +1,101 @@
+import threading
+from typing import Any, Dict
+
+from .metrics import Histogram, metrics
+
+
+class HedgePolicy:
+    """
+    When to send a second, duplicate request
+
+    The hedge delay tracks a recent percentile of single-request latency
+    (the full response for chat, the first token for streams), so only the
+    slowest few percent of requests get hedged. A credit budget caps the
+    hedge rate: every request earns max_hedge_rate credits and every hedge
+    spends one, so at most that fraction of requests is sent twice.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        max_hedge_rate: float = 0.1,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.05,
+        max_delay: float = 10.0,
+        min_samples: int = 20,
+        window: int = 500,
+        max_credits: float = 10.0
+    ):
+        """
+        Args:
+            percentile (float): Latency percentile used as the hedge delay
+            max_hedge_rate (float): Largest fraction of requests that may be hedged
+            initial_delay (float): Delay used until min_samples latencies are known
+            min_delay (float): Lower bound of the delay
+            max_delay (float): Upper bound of the delay
+            min_samples (int): Samples needed before the percentile is trusted
+            window (int): Recent latencies kept per kind
+            max_credits (float): Largest burst of hedges the budget can save up
+        """
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_credits = max_credits
+
+        self.latencies: Dict[str, Histogram] = {}
+        self.credits = 1.0
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'budget_denied': 0}
+
+    def _histogram(self, kind: str) -> Histogram:
+        with self.lock:
+            if kind not in self.latencies:
+                self.latencies[kind] = Histogram(window=self.window)
+            return self.latencies[kind]
+
+    def delay(self, kind: str) -> float:
+        """Seconds to wait for the first attempt before hedging"""
+        histogram = self._histogram(kind)
+        if len(histogram.recent) < self.min_samples:
+            return self.initial_delay
+        return min(self.max_delay, max(self.min_delay, histogram.percentile(self.percentile)))
+
+    def observe(self, kind: str, seconds: float):
+        """Record the latency of one upstream attempt"""
+        self._histogram(kind).observe(seconds)
+        metrics.observe('llm_attempt_seconds', seconds, kind=kind)
+
+    def start(self):
+        """Count a new request and earn its share of hedge budget"""
+        with self.lock:
+            self.stats['requests'] += 1
+            self.credits = min(self.max_credits, self.credits + self.max_hedge_rate)
+
+    def try_hedge(self, kind: str) -> bool:
+        """Spend one credit on a hedge if the budget allows it"""
+        with self.lock:
+            if self.credits < 1:
+                self.stats['budget_denied'] += 1
+                return False
+            self.credits -= 1
+            self.stats['hedges'] += 1
+        metrics.inc('llm_hedges_total', kind=kind)
+        return True
+
+    def record_win(self, kind: str):
+        """The hedge finished before the original request"""
+        with self.lock:
+            self.stats['hedge_wins'] += 1
+        metrics.inc('llm_hedge_wins_total', kind=kind)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            kinds = list(self.latencies)
+        stats['hedge_rate'] = stats['hedges'] / stats['requests'] if stats['requests'] else 0.0
+        stats['delays'] = {kind: self.delay(kind) for kind in kinds}
+        return stats
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, MutableMapping
+
+from .metrics import record_error, span
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
+# Tokens the chat format adds around every message
+MESSAGE_OVERHEAD = 4
+
+_encodings: Dict[str, Any] = {}
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Count tokens with tiktoken when installed, otherwise estimate ~4 chars per token"""
+    if tiktoken is None:
+        return max(1, len(text) // 4) if text else 0
+
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("cl100k_base")
+    return len(_encodings[model].encode(text))
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo") -> int:
+    """Count tokens for a list of chat messages including per-message overhead"""
+    return sum(count_tokens(m["content"], model) + MESSAGE_OVERHEAD for m in messages)
+
+
+class ConversationHistory:
+    """
+    Token-budgeted conversation window with a rolling summary
+
+    The most recent turns are sent verbatim as long as they fit in the
+    budget. Turns that fall out of the window are folded into a running
+    summary, which is only updated when new turns are evicted.
+
+    State lives in a caller-supplied mapping (st.session_state in the app)
+    so it persists across Streamlit reruns.
+    """
+
+    def __init__(
+        self,
+        state: MutableMapping[str, Any],
+        summarize: Callable[[str, List[Dict[str, str]]], str],
+        budget_tokens: int = 1500,
+        summary_tokens: int = 300,
+        model: str = "gpt-3.5-turbo",
+        max_log: int = 50
+    ):
+        """
+        Args:
+            state (MutableMapping): Where summary and metrics are stored
+            summarize (Callable): Takes the previous summary and the newly
+                evicted messages and returns the updated summary
+            budget_tokens (int): Token budget for history (window + summary)
+            summary_tokens (int): Target size of the rolling summary
+            model (str): Model name used for token counting
+            max_log (int): Turns kept in the prompt token log
+        """
+        self.state = state
+        self.summarize = summarize
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.model = model
+        self.max_log = max_log
+
+        self.state.setdefault('history_summary', '')
+        self.state.setdefault('history_summarized', 0)  # Messages folded into the summary
+        self.state.setdefault('history_token_log', [])
+
+    def _window_start(self, messages: List[Dict[str, str]], budget: int) -> int:
+        """Index of the oldest unsummarized message that still fits in budget"""
+        start = len(messages)
+        used = 0
+        while start > self.state['history_summarized']:
+            cost = count_tokens(messages[start - 1]["content"], self.model) + MESSAGE_OVERHEAD
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+        return start
+
+    def _fallback_summary(self, previous: str, evicted: List[Dict[str, str]]) -> str:
+        """Extractive summary used when the summarizer fails"""
+        lines = [previous] if previous else []
+        lines += [f"{m['role']}: {m['content'][:200]}" for m in evicted]
+        summary = "\n".join(lines)
+        # Keep the most recent part within the summary budget
+        limit = self.summary_tokens * 4
+        return summary[-limit:]
+
+    def _fold(self, messages: List[Dict[str, str]], start: int):
+        """Fold messages[summarized:start] into the rolling summary"""
+        evicted = messages[self.state['history_summarized']:start]
+        if not evicted:
+            return
+
+        previous = self.state['history_summary']
+        try:
+            with span('history.summarize', messages=len(evicted)):
+                summary = self.summarize(previous, evicted)
+        except Exception as e:
+            print(f"Error summarizing history: {str(e)}")
+            record_error('history.summarize', e)
+            summary = self._fallback_summary(previous, evicted)
+
+        self.state['history_summary'] = summary
+        self.state['history_summarized'] = start
+
+    def build(
+        self,
+        system_messages: List[Dict[str, str]],
+        messages: List[Dict[str, str]],
+        prompt: str,
+        log: bool = True
+    ) -> List[Dict[str, str]]:
+        """
+        Assemble the messages to send for a new prompt
+
+        Args:
+            system_messages (List[Dict]): Leading system messages
+            messages (List[Dict]): Full conversation so far, excluding prompt
+            prompt (str): The new user message
+            log (bool): Record the result's size in the token log; callers
+                that add more context pass False and call record_prompt
+
+        Returns:
+            List[Dict]: System messages, summary, recent window and prompt
+        """
+        summary_cost = count_tokens(self.state['history_summary'], self.model)
+        start = self._window_start(messages, self.budget_tokens - summary_cost)
+
+        if start > self.state['history_summarized']:
+            # Evict down to 3/4 of the budget so summarization runs every few
+            # turns rather than on every turn once the window is full
+            start = self._window_start(messages, (self.budget_tokens - self.summary_tokens) * 3 // 4)
+            self._fold(messages, start)
+
+        result = list(system_messages)
+        if self.state['history_summary']:
+            result.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {self.state['history_summary']}"
+            })
+        result.extend({"role": m["role"], "content": m["content"]} for m in messages[start:])
+        result.append({"role": "user", "content": prompt})
+
+        if log:
+            self.record_prompt(result)
+        return result
+
+    def record_prompt(self, messages: List[Dict[str, str]]):
+        """Log the token count of the messages sent for a turn, keeping the last max_log turns"""
+        token_log = self.state['history_token_log']
+        token_log.append(count_message_tokens(messages, self.model))
+        del token_log[:-self.max_log]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Prompt tokens per turn and the current summary size"""
+        log = self.state['history_token_log']
+        return {
+            'prompt_tokens_per_turn': list(log),
+            'last_prompt_tokens': log[-1] if log else 0,
+            'summary_tokens': count_tokens(self.state['history_summary'], self.model),
+            'summarized_messages': self.state['history_summarized'],
+        }
+
+
+def _digest(messages: List[Dict[str, str]]) -> str:
+    canonical = json.dumps([[m["role"], m["content"]] for m in messages])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SessionStates:
+    """
+    Bounded, process-wide LRU of ConversationHistory state per session
+
+    Lets a stateless API keep each client's rolling summary between
+    requests instead of re-summarizing every evicted turn on every call.
+    A saved state is only reused while the history the client sends still
+    starts with the messages its summary covers; an edited, truncated or
+    foreign history starts from scratch.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        """
+        Args:
+            max_sessions (int): Sessions kept before the least recently used is dropped
+        """
+        self.max_sessions = max_sessions
+        self.states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def get(self, session_id: str, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """The saved state for a session if it matches messages, otherwise a fresh one"""
+        with self.lock:
+            state = self.states.get(session_id)
+            if state is not None:
+                self.states.move_to_end(session_id)
+        if state is None:
+            return {}
+        covered = state.get('history_summarized', 0)
+        if covered > len(messages) or _digest(messages[:covered]) != state.get('history_digest'):
+            return {}
+        return state
+
+    def put(self, session_id: str, state: Dict[str, Any], messages: List[Dict[str, str]]):
+        """Save a session's state after a turn, recording which messages its summary covers"""
+        state['history_digest'] = _digest(messages[:state.get('history_summarized', 0)])
+        with self.lock:
+            self.states[session_id] = state
+            self.states.move_to_end(session_id)
+            while len(self.states) > self.max_sessions:
+                self.states.popitem(last=False)
+
+
+def llm_summarizer(llm, max_tokens: int = 300) -> Callable[[str, List[Dict[str, str]]], str]:
+    """Build a summarize callback backed by OpenAIManager.chat"""
+    def summarize(previous: str, evicted: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in evicted)
+        messages = [
+            {
+                "role": "system",
+                "content": "Update the running summary of a conversation between a visitor and "
+                           "Pavan's portfolio assistant. Keep names, dates, requests and open "
+                           f"questions. Reply with the summary only, under {max_tokens} tokens."
+            },
+            {
+                "role": "user",
+                "content": f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"
+            }
+        ]
+        return llm.chat(messages, max_tokens=max_tokens)
+    return summarize
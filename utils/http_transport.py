@@ -0,0 +1,171 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import Histogram, metrics
+
+# Status codes worth retrying: rate limits and transient upstream failures
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Methods safe to resend after a read timeout: the server may already have
+# acted on a request it was too slow to answer
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class HTTPTransport:
+    """
+    Pooled keep-alive HTTP transport with timeouts and a retry policy
+
+    A single requests.Session is shared so connections (and their TLS
+    handshakes) are reused between calls. Retries use jittered exponential
+    backoff and honor the Retry-After header on 429/503 responses. A read
+    timeout is only retried for idempotent methods; a POST that timed out
+    may still be running upstream, so it is only resent when it never
+    reached the server.
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0
+    ):
+        self.pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", "10"))
+        self.connect_timeout = connect_timeout or float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+        self.read_timeout = read_timeout or float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'retries': 0,
+            'failures': 0,
+        }
+        self.latency = Histogram(window=1000)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header given either in seconds or as an HTTP date"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _record(self, latency: float, retries: int, failed: bool):
+        with self.lock:
+            self.stats['calls'] += 1
+            self.stats['retries'] += retries
+            self.stats['failures'] += int(failed)
+        self.latency.observe(latency)
+        metrics.observe('http_request_seconds', latency)
+        metrics.inc('http_retries_total', retries)
+        if failed:
+            metrics.inc('http_failures_total')
+
+    def _retryable(self, method: str, error: Exception) -> bool:
+        """Whether a failed attempt can be resent without risking a duplicate"""
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        # ConnectTimeout is also a ConnectionError; ReadTimeout is not
+        return isinstance(error, requests.ConnectionError)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying connection errors, timeouts and retryable statuses
+
+        The final response is returned even if its status is an error, so
+        callers keep handling non-200 responses themselves. The number of
+        retries and the call latency are attached to the response as
+        `retries` and `latency`.
+        """
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        started = time.perf_counter()
+        attempt = 0
+
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries or not self._retryable(method, e):
+                    self._record(time.perf_counter() - started, attempt, failed=True)
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._retry_after(response)
+                response.close()
+                time.sleep(min(delay, self.backoff_max) if delay is not None else self._backoff(attempt))
+                attempt += 1
+                continue
+
+            latency = time.perf_counter() - started
+            self._record(latency, attempt, failed=response.status_code >= 400)
+            response.retries = attempt
+            response.latency = latency
+            return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of call, retry and latency counters"""
+        with self.lock:
+            stats = dict(self.stats)
+        summary = self.latency.summary()
+        stats['latency_avg'] = summary['mean']
+        stats['latency_p50'] = summary['p50']
+        stats['latency_p95'] = summary['p95']
+        return stats
+
+
+_transport: Optional[HTTPTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """
+    Return the process-wide transport
+
+    The module stays imported across Streamlit reruns, so every session
+    and rerun shares the same connection pool.
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HTTPTransport()
+    return _transport
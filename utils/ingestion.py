@@ -0,0 +1,322 @@
+import hashlib
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .retrieval import date_key, tag_key
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+class _StreamReader:
+    """Buffered reader that decodes one JSON value at a time from a file"""
+
+    def __init__(self, path: str, chunk_size: int = 1 << 16):
+        self.file = open(path, 'r', encoding='utf-8')
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def close(self):
+        self.file.close()
+
+    def _fill(self) -> bool:
+        """Read another chunk into the buffer; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in {self.file.name}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(path: str) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array without loading the whole file"""
+    reader = _StreamReader(path)
+    try:
+        reader.expect('[')
+        if reader.peek() == ']':
+            return
+        while True:
+            yield reader.value()
+            if reader.expect(',]') == ']':
+                return
+    finally:
+        reader.close()
+
+
+def iter_json_object(path: str) -> Iterator[Tuple[str, Any]]:
+    """Yield (key, value) members of a top-level JSON object without loading the whole file"""
+    reader = _StreamReader(path)
+    try:
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            yield key, reader.value()
+            if reader.expect(',}') == '}':
+                return
+    finally:
+        reader.close()
+
+
+def iter_jsonl(path: str) -> Iterator[Any]:
+    """Yield one record per non-empty line of a JSONL file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _portfolio_record(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'content': item['content'],
+        'type': item.get('type', 'unknown'),
+        'tags': item.get('tags', []),
+        'date': item.get('date', ''),
+    }
+
+
+def _describe(value: Any) -> str:
+    if isinstance(value, dict):
+        return "; ".join(f"{k}: {_describe(v)}" for k, v in value.items())
+    if isinstance(value, list):
+        return ", ".join(_describe(v) for v in value)
+    return str(value)
+
+
+def _profile_records(key: str, value: Any) -> Iterator[Dict[str, Any]]:
+    """Flatten one top-level member of personal_info.json into documents"""
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        # education, projects, languages: one document per entry
+        for entry in value:
+            tags = entry.get('technologies', [])
+            yield {
+                'content': f"{key}: {_describe(entry)}",
+                'type': key,
+                'tags': tags if isinstance(tags, list) else [],
+                'date': str(entry.get('duration', '')),
+            }
+    elif isinstance(value, dict):
+        # skills, contact: one document per section
+        for section, items in value.items():
+            yield {
+                'content': f"{key} - {section}: {_describe(items)}",
+                'type': key,
+                'tags': [section] + (items if isinstance(items, list) else []),
+                'date': '',
+            }
+    else:
+        yield {'content': f"{key}: {_describe(value)}", 'type': key, 'tags': [], 'date': ''}
+
+
+def iter_source_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream normalized records from a JSON or JSONL source
+
+    Arrays and JSONL hold portfolio items ({type, content, tags, date});
+    a top-level object is treated as a profile like personal_info.json and
+    flattened into one record per entry or section.
+    """
+    if path.endswith('.jsonl'):
+        for item in iter_jsonl(path):
+            yield _portfolio_record(item)
+        return
+
+    reader = _StreamReader(path)
+    try:
+        first = reader.peek()
+    finally:
+        reader.close()
+
+    if first == '[':
+        for item in iter_json_array(path):
+            yield _portfolio_record(item)
+    else:
+        for key, value in iter_json_object(path):
+            yield from _profile_records(key, value)
+
+
+def filterable_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add filter keys to document metadata
+
+    Chroma metadata values must be scalars, so tags are stored both as the
+    comma-joined 'tags' string and as one boolean tag_<name> key per tag,
+    and the date as a sortable YYYYMM 'date_key'.
+    """
+    metadata = dict(metadata)
+    tags = metadata.get('tags', [])
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+    metadata['tags'] = ','.join(str(tag) for tag in tags)
+    for tag in tags:
+        metadata[tag_key(str(tag))] = True
+    metadata['date_key'] = date_key(str(metadata.get('date', '') or ''))
+    return metadata
+
+
+def build_metadata(record: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """Chroma metadata for a record (values must be scalars)"""
+    return filterable_metadata({
+        'type': record.get('type', 'unknown'),
+        'tags': record.get('tags', []),
+        'date': record.get('date', '') or '',
+        'source': source,
+    })
+
+
+def document_id(content: str, metadata: Dict[str, Any]) -> str:
+    """Content-addressed id: identical documents always get the same id"""
+    canonical = json.dumps({'content': content, 'metadata': metadata}, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class IngestionPipeline:
+    """
+    Idempotent, batched ingestion into a Chroma collection
+
+    Documents are keyed by a hash of their content and metadata, so
+    re-ingesting the same data is a no-op and concurrent writers upsert the
+    same ids instead of colliding. Syncing a source only embeds new or
+    changed records and deletes records that disappeared from it.
+
+    Secondary indexes (anything with add(ids, documents, metadatas) and
+    remove(ids)) registered in `indexes` see every write.
+    """
+
+    def __init__(self, collection, batch_size: int = 64):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.indexes: List[Any] = []
+
+    def _existing_ids(self, source: str) -> Set[str]:
+        result = self.collection.get(where={'source': source}, include=[])
+        return set(result['ids'])
+
+    def _flush(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        if ids:
+            self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas)
+            for index in self.indexes:
+                index.add(ids, documents, metadatas)
+            ids.clear()
+            documents.clear()
+            metadatas.clear()
+
+    def delete(self, ids: List[str]):
+        """Delete documents in batches"""
+        for i in range(0, len(ids), self.batch_size):
+            batch = ids[i:i + self.batch_size]
+            self.collection.delete(ids=batch)
+            for index in self.indexes:
+                index.remove(batch)
+
+    def upsert(self, texts: List[str], metadata_list: List[Dict[str, Any]]) -> List[str]:
+        """Upsert documents in batches and return their content ids"""
+        ids: List[str] = []
+        batch_ids: List[str] = []
+        batch_docs: List[str] = []
+        batch_meta: List[Dict[str, Any]] = []
+
+        for text, metadata in zip(texts, metadata_list):
+            doc_id = document_id(text, metadata)
+            ids.append(doc_id)
+            batch_ids.append(doc_id)
+            batch_docs.append(text)
+            batch_meta.append(metadata)
+            if len(batch_ids) >= self.batch_size:
+                self._flush(batch_ids, batch_docs, batch_meta)
+
+        self._flush(batch_ids, batch_docs, batch_meta)
+        return ids
+
+    def sync_source(self, path: str, source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Bring the collection in line with a source file
+
+        Args:
+            path (str): JSON or JSONL file to ingest
+            source (str): Name stored in each document's metadata; defaults to path
+
+        Returns:
+            Dict: Counts of added, unchanged and deleted documents plus throughput
+        """
+        source = source or path
+        started = time.perf_counter()
+        existing = self._existing_ids(source)
+        seen: Set[str] = set()
+        stats = {'source': source, 'records': 0, 'added': 0, 'unchanged': 0, 'deleted': 0}
+
+        batch_ids: List[str] = []
+        batch_docs: List[str] = []
+        batch_meta: List[Dict[str, Any]] = []
+
+        for record in iter_source_records(path):
+            stats['records'] += 1
+            metadata = build_metadata(record, source)
+            doc_id = document_id(record['content'], metadata)
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+
+            if doc_id in existing:
+                stats['unchanged'] += 1
+                continue
+
+            batch_ids.append(doc_id)
+            batch_docs.append(record['content'])
+            batch_meta.append(metadata)
+            stats['added'] += 1
+            if len(batch_ids) >= self.batch_size:
+                self._flush(batch_ids, batch_docs, batch_meta)
+
+        self._flush(batch_ids, batch_docs, batch_meta)
+
+        removed = list(existing - seen)
+        self.delete(removed)
+        stats['deleted'] = len(removed)
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 4)
+        stats['docs_per_second'] = round(stats['records'] / elapsed, 1) if elapsed else None
+        return stats
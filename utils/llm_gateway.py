@@ -0,0 +1,366 @@
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .history import count_message_tokens
+from .metrics import metrics, record_error
+
+_session: contextvars.ContextVar[str] = contextvars.ContextVar('llm_session', default='default')
+
+BUSY_MESSAGE = "A lot of people are chatting right now. Please try again in a minute."
+
+
+class LLMRateLimited(RuntimeError):
+    """Raised when a request could not be admitted within the gateway's max_wait"""
+
+
+@contextmanager
+def session_scope(session_id: str) -> Iterator[str]:
+    """Attribute gateway calls made inside the block to one visitor session"""
+    token = _session.set(session_id)
+    try:
+        yield session_id
+    finally:
+        _session.reset(token)
+
+
+class TokenBucket:
+    """Allowance refilled continuously at per_minute / 60 per second, up to capacity"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, capacity or per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+
+class _SharedStream:
+    """Chunks of one upstream stream, replayed to every coalesced reader"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error = False
+        self.cond = threading.Condition()
+
+    def append(self, chunk: str):
+        with self.cond:
+            self.chunks.append(chunk)
+            self.cond.notify_all()
+
+    def finish(self, error: bool):
+        with self.cond:
+            self.error = error
+            self.done = True
+            self.cond.notify_all()
+
+    def __iter__(self) -> Iterator[str]:
+        index = 0
+        while True:
+            with self.cond:
+                while index >= len(self.chunks) and not self.done:
+                    self.cond.wait()
+                if index >= len(self.chunks):
+                    return
+                chunk = self.chunks[index]
+            index += 1
+            yield chunk
+
+
+class LLMGateway:
+    """
+    Process-wide front door for OpenAIManager calls
+
+    Identical requests (same messages and parameters) that are in flight at
+    the same time share one upstream call. Upstream calls are admitted
+    against request-per-minute and token-per-minute buckets; waiting
+    requests are served round-robin across sessions, so one visitor firing
+    many requests cannot starve the others. A request that cannot be
+    admitted within max_wait gets a "busy" answer instead of a generic
+    error.
+
+    The session of a call comes from session_scope().
+    """
+
+    def __init__(
+        self,
+        llm,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_wait: float = 30.0,
+        burst_seconds: float = 10.0
+    ):
+        """
+        Args:
+            llm (OpenAIManager): Upstream client
+            rpm (float): Requests per minute; unlimited if None
+            tpm (float): Prompt plus max completion tokens per minute;
+                unlimited if None
+            max_wait (float): Longest a request may queue for admission
+            burst_seconds (float): Bucket capacity in seconds of allowance;
+                the API enforces its per-minute limits over shorter windows
+        """
+        self.llm = llm
+        self.requests = TokenBucket(rpm, rpm * burst_seconds / 60) if rpm else None
+        self.tokens = TokenBucket(tpm, tpm * burst_seconds / 60) if tpm else None
+        self.max_wait = max_wait
+
+        self.cond = threading.Condition()
+        self.queues: Dict[str, Deque[object]] = {}  # Waiting tickets per session, FIFO
+        self.ring: Deque[str] = deque()  # Sessions with waiting tickets, in service order
+        self.inflight: Dict[str, Any] = {}  # Request key -> Future or _SharedStream
+        self.inflight_lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {'requests': 0, 'upstream_calls': 0, 'coalesced': 0, 'rejected': 0,
+                      'admitted': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+    # Passthroughs so the gateway can stand in for OpenAIManager
+    @property
+    def model(self) -> str:
+        return self.llm.model
+
+    @property
+    def last_stream_stats(self) -> Dict[str, Any]:
+        return getattr(self._local, 'stream_stats', {})
+
+    def _build_messages(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        return self.llm._build_messages(prompt, context)
+
+    def format_response(self, response: str, format_type: str = "markdown") -> str:
+        return self.llm.format_response(response, format_type)
+
+    def _key(self, messages: List[Dict[str, str]], max_tokens: Optional[int], stream: bool) -> str:
+        payload = json.dumps(
+            [self.llm.model, self.llm.temperature, max_tokens or self.llm.max_tokens, stream, messages],
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _cost(self, messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+        """Tokens charged against the TPM bucket, the way the API counts them"""
+        return count_message_tokens(messages, self.llm.model) + (max_tokens or self.llm.max_tokens)
+
+    def _publish_queue(self):
+        metrics.set_gauge('llm_gateway_queue_depth', sum(len(q) for q in self.queues.values()))
+        metrics.set_gauge('llm_gateway_sessions_waiting', len(self.ring))
+
+    def _admit(self, cost: int, session: str):
+        """
+        Block until this request may go upstream
+
+        Raises:
+            LLMRateLimited: If it is not admitted within max_wait
+        """
+        ticket = object()
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        with self.cond:
+            if session not in self.queues:
+                self.queues[session] = deque()
+                self.ring.append(session)
+            self.queues[session].append(ticket)
+            self._publish_queue()
+            try:
+                while True:
+                    now = time.monotonic()
+                    timeout = deadline - now
+                    if self.ring[0] == session and self.queues[session][0] is ticket:
+                        wait = max(
+                            self.requests.wait_time(1, now) if self.requests else 0.0,
+                            self.tokens.wait_time(cost, now) if self.tokens else 0.0
+                        )
+                        if wait <= 0:
+                            break
+                        if now + wait > deadline:
+                            raise LLMRateLimited(f"rate limit: next slot in {wait:.1f}s")
+                        timeout = wait
+                    elif timeout <= 0:
+                        raise LLMRateLimited(f"queued for {self.max_wait:.0f}s without a slot")
+                    self.cond.wait(timeout)
+            except BaseException:
+                self._dequeue(session, ticket)
+                self.stats['rejected'] += 1
+                raise
+
+            if self.requests:
+                self.requests.take(1, now)
+            if self.tokens:
+                self.tokens.take(cost, now)
+            self._dequeue(session, ticket)
+            waited = now - started
+            self.stats['admitted'] += 1
+            self.stats['wait_seconds'] += waited
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+        metrics.observe('llm_gateway_wait_seconds', waited)
+
+    def _dequeue(self, session: str, ticket: object):
+        """Remove a ticket and move its session to the back of the ring (caller holds cond)"""
+        queue = self.queues[session]
+        queue.remove(ticket)
+        self.ring.remove(session)
+        if queue:
+            self.ring.append(session)
+        else:
+            del self.queues[session]
+        self._publish_queue()
+        self.cond.notify_all()
+
+    def chat(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> str:
+        """
+        OpenAIManager.chat through the gateway
+
+        Raises:
+            LLMRateLimited: If the request was not admitted within max_wait
+            RuntimeError: If the API returns a non-200 response
+        """
+        key = self._key(messages, max_tokens, stream=False)
+        with self.inflight_lock:
+            self.stats['requests'] += 1
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+        if not leader:
+            metrics.inc('llm_gateway_coalesced_total')
+            return future.result()
+
+        try:
+            self._admit(self._cost(messages, max_tokens), _session.get())
+            with self.inflight_lock:
+                self.stats['upstream_calls'] += 1
+            result = self.llm.chat(messages, max_tokens=max_tokens)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.inflight_lock:
+                self.inflight.pop(key, None)
+
+    def _produce(self, shared: _SharedStream, key: str, messages: List[Dict[str, str]], session: str):
+        """Run one upstream stream into a _SharedStream (on its own thread)"""
+        error = False
+        try:
+            self._admit(self._cost(messages, None), session)
+            with self.inflight_lock:
+                self.stats['upstream_calls'] += 1
+            for chunk in self.llm.stream_chat(messages):
+                shared.append(chunk)
+            error = self.llm.last_stream_stats.get('error', False)
+        except LLMRateLimited as e:
+            record_error('llm.gateway', e)
+            shared.append(BUSY_MESSAGE)
+            error = True
+        except Exception as e:
+            print(f"Error in gateway stream: {str(e)}")
+            record_error('llm.gateway', e)
+            shared.append("I encountered an error while processing your request. Please try again.")
+            error = True
+        finally:
+            # Unregister before finishing so late arrivals start a fresh call
+            with self.inflight_lock:
+                self.inflight.pop(key, None)
+            shared.finish(error)
+
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        OpenAIManager.stream_chat through the gateway
+
+        The upstream stream runs on its own thread so a reader that stops
+        early does not stall the others sharing it. last_stream_stats
+        (per thread) records ttft, total, error and whether it was coalesced.
+        """
+        started = time.perf_counter()
+        key = self._key(messages, None, stream=True)
+        with self.inflight_lock:
+            self.stats['requests'] += 1
+            shared = self.inflight.get(key)
+            coalesced = shared is not None
+            if coalesced:
+                self.stats['coalesced'] += 1
+            else:
+                shared = self.inflight[key] = _SharedStream()
+        if coalesced:
+            metrics.inc('llm_gateway_coalesced_total')
+        else:
+            # Copy the context so upstream spans keep the leader's trace id
+            context = contextvars.copy_context()
+            threading.Thread(
+                target=context.run,
+                args=(self._produce, shared, key, messages, _session.get()),
+                name='llm-stream',
+                daemon=True
+            ).start()
+
+        stats = {'ttft': None, 'total': None, 'chunks': 0, 'error': False, 'coalesced': coalesced}
+        self._local.stream_stats = stats
+        try:
+            for chunk in shared:
+                if stats['ttft'] is None:
+                    stats['ttft'] = time.perf_counter() - started
+                stats['chunks'] += 1
+                yield chunk
+            stats['error'] = shared.error
+        finally:
+            stats['total'] = time.perf_counter() - started
+
+    def generate_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """OpenAIManager.generate_response through the gateway"""
+        try:
+            return self.chat(self._build_messages(prompt, context))
+
+        except LLMRateLimited as e:
+            print(f"Error: {str(e)}")
+            record_error('llm.gateway', e)
+            return BUSY_MESSAGE
+
+        except RuntimeError as e:
+            print(f"Error: {str(e)}")
+            record_error('llm.chat', e)
+            return "I apologize, but I'm having trouble generating a response at the moment."
+
+        except Exception as e:
+            print(f"Error in generate_response: {str(e)}")
+            record_error('llm.chat', e)
+            return "I encountered an error while processing your request. Please try again."
+
+    def stream_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Stream a response to a prompt; see stream_chat"""
+        return self.stream_chat(self._build_messages(prompt, context))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current queue depth and admission wait percentiles"""
+        with self.cond:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats['queue_depth'] = sum(len(q) for q in self.queues.values())
+            stats['sessions_waiting'] = len(self.ring)
+        with self.inflight_lock:
+            stats['inflight'] = len(self.inflight)
+        waits = metrics.histogram('llm_gateway_wait_seconds')
+        stats['wait_p50'] = waits.percentile(50)
+        stats['wait_p95'] = waits.percentile(95)
+        stats['mean_wait_seconds'] = stats['wait_seconds'] / stats['admitted'] if stats['admitted'] else 0.0
+        return stats
@@ -1,77 +1,379 @@
 import os
-from typing import Dict, List, Any, Optional
+import json
+import itertools
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from datetime import datetime
 import requests
 from dotenv import load_dotenv
 
+from .hedging import HedgePolicy
+from .http_transport import HTTPTransport, get_transport
+from .metrics import metrics, record_error, timed
+
 class OpenAIManager:
-    def __init__(self):
-        """Initialize OpenAI with API key from environment"""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[HTTPTransport] = None,
+        hedging: Optional[HedgePolicy] = None
+    ):
+        """
+        Initialize OpenAI with API key from environment
+
+        Args:
+            api_key (str): Optional API key overriding OPENAI_API_KEY
+            transport (HTTPTransport): Optional transport; defaults to the
+                shared process-wide connection pool
+            hedging (HedgePolicy): If given, slow requests are duplicated
+                and the first answer wins; see _hedged_chat
+        """
         load_dotenv()
-        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key not found in environment variables")
         
         os.environ["OPENAI_API_KEY"] = self.api_key
+        self.api_base = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1").rstrip('/')
+        self.model = "gpt-3.5-turbo"
+        self.temperature = 0.7
+        self.max_tokens = 500
+        self.transport = transport or get_transport()
+        self.hedging = hedging
+        self._hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix='llm-hedge') if hedging else None
+
+        # Timing of the most recent streamed response, per thread (one per session)
+        self._local = threading.local()
+
+    @property
+    def last_stream_stats(self) -> Dict[str, Any]:
+        return getattr(self._local, 'stream_stats', {})
+
+    @last_stream_stats.setter
+    def last_stream_stats(self, stats: Dict[str, Any]):
+        self._local.stream_stats = stats
+
+    def _build_messages(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        """Build the chat messages for a prompt and optional retrieval context"""
+        # Prepare context
+        context_str = ""
+        if context and isinstance(context, dict) and 'documents' in context:
+            if isinstance(context['documents'], list):
+                context_str = "\n".join(context['documents'])
+            else:
+                context_str = str(context['documents'])
+
+        # Prepare the messages
+        messages = [
+            {
+                "role": "system",
+                "content": """You are Pavan's AI Assistant for his portfolio website. 
+                Be professional, friendly, and informative when discussing his experience,
+                skills, and projects."""
+            }
+        ]
+
+        if context_str:
+            messages.append({
+                "role": "system",
+                "content": f"Context: {context_str}"
+            })
+
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _post(
+        self,
+        messages: List[Dict[str, str]],
+        stream: bool = False,
+        max_tokens: Optional[int] = None
+    ) -> requests.Response:
+        """Send a chat-completions request"""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        data = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": max_tokens or self.max_tokens,
+            "stream": stream
+        }
+
+        return self.transport.post(
+            f"{self.api_base}/chat/completions",
+            headers=headers,
+            json=data,
+            stream=stream
+        )
+
+    def _chat_once(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> str:
+        response = self._post(messages, max_tokens=max_tokens)
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code} - {response.text}")
+        return response.json()['choices'][0]['message']['content']
+
+    @timed('llm.chat')
+    def chat(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> str:
+        """
+        Run a chat completion for prebuilt messages
+
+        Raises:
+            RuntimeError: If the API returns a non-200 response
+        """
+        if self.hedging is not None:
+            return self._hedged_chat(messages, max_tokens)
+        return self._chat_once(messages, max_tokens)
+
+    def _hedged_chat(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> str:
+        """
+        Send a duplicate request if the first has not answered within the
+        policy's delay and return whichever succeeds first
+
+        A non-streaming request cannot be interrupted once sent, so the
+        losing attempt finishes in the background and is discarded. The
+        first attempt gets a thread of its own so the hedge pool, which
+        only runs duplicates, never caps how many calls are in flight.
+        """
+        policy = self.hedging
+        policy.start()
+
+        def attempt() -> str:
+            started = time.perf_counter()
+            result = self._chat_once(messages, max_tokens)
+            policy.observe('chat', time.perf_counter() - started)
+            return result
+
+        primary: "Future[str]" = Future()
+
+        def run_primary():
+            try:
+                primary.set_result(attempt())
+            except BaseException as e:
+                primary.set_exception(e)
+
+        threading.Thread(target=run_primary, name='llm-chat', daemon=True).start()
+        attempts = [primary]
+        done, _ = wait(attempts, timeout=policy.delay('chat'))
+        if not done and policy.try_hedge('chat'):
+            attempts.append(self._hedge_pool.submit(attempt))
+
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not attempts[0]:
+                        policy.record_win('chat')
+                    return future.result()
+        raise attempts[0].exception()
 
     def generate_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
         """Generate a response using OpenAI's API"""
         try:
-            # Prepare context
-            context_str = ""
-            if context and isinstance(context, dict) and 'documents' in context:
-                if isinstance(context['documents'], list):
-                    context_str = "\n".join(context['documents'])
-                else:
-                    context_str = str(context['documents'])
-
-            # Prepare the messages
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are Pavan's AI Assistant for his portfolio website. 
-                    Be professional, friendly, and informative when discussing his experience,
-                    skills, and projects."""
-                }
-            ]
-
-            if context_str:
-                messages.append({
-                    "role": "system",
-                    "content": f"Context: {context_str}"
-                })
-
-            messages.append({"role": "user", "content": prompt})
-
-            # Make the API request directly
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "gpt-3.5-turbo",
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 500
-            }
+            return self.chat(self._build_messages(prompt, context))
 
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data
-            )
-
-            if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content']
-            else:
-                print(f"Error: {response.status_code} - {response.text}")
-                return "I apologize, but I'm having trouble generating a response at the moment."
+        except RuntimeError as e:
+            print(f"Error: {str(e)}")
+            record_error('llm.chat', e)
+            return "I apologize, but I'm having trouble generating a response at the moment."
 
         except Exception as e:
             print(f"Error in generate_response: {str(e)}")
+            record_error('llm.chat', e)
             return "I encountered an error while processing your request. Please try again."
 
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """
+        Stream a chat completion token by token
+
+        Consumes the server-sent event stream of the chat-completions API and
+        yields content deltas as they arrive. Time to first token, total time
+        and whether the stream failed are recorded in last_stream_stats.
+
+        Args:
+            messages (List[Dict]): Chat messages to send
+
+        Yields:
+            str: Content deltas in order
+        """
+        started = time.perf_counter()
+        stats = {'ttft': None, 'total': None, 'chunks': 0, 'error': False, 'hedged': False}
+        self.last_stream_stats = stats
+
+        try:
+            if self.hedging is not None:
+                response, contents = self._hedged_stream(messages, stats)
+            else:
+                response = self._post(messages, stream=True)
+                if response.status_code != 200:
+                    print(f"Error: {response.status_code} - {response.text}")
+                    response.close()
+                    record_error('llm.stream', RuntimeError(f"HTTP {response.status_code}"))
+                    stats['error'] = True
+                    yield "I apologize, but I'm having trouble generating a response at the moment."
+                    return
+                contents = self._iter_content(response)
+
+            with response:
+                for content in contents:
+                    if stats['ttft'] is None:
+                        stats['ttft'] = time.perf_counter() - started
+                    stats['chunks'] += 1
+                    yield content
+
+        except Exception as e:
+            print(f"Error in stream_chat: {str(e)}")
+            record_error('llm.stream', e)
+            stats['error'] = True
+            yield "I encountered an error while processing your request. Please try again."
+        finally:
+            stats['total'] = time.perf_counter() - started
+            status = 'error' if stats['error'] else 'ok'
+            if stats['ttft'] is not None:
+                metrics.record_span('llm.ttft', stats['ttft'], status=status)
+            metrics.record_span('llm.stream', stats['total'], status=status, chunks=stats['chunks'])
+
+    @staticmethod
+    def _iter_content(response: requests.Response) -> Iterator[str]:
+        """Content deltas of a server-sent event stream"""
+        # chunk_size=None hands over each chunk as soon as it arrives
+        for raw_line in response.iter_lines(chunk_size=None):
+            line = raw_line.decode('utf-8')
+            # SSE frames look like "data: {...}"; skip keep-alives and comments
+            if not line.startswith('data:'):
+                continue
+            payload = line[len('data:'):].strip()
+            if payload == '[DONE]':
+                break
+
+            delta = json.loads(payload)['choices'][0].get('delta', {})
+            content = delta.get('content')
+            if content:
+                yield content
+
+    @staticmethod
+    def _response_socket(response: requests.Response) -> Optional[socket.socket]:
+        """
+        The socket under a streaming response, or None if it cannot be found
+
+        Reads urllib3's private HTTPResponse._connection (present in 1.26 and
+        2.x). If a release renames it, _abort still closes the response but
+        can no longer wake a reader blocked on it.
+        """
+        try:
+            return response.raw._connection.sock
+        except AttributeError:
+            return None
+
+    @classmethod
+    def _abort(cls, response: requests.Response):
+        """Close a streaming response from another thread, waking a reader blocked on it"""
+        sock = cls._response_socket(response)
+        if sock is not None:
+            try:
+                # close() alone leaves a blocked recv() waiting for data
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        response.close()
+
+    def _hedged_stream(self, messages: List[Dict[str, str]], stats: Dict[str, Any]) -> Tuple[requests.Response, Iterator[str]]:
+        """
+        Open a stream, opening a duplicate if no token arrives within the
+        policy's delay, and keep whichever produces its first token first
+
+        Both attempts run off the calling thread, which only waits for the
+        first one to produce a token, so a request stalled before its
+        headers arrive delays the turn by the hedge delay at most. The first
+        attempt gets a thread of its own and the duplicate runs on the hedge
+        pool, as in _hedged_chat. The winner closes the other attempt's
+        response at once, which stops generation upstream and frees its
+        connection; an attempt still waiting for headers closes its response
+        as soon as they arrive.
+
+        Returns:
+            Tuple: The winning response and an iterator over all its content
+
+        Raises:
+            RuntimeError: If every attempt failed (the first failure is raised)
+        """
+        policy = self.hedging
+        policy.start()
+        events: "queue.Queue[Tuple[int, Any, Any]]" = queue.Queue()
+        winner_lock = threading.Lock()
+        state: Dict[str, Any] = {'winner': None, 'launched': 1, 'responses': {}}
+
+        def attempt(index: int):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = self._post(messages, stream=True)
+                with winner_lock:
+                    lost = state['winner'] is not None
+                    if not lost:
+                        state['responses'][index] = response
+                if lost:
+                    response.close()
+                    return
+                if response.status_code != 200:
+                    raise RuntimeError(f"{response.status_code} - {response.text}")
+                contents = self._iter_content(response)
+                first = next(contents, None)
+                with winner_lock:
+                    won = state['winner'] is None
+                    if won:
+                        state['winner'] = index
+                        losers = [other for i, other in state['responses'].items() if i != index]
+                if not won:
+                    response.close()
+                    return
+                for loser in losers:
+                    self._abort(loser)
+                policy.observe('stream', time.perf_counter() - started)
+                rest = itertools.chain([first], contents) if first is not None else iter(())
+                events.put((index, response, rest))
+            except Exception as e:
+                if response is not None:
+                    response.close()
+                events.put((index, None, e))
+
+        threading.Thread(target=attempt, args=(0,), name='llm-stream', daemon=True).start()
+        try:
+            first_event = events.get(timeout=policy.delay('stream'))
+        except queue.Empty:
+            first_event = None
+            with winner_lock:
+                # The primary may have won just after the wait timed out
+                if state['winner'] is None and policy.try_hedge('stream'):
+                    state['launched'] = 2
+            if state['launched'] == 2:
+                stats['hedged'] = True
+                self._hedge_pool.submit(attempt, 1)
+
+        failures = []
+        while True:
+            index, response, result = first_event or events.get()
+            first_event = None
+            if response is not None:
+                if index == 1:
+                    policy.record_win('stream')
+                stats['winner'] = index
+                return response, result
+            failures.append(result)
+            if len(failures) == state['launched']:
+                raise failures[0]
+
+    def stream_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Stream a response to a prompt; see stream_chat"""
+        return self.stream_chat(self._build_messages(prompt, context))
+
     def format_response(self, response: str, format_type: str = "markdown") -> str:
         """Format the response for display"""
         try:
@@ -0,0 +1,296 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_trace_id: ContextVar[Optional[str]] = ContextVar('trace_id', default=None)
+logger = logging.getLogger('portfolio.metrics')
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent values for percentiles"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.recent.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self.lock:
+            values = sorted(self.recent)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            count, total = self.count, self.sum
+        return {
+            'count': count,
+            'mean': total / count if count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'max': self.percentile(100),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide histograms and counters keyed by metric name and labels
+
+    Spans record into the 'stage_seconds' histogram labelled by stage; the
+    most recent spans are also kept with their trace ids so the debug panel
+    can show where the last turn's time went.
+    """
+
+    def __init__(self, namespace: str = 'portfolio', recent_spans: int = 500):
+        self.namespace = namespace
+        self.histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=recent_spans)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, LabelKey]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name: str, value: float, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+
+    def record_span(self, stage: str, seconds: float, status: str = 'ok', **fields):
+        self.observe('stage_seconds', seconds, stage=stage)
+        if status != 'ok':
+            self.inc('stage_errors_total', stage=stage)
+        span = {'trace_id': _trace_id.get(), 'stage': stage, 'seconds': seconds, 'status': status}
+        span.update(fields)
+        self.spans.append(span)
+        log_event('span', **span)
+
+    def stage_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Latency summary per stage"""
+        with self.lock:
+            items = [
+                (dict(labels).get('stage'), histogram)
+                for (name, labels), histogram in self.histograms.items()
+                if name == 'stage_seconds'
+            ]
+            errors = {
+                dict(labels).get('stage'): value
+                for (name, labels), value in self.counters.items()
+                if name == 'stage_errors_total'
+            }
+        summary = {}
+        for stage, histogram in sorted(items):
+            summary[stage] = histogram.summary()
+            summary[stage]['errors'] = errors.get(stage, 0)
+        return summary
+
+    def trace(self, trace_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Spans recorded under a trace id, oldest first"""
+        return [span for span in list(self.spans) if span['trace_id'] == trace_id]
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        def fmt_labels(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+            return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+
+        lines: List[str] = []
+        seen = set()
+        for (name, labels), histogram in histograms:
+            metric = f"{self.namespace}_{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            with histogram.lock:
+                counts = list(histogram.counts)
+                count, total = histogram.count, histogram.sum
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{metric}_bucket{fmt_labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{fmt_labels(labels)} {total}")
+            lines.append(f"{metric}_count{fmt_labels(labels)} {count}")
+
+        for kind, items in (('counter', counters), ('gauge', gauges)):
+            for (name, labels), value in items:
+                metric = f"{self.namespace}_{name}"
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} {kind}")
+                    seen.add(metric)
+                lines.append(f"{metric}{fmt_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write the exposition atomically, e.g. for node_exporter's textfile collector"""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+            self.spans.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+@contextmanager
+def trace(trace_id: Optional[str] = None) -> Iterator[str]:
+    """Run a block (one chat turn) under a trace id that spans and logs pick up"""
+    trace_id = trace_id or new_trace_id()
+    token = _trace_id.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _trace_id.reset(token)
+
+
+@contextmanager
+def span(stage: str, **fields) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block as one stage
+
+    The yielded dict can be filled with extra fields for the span record.
+    Exceptions are recorded with status 'error' and re-raised.
+    """
+    extra: Dict[str, Any] = dict(fields)
+    started = time.perf_counter()
+    try:
+        yield extra
+    except BaseException as e:
+        extra.setdefault('error', repr(e))
+        metrics.record_span(stage, time.perf_counter() - started, status='error', **extra)
+        raise
+    metrics.record_span(stage, time.perf_counter() - started, status=extra.pop('status', 'ok'), **extra)
+
+
+def timed(stage: str):
+    """Decorator recording every call of a function as a span of the given stage"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_error(stage: str, error: BaseException):
+    """Count and log an error that was handled (and printed) by the caller"""
+    metrics.inc('errors_total', stage=stage)
+    log_event('error', level=logging.ERROR, stage=stage, error=repr(error))
+
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    """Emit one JSON log line tagged with the current trace id, if logging is enabled"""
+    if not logger.isEnabledFor(level):
+        return
+    record = {'ts': round(time.time(), 6), 'event': event, 'trace_id': _trace_id.get()}
+    record.update(fields)
+    logger.log(level, json.dumps(record, default=str))
+
+
+def configure_json_logging(destination: Optional[str] = None) -> bool:
+    """
+    Send JSON span and error logs to a file, or stderr for '-'
+
+    Defaults to the METRICS_LOG environment variable; does nothing if unset.
+    """
+    destination = destination or os.getenv("METRICS_LOG")
+    if not destination or logger.handlers:
+        return False
+    handler = logging.StreamHandler() if destination == '-' else logging.FileHandler(destination)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return True
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_prometheus(port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _PrometheusHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
@@ -0,0 +1,101 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import metrics, record_error
+
+
+class TurnOrchestrator:
+    """
+    Gathers a chat turn's context from independent stages in parallel
+
+    Background stages (vector search, free/busy lookups, ...) run on a
+    shared thread pool, each with its own deadline measured from the start
+    of the turn; foreground stages run on the calling thread meanwhile,
+    which is where anything touching st.session_state has to run. A stage
+    that misses its deadline or fails is left out and the turn continues
+    with the context it has, so the wait is bounded by the slowest stage
+    that made it in time rather than by the sum of all stages.
+    """
+
+    def __init__(self, workers: int = 8):
+        """
+        Args:
+            workers (int): Threads shared by all turns; a stage that times
+                out keeps its thread until it finishes
+        """
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='turn-stage')
+
+    @staticmethod
+    def _call(name: str, func: Callable[[], Any]) -> Tuple[Any, float, Optional[BaseException], float]:
+        """Run one stage, returning (value, seconds, error, finished_at) instead of raising"""
+        started = time.perf_counter()
+        value, error = None, None
+        try:
+            value = func()
+        except Exception as e:
+            print(f"Error in turn stage {name}: {str(e)}")
+            record_error(f'context.{name}', e)
+            error = e
+        finished = time.perf_counter()
+        metrics.record_span(f'context.{name}', finished - started, status='error' if error else 'ok')
+        return value, finished - started, error, finished
+
+    def run(
+        self,
+        background: Dict[str, Tuple[Callable[[], Any], Optional[float]]],
+        foreground: Optional[Dict[str, Callable[[], Any]]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run all stages and wait for them up to their deadlines
+
+        Args:
+            background (Dict): name -> (function, deadline in seconds from
+                the start of the turn, or None to always wait)
+            foreground (Dict): name -> function, run in order on this thread
+
+        Returns:
+            Tuple: Values of the stages that succeeded in time, and a
+                report with each stage's seconds and status ('ok', 'error'
+                or 'timeout'), the wall time, the sum of stage times (what
+                running them one after another would have cost) and the
+                critical stage, the one the turn waited on last
+        """
+        started = time.perf_counter()
+        futures = {
+            # Copy the context so the stage's spans keep the turn's trace id
+            name: (self.pool.submit(contextvars.copy_context().run, self._call, name, func), deadline)
+            for name, (func, deadline) in background.items()
+        }
+
+        results: Dict[str, Any] = {}
+        stages: Dict[str, Dict[str, Any]] = {}
+        ends: Dict[str, float] = {}
+
+        def collect(name: str, outcome):
+            value, seconds, error, finished = outcome
+            stages[name] = {'seconds': seconds, 'status': 'error' if error else 'ok'}
+            ends[name] = finished - started
+            if error is None:
+                results[name] = value
+
+        for name, func in (foreground or {}).items():
+            collect(name, self._call(name, func))
+
+        for name, (future, deadline) in futures.items():
+            timeout = None if deadline is None else max(0.0, started + deadline - time.perf_counter())
+            try:
+                collect(name, future.result(timeout=timeout))
+            except TimeoutError:
+                stages[name] = {'seconds': deadline, 'status': 'timeout'}
+                ends[name] = deadline
+                metrics.inc('turn_stage_timeouts_total', stage=name)
+
+        report = {
+            'stages': stages,
+            'wall_seconds': time.perf_counter() - started,
+            'sequential_seconds': sum(stage['seconds'] for stage in stages.values()),
+            'critical': max(ends, key=ends.get) if ends else None,
+        }
+        return results, report
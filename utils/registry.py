@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+_resources: Dict[str, Any] = {}
+_locks: Dict[str, threading.Lock] = {}
+_build_times: Dict[str, float] = {}
+_registry_lock = threading.Lock()
+
+
+def get_resource(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Return the process-wide resource registered under name, building it once
+
+    Streamlit re-executes the app script on every interaction but keeps
+    imported modules, so resources held here survive reruns and are shared
+    by every session. Concurrent first calls wait for a single build; a
+    factory that raises is not cached, so the next call retries.
+    """
+    if name in _resources:
+        return _resources[name]
+
+    with _registry_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+
+    with lock:
+        if name not in _resources:
+            started = time.perf_counter()
+            _resources[name] = factory()
+            _build_times[name] = time.perf_counter() - started
+    return _resources[name]
+
+
+def peek(name: str) -> Optional[Any]:
+    """Return a resource if it has been built, without building it"""
+    return _resources.get(name)
+
+
+def reset(name: Optional[str] = None):
+    """Drop one resource (or all) so it is rebuilt on next use"""
+    with _registry_lock:
+        if name is None:
+            _resources.clear()
+            _build_times.clear()
+        else:
+            _resources.pop(name, None)
+            _build_times.pop(name, None)
+
+
+def get_build_times() -> Dict[str, float]:
+    """Seconds each resource took to build"""
+    return dict(_build_times)
+
+
+def get_db_manager():
+    """Shared ChromaDBManager (one PersistentClient per process); DATABASE_SYNC=0 opens it without syncing"""
+    def build():
+        from .database import ChromaDBManager
+        return ChromaDBManager(sync_sources=os.getenv("DATABASE_SYNC", "1") == "1")
+    return get_resource('db_manager', build)
+
+
+def get_calendar_manager(interactive: bool = True):
+    """
+    Shared GoogleCalendarManager (credentials loaded and service built once)
+
+    Worker threads pass interactive=False so a missing token raises instead
+    of blocking on the browser OAuth flow while holding the build lock.
+    """
+    def build():
+        from .calendar_utils import GoogleCalendarManager
+        from .reservations import ReservationStore
+        return GoogleCalendarManager(reservations=ReservationStore(), interactive=interactive)
+    return get_resource('calendar_manager', build)
+
+
+def calendar_configured() -> bool:
+    """Whether the calendar is built or has a stored token to build from"""
+    if peek('calendar_manager') is not None:
+        return True
+    from .calendar_utils import GoogleCalendarManager
+    return os.path.exists(GoogleCalendarManager.TOKEN_PATH)
+
+
+def get_llm_manager(api_key: Optional[str] = None):
+    """Shared OpenAIManager; LLM_HEDGE=1 enables hedged requests (at most LLM_HEDGE_MAX_RATE of calls)"""
+    def build():
+        from .hedging import HedgePolicy
+        from .llm_utils import OpenAIManager
+        hedging = None
+        if os.getenv("LLM_HEDGE") == "1":
+            hedging = HedgePolicy(max_hedge_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", "0.05")))
+        return OpenAIManager(api_key=api_key, hedging=hedging)
+    return get_resource('llm_manager', build)
+
+
+def get_llm_gateway(api_key: Optional[str] = None):
+    """Shared LLMGateway in front of the shared OpenAIManager (LLM_RPM, LLM_TPM, LLM_MAX_QUEUE_SECONDS)"""
+    def build():
+        from .llm_gateway import LLMGateway
+        rpm, tpm = os.getenv("LLM_RPM"), os.getenv("LLM_TPM")
+        return LLMGateway(
+            get_llm_manager(api_key),
+            rpm=float(rpm) if rpm else None,
+            tpm=float(tpm) if tpm else None,
+            max_wait=float(os.getenv("LLM_MAX_QUEUE_SECONDS", "30"))
+        )
+    return get_resource('llm_gateway', build)
+
+
+def get_turn_orchestrator():
+    """Shared TurnOrchestrator (TURN_WORKERS threads for context stages)"""
+    def build():
+        from .orchestrator import TurnOrchestrator
+        return TurnOrchestrator(workers=int(os.getenv("TURN_WORKERS", "8")))
+    return get_resource('turn_orchestrator', build)
+
+
+def get_session_states():
+    """Shared SessionStates for API chat history (at most API_SESSIONS sessions)"""
+    def build():
+        from .history import SessionStates
+        return SessionStates(max_sessions=int(os.getenv("API_SESSIONS", "1000")))
+    return get_resource('session_states', build)
+
+
+def start_metrics_exporters():
+    """Enable JSON logs (METRICS_LOG) and the /metrics endpoint (METRICS_PORT), once per process"""
+    def build():
+        from .metrics import configure_json_logging, serve_prometheus
+        configure_json_logging()
+        port = os.getenv("METRICS_PORT")
+        return serve_prometheus(int(port)) if port else None
+    return get_resource('metrics_exporters', build)
+
+
+def get_response_cache():
+    """Shared SemanticCache on top of the shared ChromaDBManager, or None if unavailable"""
+    def build():
+        from .semantic_cache import SemanticCache
+        try:
+            return SemanticCache(
+                get_db_manager(),
+                max_distance=float(os.getenv("CACHE_MAX_DISTANCE", "0.08")),
+                ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+            )
+        except Exception as e:
+            print(f"Error initializing response cache: {e}")
+            return None
+    return get_resource('response_cache', build)
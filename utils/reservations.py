@@ -0,0 +1,202 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class ReservationStore:
+    """
+    SQLite slot leases and idempotency keys shared by every booking path
+
+    A booking first takes a short-lived lease on its time range; a lease is
+    only granted when no live lease overlaps it, so two sessions (or two
+    processes sharing the database file) can never both pass the
+    availability check for the same slot. Confirmed leases are kept for
+    settle_seconds so the slot stays blocked until the new event shows up in
+    freebusy.
+
+    Every operation opens its own connection and runs in a BEGIN IMMEDIATE
+    transaction, which takes the database write lock up front. Threads of
+    one process also queue on a local lock first, so they wait in line
+    instead of polling SQLite's busy handler.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        lease_seconds: float = 30,
+        settle_seconds: float = 300,
+        key_ttl_seconds: float = 7 * 24 * 3600
+    ):
+        """
+        Args:
+            db_path (str): SQLite file; shared by all processes using it
+            lease_seconds (float): How long an unconfirmed lease blocks a slot
+            settle_seconds (float): How long a confirmed lease keeps blocking it
+            key_ttl_seconds (float): How long completed idempotency keys are remembered
+        """
+        self.db_path = db_path or os.getenv("RESERVATIONS_PATH", "./reservations.db")
+        self.lease_seconds = lease_seconds
+        self.settle_seconds = settle_seconds
+        self.key_ttl_seconds = key_ttl_seconds
+        self.lock = threading.Lock()
+        self._create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode so transactions are started explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    def _transaction(self, conn: sqlite3.Connection, statements):
+        """Run statements(conn) inside BEGIN IMMEDIATE, committing on success"""
+        with self.lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(conn)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def _create_tables(self):
+        """Create the lease and idempotency tables if needed"""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    lease_id TEXT PRIMARY KEY,
+                    calendar_id TEXT NOT NULL,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    event_id TEXT
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_leases_start ON leases (calendar_id, start_ts)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS idempotency_keys (
+                    key TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    event_id TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+        finally:
+            conn.close()
+
+    def acquire(self, calendar_id: str, start_time: datetime, end_time: datetime) -> Optional[str]:
+        """
+        Lease a time range if no live lease overlaps it
+
+        Returns:
+            Optional[str]: Lease id, or None if the range is already held
+        """
+        lease_id = uuid.uuid4().hex
+        now = time.time()
+
+        def take(conn):
+            conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+            clash = conn.execute(
+                "SELECT 1 FROM leases WHERE calendar_id = ? AND start_ts < ? AND end_ts > ? LIMIT 1",
+                (calendar_id, end_time.timestamp(), start_time.timestamp())
+            ).fetchone()
+            if clash:
+                return None
+            conn.execute(
+                "INSERT INTO leases (lease_id, calendar_id, start_ts, end_ts, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (lease_id, calendar_id, start_time.timestamp(), end_time.timestamp(),
+                 now + self.lease_seconds)
+            )
+            return lease_id
+
+        conn = self._connect()
+        try:
+            return self._transaction(conn, take)
+        finally:
+            conn.close()
+
+    def confirm(self, lease_id: str, event_id: str):
+        """Mark a lease as booked and keep it until the event has settled"""
+        conn = self._connect()
+        try:
+            self._transaction(conn, lambda c: c.execute(
+                "UPDATE leases SET event_id = ?, expires_at = ? WHERE lease_id = ?",
+                (event_id, time.time() + self.settle_seconds, lease_id)
+            ))
+        finally:
+            conn.close()
+
+    def release(self, lease_id: str):
+        """Give up a lease after a failed or abandoned booking"""
+        conn = self._connect()
+        try:
+            self._transaction(conn, lambda c: c.execute(
+                "DELETE FROM leases WHERE lease_id = ?", (lease_id,)
+            ))
+        finally:
+            conn.close()
+
+    def claim_key(self, key: str) -> Tuple[str, Optional[str]]:
+        """
+        Start work under an idempotency key
+
+        Returns:
+            Tuple[str, Optional[str]]: ('new', None) if the caller should book,
+                ('done', event_id) if a booking already completed under the key,
+                or ('pending', None) while another request holds it
+        """
+        now = time.time()
+
+        def claim(conn):
+            # Completed keys expire after key_ttl_seconds; stuck claims after a lease
+            conn.execute(
+                "DELETE FROM idempotency_keys WHERE (status = 'done' AND updated_at <= ?) "
+                "OR (status = 'pending' AND updated_at <= ?)",
+                (now - self.key_ttl_seconds, now - self.lease_seconds)
+            )
+            row = conn.execute(
+                "SELECT status, event_id FROM idempotency_keys WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                return row[0], row[1]
+            conn.execute(
+                "INSERT INTO idempotency_keys (key, status, updated_at) VALUES (?, 'pending', ?)",
+                (key, now)
+            )
+            return 'new', None
+
+        conn = self._connect()
+        try:
+            return self._transaction(conn, claim)
+        finally:
+            conn.close()
+
+    def complete_key(self, key: str, event_id: str):
+        """Record the event created under a key"""
+        conn = self._connect()
+        try:
+            self._transaction(conn, lambda c: c.execute(
+                "UPDATE idempotency_keys SET status = 'done', event_id = ?, updated_at = ? WHERE key = ?",
+                (event_id, time.time(), key)
+            ))
+        finally:
+            conn.close()
+
+    def abandon_key(self, key: str):
+        """Forget a key whose booking failed, so a retry can try again"""
+        conn = self._connect()
+        try:
+            self._transaction(conn, lambda c: c.execute(
+                "DELETE FROM idempotency_keys WHERE key = ? AND status = 'pending'", (key,)
+            ))
+        finally:
+            conn.close()
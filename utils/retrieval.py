@@ -0,0 +1,181 @@
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.+#][a-z0-9]+)*[+#]*")
+_DATE = re.compile(r"(\d{4})(?:-(\d{1,2}))?")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps names like node.js, c++ and c# intact"""
+    return _TOKEN.findall(text.lower())
+
+
+def tag_key(tag: str) -> str:
+    """Metadata key marking a document as carrying a tag, e.g. 'React Native' -> 'tag_react_native'"""
+    return 'tag_' + re.sub(r'[^a-z0-9]+', '_', tag.lower()).strip('_')
+
+
+def date_key(date: str) -> int:
+    """Sortable YYYYMM integer for a date like '2024-01', '2023' or '2023 - Present' (0 if none)"""
+    match = _DATE.search(date or '')
+    if not match:
+        return 0
+    return int(match.group(1)) * 100 + int(match.group(2) or 0)
+
+
+def build_where(
+    doc_type: Optional[str] = None,
+    tags: Optional[Sequence[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Translate search filters into a Chroma where clause"""
+    conditions: List[Dict[str, Any]] = []
+    if doc_type:
+        conditions.append({'type': doc_type})
+    for tag in tags or []:
+        conditions.append({tag_key(tag): True})
+    if date_from:
+        conditions.append({'date_key': {'$gte': date_key(date_from)}})
+    if date_to:
+        conditions.append({'date_key': {'$lte': date_key(date_to) or 999999}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {'$and': conditions}
+
+
+def matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a where clause produced by build_where against a metadata dict"""
+    if not where:
+        return True
+    if '$and' in where:
+        return all(matches(metadata, condition) for condition in where['$and'])
+
+    (key, expected), = where.items()
+    value = metadata.get(key)
+    if isinstance(expected, dict):
+        (op, bound), = expected.items()
+        if value is None:
+            return False
+        return value >= bound if op == '$gte' else value <= bound
+    return value == expected
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index
+
+    Mirrors the documents of a Chroma collection so exact terms such as
+    framework names rank well. Metadata is kept alongside each document so
+    the same filters used for vector search can be applied before scoring.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.documents: Dict[str, str] = {}
+        self.metadatas: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict[str, Any]]):
+        """Add or replace documents"""
+        with self.lock:
+            for doc_id, text, metadata in zip(ids, documents, metadatas):
+                self._remove(doc_id)
+                counts: Dict[str, int] = defaultdict(int)
+                for term in tokenize(text):
+                    counts[term] += 1
+                for term, count in counts.items():
+                    self.postings[term][doc_id] = count
+                self.doc_terms[doc_id] = dict(counts)
+                self.doc_lengths[doc_id] = sum(counts.values())
+                self.documents[doc_id] = text
+                self.metadatas[doc_id] = metadata or {}
+                self.total_length += self.doc_lengths[doc_id]
+
+    def remove(self, ids: Iterable[str]):
+        with self.lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        del self.documents[doc_id]
+        del self.metadatas[doc_id]
+
+    def clear(self):
+        with self.lock:
+            self.postings.clear()
+            self.doc_terms.clear()
+            self.doc_lengths.clear()
+            self.documents.clear()
+            self.metadatas.clear()
+            self.total_length = 0
+
+    def search(self, query: str, k: int = 10, where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Score documents against a query
+
+        Args:
+            query (str): Query text
+            k (int): Number of results
+            where (Dict): Optional filter from build_where, applied before scoring
+
+        Returns:
+            List[Tuple[str, float]]: (document id, BM25 score), best first
+        """
+        with self.lock:
+            n_docs = len(self.documents)
+            if not n_docs:
+                return []
+            avg_length = self.total_length / n_docs
+            allowed: Dict[str, bool] = {}
+            scores: Dict[str, float] = defaultdict(float)
+
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if where is not None:
+                        if doc_id not in allowed:
+                            allowed[doc_id] = matches(self.metadatas[doc_id], where)
+                        if not allowed[doc_id]:
+                            continue
+                    length = self.doc_lengths[doc_id]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / norm
+
+            return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank)"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
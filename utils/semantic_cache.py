@@ -0,0 +1,225 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from .metrics import record_error, timed
+
+
+class SemanticCache:
+    """
+    Semantic response cache stored in its own ChromaDB collection
+
+    Questions are embedded through the manager's query tier (the
+    in-memory LRU, never the on-disk document tier); a new
+    question within max_distance (cosine) of a cached one is answered with
+    the cached answer. Entries expire after ttl_seconds, the least recently
+    used entries are evicted beyond max_entries, and everything is dropped
+    when the portfolio data changes.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        max_distance: float = 0.08,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 500,
+        data_files: Sequence[str] = ('data/portfolio_data.json', 'data/personal_info.json'),
+        collection_name: str = "response_cache"
+    ):
+        """
+        Args:
+            db_manager (ChromaDBManager): Provides the client and the
+                portfolio collection the answers are based on
+            max_distance (float): Largest cosine distance counted as a hit
+            ttl_seconds (float): Lifetime of a cached answer
+            max_entries (int): Entries kept before LRU eviction
+            data_files (Sequence[str]): Source files whose changes invalidate the cache
+            collection_name (str): Name of the cache collection
+        """
+        self.db_manager = db_manager
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.data_files = list(data_files)
+
+        # Questions are embedded explicitly through the query tier, so the
+        # collection gets the unwrapped function and never writes visitor
+        # questions to the document tier on disk
+        self.embedder = db_manager.embedder
+        collection_kwargs = dict(db_manager.collection_kwargs)
+        if self.embedder is not None:
+            collection_kwargs["embedding_function"] = self.embedder.embedding_function
+        self.collection = db_manager.client.get_or_create_collection(
+            name=collection_name,
+            **collection_kwargs
+        )
+
+        self.lock = threading.Lock()
+        self.stats = {
+            'lookups': 0,
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'saved_seconds': 0.0,
+        }
+        # Running average of the LLM latency a hit avoids
+        self.avg_miss_latency: Optional[float] = None
+        self.data_version = self._current_version()
+
+    def _current_version(self) -> str:
+        """Fingerprint of the portfolio data: source file stats plus collection size"""
+        parts = []
+        for path in self.data_files:
+            try:
+                stat = os.stat(path)
+                parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+            except OSError:
+                parts.append(f"{path}:missing")
+        parts.append(f"count:{self.db_manager.collection.count()}")
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+    def _check_version(self):
+        """Drop every entry if the portfolio data changed since the last check"""
+        version = self._current_version()
+        if version != self.data_version:
+            self.invalidate()
+            self.data_version = version
+
+    @staticmethod
+    def _key(prompt: str) -> str:
+        return hashlib.sha256(prompt.strip().lower().encode()).hexdigest()
+
+    @timed('cache.lookup')
+    def lookup(self, prompt: str) -> Optional[str]:
+        """Return a cached answer for a semantically equivalent question, if any"""
+        with self.lock:
+            self.stats['lookups'] += 1
+        try:
+            self._check_version()
+            if self.collection.count() == 0:
+                return self._miss()
+
+            if self.embedder is not None:
+                query_kwargs = {'query_embeddings': self.embedder.embed_queries([prompt])}
+            else:
+                query_kwargs = {'query_texts': [prompt]}
+            results = self.collection.query(
+                **query_kwargs,
+                n_results=1,
+                include=['metadatas', 'distances']
+            )
+            if not results['ids'][0]:
+                return self._miss()
+
+            entry_id = results['ids'][0][0]
+            metadata = results['metadatas'][0][0]
+            distance = results['distances'][0][0]
+            now = time.time()
+
+            if distance > self.max_distance:
+                return self._miss()
+            if now - metadata['created_at'] > self.ttl_seconds:
+                self.collection.delete(ids=[entry_id])
+                return self._miss()
+
+            metadata['last_used'] = now
+            metadata['hits'] = metadata.get('hits', 0) + 1
+            self.collection.update(ids=[entry_id], metadatas=[metadata])
+
+            with self.lock:
+                self.stats['hits'] += 1
+                self.stats['saved_seconds'] += self.avg_miss_latency or 0.0
+            return metadata['answer']
+        except Exception as e:
+            print(f"Error reading response cache: {e}")
+            record_error('cache.lookup', e)
+            return self._miss()
+
+    def _miss(self) -> None:
+        with self.lock:
+            self.stats['misses'] += 1
+        return None
+
+    def store(self, prompt: str, answer: str, latency: Optional[float] = None) -> bool:
+        """
+        Cache an answer
+
+        Args:
+            prompt (str): The question
+            answer (str): The generated answer
+            latency (float): Seconds it took to generate, used to estimate
+                the time saved by later hits
+        """
+        if latency is not None:
+            with self.lock:
+                if self.avg_miss_latency is None:
+                    self.avg_miss_latency = latency
+                else:
+                    self.avg_miss_latency = 0.9 * self.avg_miss_latency + 0.1 * latency
+
+        try:
+            now = time.time()
+            embedding_kwargs = {}
+            if self.embedder is not None:
+                embedding_kwargs['embeddings'] = self.embedder.embed_queries([prompt])
+            self.collection.upsert(
+                ids=[self._key(prompt)],
+                documents=[prompt],
+                **embedding_kwargs,
+                metadatas=[{
+                    'answer': answer,
+                    'created_at': now,
+                    'last_used': now,
+                    'hits': 0,
+                }]
+            )
+            self._evict()
+            return True
+        except Exception as e:
+            print(f"Error writing response cache: {e}")
+            record_error('cache.store', e)
+            return False
+
+    def _evict(self):
+        """Remove expired entries, then least recently used ones beyond max_entries"""
+        if self.collection.count() <= self.max_entries:
+            return
+
+        entries = self.collection.get(include=['metadatas'])
+        now = time.time()
+        expired: List[str] = []
+        alive = []
+        for entry_id, metadata in zip(entries['ids'], entries['metadatas']):
+            if now - metadata['created_at'] > self.ttl_seconds:
+                expired.append(entry_id)
+            else:
+                alive.append((metadata['last_used'], entry_id))
+
+        overflow = len(alive) - self.max_entries
+        if overflow > 0:
+            alive.sort()
+            expired.extend(entry_id for _, entry_id in alive[:overflow])
+
+        if expired:
+            self.collection.delete(ids=expired)
+            with self.lock:
+                self.stats['evictions'] += len(expired)
+
+    def invalidate(self):
+        """Drop every cached answer"""
+        entries = self.collection.get(include=[])
+        if entries['ids']:
+            self.collection.delete(ids=entries['ids'])
+        with self.lock:
+            self.stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate, latency saved and entry count"""
+        with self.lock:
+            stats = dict(self.stats)
+        stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0
+        stats['entries'] = self.collection.count()
+        return stats
@@ -0,0 +1,233 @@
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .metrics import metrics, span
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n{2,}')
+_CLAUSE_BREAK = re.compile(r'(?<=[,;:])\s+')
+
+
+def split_sentences(text: str, max_chars: int = 250, min_chars: int = 20) -> List[str]:
+    """
+    Split text into chunks suitable for synthesis
+
+    Sentences longer than max_chars are broken at clause punctuation, then at
+    spaces; fragments shorter than min_chars are joined to the next one so
+    playback is not choppy.
+    """
+    pieces: List[str] = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = ' '.join(sentence.split())
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        current = ''
+        for clause in _CLAUSE_BREAK.split(sentence):
+            for word in clause.split(' '):
+                if current and len(current) + 1 + len(word) > max_chars:
+                    pieces.append(current)
+                    current = word
+                else:
+                    current = f"{current} {word}" if current else word
+            if len(current) >= min_chars:
+                pieces.append(current)
+                current = ''
+        if current:
+            pieces.append(current)
+
+    chunks: List[str] = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) < min_chars and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+class GTTSBackend:
+    """Google Translate TTS (network); returns MP3 bytes"""
+
+    mime = 'audio/mp3'
+
+    def __init__(self, lang: str = 'en'):
+        self.lang = lang
+        self.name = f"gtts:{lang}"
+
+    def synthesize(self, text: str) -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Backend:
+    """
+    Offline pyttsx3 engine; returns WAV bytes
+
+    The engine is not thread-safe and can only render to a file, so calls are
+    serialized and each one renders into a private temporary directory that
+    is removed straight away.
+    """
+
+    mime = 'audio/wav'
+
+    def __init__(self, rate: Optional[int] = None, voice: Optional[str] = None):
+        self.rate = rate
+        self.voice = voice
+        self.name = f"pyttsx3:{voice or 'default'}:{rate or 'default'}"
+        self.lock = threading.Lock()
+        self._engine = None
+
+    def _get_engine(self):
+        if self._engine is None:
+            import pyttsx3
+
+            self._engine = pyttsx3.init()
+            if self.rate:
+                self._engine.setProperty('rate', self.rate)
+            if self.voice:
+                self._engine.setProperty('voice', self.voice)
+        return self._engine
+
+    def synthesize(self, text: str) -> bytes:
+        with self.lock, tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'speech.wav')
+            engine = self._get_engine()
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+
+
+class AudioCache:
+    """In-memory LRU of synthesized audio, keyed by backend and text, capped in bytes"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def key(backend_name: str, text: str) -> str:
+        return hashlib.sha256(f"{backend_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            audio = self.entries.get(key)
+            if audio is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return audio
+
+    def put(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = audio
+            self.size += len(audio)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats['entries'] = len(self.entries)
+            stats['bytes'] = self.size
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+class StreamingTTS:
+    """
+    Sentence-by-sentence synthesis on a small worker pool
+
+    stream() yields one in-memory buffer per sentence, in order, as soon as
+    that sentence is ready, while later sentences are synthesized in the
+    background, so playback can start after the first sentence.
+    """
+
+    def __init__(self, backend, cache: Optional[AudioCache] = None, workers: int = 3):
+        """
+        Args:
+            backend: Object with name, mime and synthesize(text) -> bytes
+            cache (AudioCache): Cache of synthesized chunks; disabled if None
+            workers (int): Sentences synthesized concurrently
+        """
+        self.backend = backend
+        self.cache = cache
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts')
+        self.last_stream_stats: Dict[str, Any] = {}
+
+    @property
+    def mime(self) -> str:
+        return self.backend.mime
+
+    def _synthesize(self, text: str) -> bytes:
+        key = AudioCache.key(self.backend.name, text) if self.cache is not None else None
+        if key is not None:
+            audio = self.cache.get(key)
+            if audio is not None:
+                return audio
+        with span('tts.synthesize', chars=len(text)):
+            audio = self.backend.synthesize(text)
+        if key is not None:
+            self.cache.put(key, audio)
+        return audio
+
+    def synthesize(self, text: str) -> io.BytesIO:
+        """Synthesize text in one piece"""
+        return io.BytesIO(self._synthesize(text))
+
+    def stream(self, text: str) -> Iterator[io.BytesIO]:
+        """
+        Yield one audio buffer per sentence, in order
+
+        At most 2 x workers sentences are in flight, so abandoning the
+        iterator early does not leave the whole answer queued.
+        """
+        started = time.perf_counter()
+        chunks = split_sentences(text)
+        stats: Dict[str, Any] = {'chunks': len(chunks), 'first_audio': None, 'total': None}
+        self.last_stream_stats = stats
+
+        pending: Deque[Future] = deque()
+        upcoming = iter(chunks)
+        try:
+            for chunk in upcoming:
+                pending.append(self.pool.submit(self._synthesize, chunk))
+                if len(pending) >= 2 * self.workers:
+                    break
+            while pending:
+                audio = pending.popleft().result()
+                next_chunk = next(upcoming, None)
+                if next_chunk is not None:
+                    pending.append(self.pool.submit(self._synthesize, next_chunk))
+                if stats['first_audio'] is None:
+                    stats['first_audio'] = time.perf_counter() - started
+                    metrics.record_span('tts.first_audio', stats['first_audio'])
+                yield io.BytesIO(audio)
+        finally:
+            for future in pending:
+                future.cancel()
+            stats['total'] = time.perf_counter() - started
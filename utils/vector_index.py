@@ -0,0 +1,326 @@
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .retrieval import matches
+
+
+class QuantizedVectorIndex:
+    """
+    In-process exact vector index over quantized embeddings
+
+    Mirrors the embeddings of a Chroma collection as one contiguous matrix,
+    either int8 codes with a float32 scale per row or float16 values, so a
+    query is a matrix-vector product and a partial sort instead of a trip
+    through Chroma's client, HNSW graph and SQLite metadata store. Rows are
+    unit-normalized, so distances match Chroma's cosine space. Metadata
+    filters from build_where become boolean masks over the rows, cached
+    until the next write and applied before scoring.
+
+    Registered in IngestionPipeline.indexes it sees every write; deleted
+    rows are masked out and dropped when the index is saved. A saved
+    snapshot is memory-mapped on load, so processes opening the same
+    snapshot share its pages until they write.
+
+    Each save writes a new version directory and then repoints the CURRENT
+    file at it, so a reader sees either the old snapshot or the new one.
+    """
+
+    POINTER = 'CURRENT'
+    KEEP_VERSIONS = 2
+
+    DTYPES = ('int8', 'float16')
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], List[List[float]]],
+        dtype: str = 'int8',
+        max_rows: int = 100000,
+        block_rows: int = 2048
+    ):
+        """
+        Args:
+            embed: Maps document texts to the vectors Chroma stores for them
+            dtype (str): 'int8' (4x smaller than float32) or 'float16' (2x
+                smaller, slightly more accurate, slower to score on most CPUs)
+            max_rows (int): Above this many documents the index empties
+                itself and searches fall back to Chroma
+            block_rows (int): Rows dequantized at a time while scoring
+        """
+        if dtype not in self.DTYPES:
+            raise ValueError(f"dtype must be one of {self.DTYPES}, got {dtype!r}")
+        self.embed = embed
+        self.dtype = dtype
+        self.max_rows = max_rows
+        self.block_rows = block_rows
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.dim: Optional[int] = None
+            self.vectors = np.zeros((0, 0), dtype=self.dtype)
+            self.scales = np.zeros(0, dtype=np.float32)
+            self.live = np.zeros(0, dtype=bool)
+            self.size = 0
+            self.ids: List[Optional[str]] = []
+            self.documents: List[Optional[str]] = []
+            self.metadatas: List[Optional[Dict[str, Any]]] = []
+            self.rows: Dict[str, int] = {}
+            self.overflowed = False
+            self._masks: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Unit-normalize and quantize rows, returning (codes, scales)"""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        if self.dtype == 'float16':
+            return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+        # Symmetric per-row scale: the largest component maps to +-127
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def _reserve(self, rows: int):
+        """Make room for more rows, copying a memory-mapped snapshot into memory"""
+        needed = self.size + rows
+        capacity = len(self.scales)
+        if needed <= capacity and self.vectors.flags.writeable:
+            return
+        capacity = max(needed, capacity * 2 if needed > capacity else capacity, 256)
+        vectors = np.zeros((capacity, self.dim), dtype=self.dtype)
+        scales = np.zeros(capacity, dtype=np.float32)
+        live = np.zeros(capacity, dtype=bool)
+        vectors[:self.size] = self.vectors[:self.size]
+        scales[:self.size] = self.scales[:self.size]
+        live[:self.size] = self.live[:self.size]
+        self.vectors, self.scales, self.live = vectors, scales, live
+
+    def add(self, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict[str, Any]]):
+        """Add or replace documents, embedding them with `embed`"""
+        if self.overflowed or not ids:
+            return
+        self.add_vectors(ids, documents, metadatas, self.embed(list(documents)))
+
+    def add_vectors(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        vectors: Any
+    ):
+        """Add or replace documents whose vectors are already known"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self.lock:
+            if self.overflowed or not len(ids):
+                return
+            if len(self.rows) + len(ids) > self.max_rows:
+                # Too big for a brute-force scan; leave it to Chroma
+                self.clear()
+                self.overflowed = True
+                return
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self.vectors = np.zeros((0, self.dim), dtype=self.dtype)
+            self._remove(ids)
+            codes, scales = self._encode(vectors)
+            self._reserve(len(ids))
+            start, end = self.size, self.size + len(ids)
+            self.vectors[start:end] = codes
+            self.scales[start:end] = scales
+            self.live[start:end] = True
+            for offset, (doc_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                self.rows[doc_id] = start + offset
+                self.ids.append(doc_id)
+                self.documents.append(document)
+                self.metadatas.append(metadata or {})
+            self.size = end
+            self._masks.clear()
+
+    def remove(self, ids: Iterable[str]):
+        with self.lock:
+            self._remove(ids)
+            self._masks.clear()
+
+    def _remove(self, ids: Iterable[str]):
+        for doc_id in ids:
+            row = self.rows.pop(doc_id, None)
+            if row is not None:
+                self.live[row] = False
+                self.ids[row] = self.documents[row] = self.metadatas[row] = None
+
+    def get(self, doc_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(document, metadata) for an id, if indexed"""
+        with self.lock:
+            row = self.rows.get(doc_id)
+            return None if row is None else (self.documents[row], self.metadatas[row])
+
+    def _mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Live rows passing a build_where filter, cached per condition until the next write"""
+        mask = self.live[:self.size].copy()
+        if not where:
+            return mask
+        for condition in where.get('$and', [where]):
+            key = json.dumps(condition, sort_keys=True)
+            if key not in self._masks:
+                if len(self._masks) >= 256:
+                    self._masks.clear()
+                self._masks[key] = np.fromiter(
+                    (metadata is not None and matches(metadata, condition) for metadata in self.metadatas),
+                    dtype=bool, count=self.size
+                )
+            mask &= self._masks[key]
+        return mask
+
+    def search(self, embedding: Sequence[float], k: int = 10, where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Exact nearest neighbours of a query vector
+
+        Args:
+            embedding (Sequence[float]): Query vector
+            k (int): Number of results
+            where (Dict): Optional filter from build_where, applied before scoring
+
+        Returns:
+            List[Tuple[str, float]]: (document id, cosine distance), nearest first
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        with self.lock:
+            if not self.rows:
+                return []
+            mask = self._mask(where)
+            filtered = not mask.all()
+            rows = np.flatnonzero(mask) if filtered else None
+            n = len(rows) if filtered else self.size
+            if n == 0:
+                return []
+            scores = np.empty(n, dtype=np.float32)
+            for start in range(0, n, self.block_rows):
+                end = min(start + self.block_rows, n)
+                block = self.vectors[rows[start:end]] if filtered else self.vectors[start:end]
+                scores[start:end] = block.astype(np.float32) @ query
+            scores *= self.scales[rows] if filtered else self.scales[:self.size]
+
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            found = rows[top] if filtered else top
+            return [(self.ids[row], float(1.0 - score)) for row, score in zip(found, scores[top])]
+
+    def load_collection(self, collection, page_size: int = 1000):
+        """Rebuild from the embeddings stored in a Chroma collection (no re-embedding)"""
+        with self.lock:
+            self.clear()
+            offset = 0
+            while not self.overflowed:
+                page = collection.get(
+                    include=['embeddings', 'documents', 'metadatas'],
+                    limit=page_size,
+                    offset=offset
+                )
+                if not page['ids']:
+                    break
+                self.add_vectors(page['ids'], page['documents'], page['metadatas'], page['embeddings'])
+                offset += len(page['ids'])
+
+    def save(self, path: str):
+        """Write the live rows as a snapshot that load() memory-maps"""
+        with self.lock:
+            if self.dim is None or self.overflowed:
+                return
+            version = f"v-{time.time_ns():020d}-{os.getpid()}"
+            directory = os.path.join(path, version)
+            os.makedirs(directory)
+            keep = np.flatnonzero(self.live[:self.size])
+            for name, array in (('vectors.npy', self.vectors[keep]), ('scales.npy', self.scales[keep])):
+                with open(os.path.join(directory, name), 'wb') as f:
+                    np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+            with open(os.path.join(directory, 'rows.jsonl'), 'w', encoding='utf-8') as f:
+                for row in keep:
+                    f.write(json.dumps({'id': self.ids[row], 'document': self.documents[row],
+                                        'metadata': self.metadatas[row]}) + '\n')
+            manifest = {'dtype': self.dtype, 'dim': self.dim, 'rows': len(keep)}
+            with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f)
+
+            # The version is complete; publishing it is a single atomic rename
+            pointer = os.path.join(path, self.POINTER)
+            tmp = f"{pointer}.tmp.{os.getpid()}"
+            with open(tmp, 'w') as f:
+                f.write(version)
+            os.replace(tmp, pointer)
+            self._prune(path, version)
+
+    def _prune(self, path: str, current: str):
+        """Remove old versions, keeping the previous one for readers still loading it"""
+        versions = sorted(name for name in os.listdir(path) if name.startswith('v-') and name != current)
+        for name in versions[:-(self.KEEP_VERSIONS - 1)]:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+    def load(self, path: str) -> bool:
+        """
+        Memory-map a snapshot written by save()
+
+        Returns:
+            bool: False if there is no usable snapshot (missing, another
+                dtype, or pruned while loading), leaving the index empty
+        """
+        with self.lock:
+            self.clear()
+            try:
+                with open(os.path.join(path, self.POINTER), 'r') as f:
+                    directory = os.path.join(path, f.read().strip())
+                with open(os.path.join(directory, 'manifest.json'), 'r') as f:
+                    manifest = json.load(f)
+                if manifest['dtype'] != self.dtype:
+                    return False
+                vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r')
+                scales = np.load(os.path.join(directory, 'scales.npy'))
+                with open(os.path.join(directory, 'rows.jsonl'), 'r', encoding='utf-8') as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+            except (OSError, ValueError, KeyError) as e:
+                if not isinstance(e, FileNotFoundError):
+                    print(f"Error loading vector index snapshot: {e}")
+                return False
+            rows = manifest['rows']
+            if vectors.shape != (rows, manifest['dim']) or len(scales) != rows or len(entries) != rows:
+                return False
+            if rows > self.max_rows:
+                self.overflowed = True
+                return True
+
+            self.dim = manifest['dim']
+            self.vectors, self.scales = vectors, scales
+            self.live = np.ones(rows, dtype=bool)
+            self.size = rows
+            for row, entry in enumerate(entries):
+                self.rows[entry['id']] = row
+                self.ids.append(entry['id'])
+                self.documents.append(entry['document'])
+                self.metadatas.append(entry['metadata'])
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Row counts and the footprint of the vector matrix"""
+        with self.lock:
+            return {
+                'dtype': self.dtype,
+                'rows': len(self.rows),
+                'dead_rows': self.size - len(self.rows),
+                'overflowed': self.overflowed,
+                'memory_mapped': isinstance(self.vectors, np.memmap),
+                'vector_bytes': int(self.size * (self.dim or 0) * self.vectors.itemsize + self.size * 4),
+                'float32_bytes': int(len(self.rows) * (self.dim or 0) * 4),
+            }
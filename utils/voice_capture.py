@@ -0,0 +1,336 @@
+import json
+import queue
+import threading
+import time
+import wave
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .metrics import metrics, record_error
+
+
+class WavFileSource:
+    """Read 16-bit PCM frames from a WAV file, optionally paced like a live microphone"""
+
+    def __init__(self, path: str, frame_ms: int = 30, realtime: bool = False):
+        """
+        Args:
+            path (str): 16-bit PCM WAV file; multi-channel audio is mixed down to mono
+            frame_ms (int): Frame length in milliseconds
+            realtime (bool): Sleep for each frame's duration, as a microphone would
+        """
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        with wave.open(path, 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            self.sample_rate = wav.getframerate()
+            self.channels = wav.getnchannels()
+        self.sample_width = 2
+        self.frame_samples = self.sample_rate * frame_ms // 1000
+
+    def frames(self) -> Iterator[bytes]:
+        frame_seconds = self.frame_ms / 1000
+        next_at = time.perf_counter()
+        with wave.open(self.path, 'rb') as wav:
+            while True:
+                data = wav.readframes(self.frame_samples)
+                if not data:
+                    return
+                if self.channels > 1:
+                    samples = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+                    data = samples.mean(axis=1).astype(np.int16).tobytes()
+                if self.realtime:
+                    next_at += frame_seconds
+                    delay = next_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                yield data
+
+
+class MicrophoneSource:
+    """Read 16-bit mono frames from the default (or given) input device via PyAudio"""
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.device_index = device_index
+        self.sample_width = 2
+        self.frame_samples = sample_rate * frame_ms // 1000
+
+    def frames(self) -> Iterator[bytes]:
+        import pyaudio
+
+        audio = pyaudio.PyAudio()
+        stream = audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.frame_samples
+        )
+        try:
+            while True:
+                yield stream.read(self.frame_samples, exception_on_overflow=False)
+        finally:
+            stream.stop_stream()
+            stream.close()
+            audio.terminate()
+
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detection with an adaptive noise floor
+
+    The first calibration frames set the noise floor; a frame counts as
+    speech when its RMS exceeds noise_multiplier times the floor (and
+    min_rms). Speech starts after start_frames consecutive speech frames
+    and ends after end_ms of silence.
+    """
+
+    def __init__(
+        self,
+        noise_multiplier: float = 3.0,
+        min_rms: float = 300,
+        calibration_frames: int = 10,
+        start_frames: int = 3,
+        end_ms: int = 600
+    ):
+        self.noise_multiplier = noise_multiplier
+        self.min_rms = min_rms
+        self.calibration_frames = calibration_frames
+        self.start_frames = start_frames
+        self.end_ms = end_ms
+        self.noise_floor: Optional[float] = None
+        self._calibration: List[float] = []
+
+    @staticmethod
+    def rms(frame: bytes) -> float:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+    def is_speech(self, frame: bytes) -> bool:
+        energy = self.rms(frame)
+        if self.noise_floor is None:
+            self._calibration.append(energy)
+            if len(self._calibration) >= self.calibration_frames:
+                self.noise_floor = float(np.median(self._calibration))
+            return energy > self.min_rms * self.noise_multiplier
+        speech = energy > max(self.min_rms, self.noise_floor * self.noise_multiplier)
+        if not speech:
+            # Track slow changes in background noise
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+        return speech
+
+
+class RingBuffer:
+    """Fixed number of most recent frames, kept so speech onsets are not clipped"""
+
+    def __init__(self, max_frames: int):
+        self.frames: Deque[bytes] = deque(maxlen=max_frames)
+
+    def append(self, frame: bytes):
+        self.frames.append(frame)
+
+    def drain(self) -> Iterator[bytes]:
+        while self.frames:
+            yield self.frames.popleft()
+
+
+class SpeechRecognitionBackend:
+    """
+    Batch recognizer from the SpeechRecognition package
+
+    Chunks are accumulated while capture runs and recognized once at the end
+    (recognize_google by default).
+    """
+
+    def __init__(self, recognizer=None, method: str = 'recognize_google', **kwargs):
+        import speech_recognition as sr
+
+        self.sr = sr
+        self.recognizer = recognizer or sr.Recognizer()
+        self.method = method
+        self.kwargs = kwargs
+
+    def start(self, sample_rate: int, sample_width: int):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.chunks = []
+
+    def feed(self, chunk: bytes):
+        self.chunks.append(chunk)
+
+    def finish(self) -> Optional[str]:
+        audio = self.sr.AudioData(b''.join(self.chunks), self.sample_rate, self.sample_width)
+        try:
+            return getattr(self.recognizer, self.method)(audio, **self.kwargs)
+        except self.sr.UnknownValueError:
+            return None
+
+
+class VoskBackend:
+    """Offline streaming recognizer (vosk); decodes chunks as they arrive"""
+
+    def __init__(self, model_path: str):
+        from vosk import Model
+
+        self.model = Model(model_path)
+
+    def start(self, sample_rate: int, sample_width: int):
+        from vosk import KaldiRecognizer
+
+        self.recognizer = KaldiRecognizer(self.model, sample_rate)
+        self.parts = []
+
+    def feed(self, chunk: bytes):
+        if self.recognizer.AcceptWaveform(chunk):
+            self.parts.append(json.loads(self.recognizer.Result()).get('text', ''))
+
+    def finish(self) -> Optional[str]:
+        self.parts.append(json.loads(self.recognizer.FinalResult()).get('text', ''))
+        text = ' '.join(part for part in self.parts if part)
+        return text or None
+
+
+class StreamingCapture:
+    """
+    Capture one utterance and transcribe it while it is being spoken
+
+    Frames are read into a ring buffer until speech starts; from then on
+    every frame (preceded by the buffered onset) goes to a worker thread
+    that feeds the recognizer backend, so recognition overlaps capture.
+    Capture stops at the first pause longer than the VAD's end_ms, or at
+    max_seconds.
+    """
+
+    def __init__(
+        self,
+        source,
+        backend,
+        vad: Optional[EnergyVAD] = None,
+        preroll_ms: int = 300,
+        max_seconds: float = 15,
+        no_speech_seconds: float = 5
+    ):
+        """
+        Args:
+            source: WavFileSource, MicrophoneSource or anything with frames(),
+                sample_rate, sample_width and frame_ms
+            backend: Recognizer with start(sample_rate, sample_width),
+                feed(chunk) and finish() -> Optional[str]
+            vad (EnergyVAD): Endpointer; a default EnergyVAD if omitted
+            preroll_ms (int): Audio kept from before the detected onset
+            max_seconds (float): Hard limit on an utterance
+            no_speech_seconds (float): Give up if nobody starts speaking
+        """
+        self.source = source
+        self.backend = backend
+        self.vad = vad or EnergyVAD()
+        self.preroll_ms = preroll_ms
+        self.max_seconds = max_seconds
+        self.no_speech_seconds = no_speech_seconds
+        self.last_stats: Dict[str, Any] = {}
+
+    def _feed_worker(self, chunks: "queue.Queue[Optional[bytes]]", errors: List[Exception]):
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            try:
+                self.backend.feed(chunk)
+            except Exception as e:
+                errors.append(e)
+
+    def listen(self) -> Optional[str]:
+        """
+        Capture and transcribe one utterance
+
+        Returns:
+            Optional[str]: Transcript, or None if no speech was recognized.
+                Timings are left in last_stats.
+        """
+        frame_ms = self.source.frame_ms
+        ring = RingBuffer(max(1, self.preroll_ms // frame_ms))
+        start_needed = self.vad.start_frames
+        end_needed = max(1, self.vad.end_ms // frame_ms)
+
+        chunks: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        errors: List[Exception] = []
+        worker: Optional[threading.Thread] = None
+
+        started = time.perf_counter()
+        stats: Dict[str, Any] = {
+            'endpoint': 'end_of_input', 'speech_seconds': 0.0, 'capture_seconds': None,
+            'end_of_speech_to_text': None, 'text': None,
+        }
+        self.last_stats = stats
+        speaking = False
+        voiced_run = 0
+        silent_run = 0
+        frames_seen = 0
+        speech_frames = 0
+        speech_end = None  # When the last voiced frame arrived
+
+        for frame in self.source.frames():
+            frames_seen += 1
+            voiced = self.vad.is_speech(frame)
+
+            if not speaking:
+                ring.append(frame)
+                voiced_run = voiced_run + 1 if voiced else 0
+                if voiced_run >= start_needed:
+                    speaking = True
+                    self.backend.start(self.source.sample_rate, self.source.sample_width)
+                    worker = threading.Thread(target=self._feed_worker, args=(chunks, errors), daemon=True)
+                    worker.start()
+                    for buffered in ring.drain():
+                        chunks.put(buffered)
+                    speech_frames = voiced_run
+                    speech_end = time.perf_counter()
+                elif frames_seen * frame_ms >= self.no_speech_seconds * 1000:
+                    stats['endpoint'] = 'no_speech'
+                    break
+                continue
+
+            chunks.put(frame)
+            speech_frames += 1
+            if voiced:
+                silent_run = 0
+                speech_end = time.perf_counter()
+            else:
+                silent_run += 1
+            if silent_run >= end_needed:
+                stats['endpoint'] = 'pause'
+                break
+            if speech_frames * frame_ms >= self.max_seconds * 1000:
+                stats['endpoint'] = 'max_length'
+                break
+
+        stats['capture_seconds'] = time.perf_counter() - started
+        if not speaking:
+            return None
+
+        stats['speech_seconds'] = (speech_frames - silent_run) * frame_ms / 1000
+
+        chunks.put(None)
+        worker.join()
+        if errors:
+            print(f"Error feeding recognizer: {errors[0]}")
+            record_error('stt.feed', errors[0])
+        try:
+            text = self.backend.finish()
+        except Exception as e:
+            print(f"Error recognizing speech: {str(e)}")
+            record_error('stt.finish', e)
+            text = None
+
+        stats['end_of_speech_to_text'] = time.perf_counter() - speech_end
+        metrics.record_span('stt.capture', stats['capture_seconds'], endpoint=stats['endpoint'])
+        metrics.record_span('stt.end_of_speech_to_text', stats['end_of_speech_to_text'])
+        stats['text'] = text
+        return text